@@ -285,6 +285,20 @@ class AcPoloAdmin(admin.ModelAdmin):
 
 
 ### COMUM
+class CmEmailFilaAdmin(admin.ModelAdmin):
+    list_display = (
+        "destinatario",
+        "assunto",
+        "lote",
+        "situacao",
+        "tentativas",
+        "criado_em",
+        "enviado_em",
+    )
+    list_filter = ("situacao",)
+    search_fields = ["destinatario", "assunto", "lote"]
+
+
 class CmFormacaoAdmin(admin.ModelAdmin):
     list_display = ("nome", "titulacao")
     search_fields = ["nome"]
@@ -430,6 +444,22 @@ class EdVagaCotaAdmin(admin.ModelAdmin):
     list_display = ("ed_vaga", "ed_cota")
 
 
+class EdVagaResultadoAdmin(admin.ModelAdmin):
+    list_display = (
+        "ed_pessoa_vaga_inscricao",
+        "ed_vaga",
+        "status_validacao",
+        "pontuacao_real",
+        "gerado_em",
+    )
+    search_fields = ["ed_pessoa_vaga_inscricao__cm_pessoa__nome"]
+    readonly_fields = (
+        "ed_vaga",
+        "ed_pessoa_vaga_inscricao",
+        "ed_pessoa_vaga_validacao",
+    )
+
+
 class EdPessoaVagaCotaAdmin(admin.ModelAdmin):
     list_display = ("get_cm_pessoa", "get_ed_vaga_cota")
 
@@ -655,6 +685,22 @@ class EdPessoaVagaCampoDateboxUploadAdmin(admin.ModelAdmin):
         return "-"
 
 
+class EdPessoaVagaCampoUploadTarefaAdmin(admin.ModelAdmin):
+    list_display = (
+        "cm_pessoa",
+        "ed_vaga",
+        "caminho_arquivo",
+        "situacao",
+        "tentativas",
+        "criado_em",
+        "concluido_em",
+        "duracao",
+    )
+    list_filter = ("situacao",)
+    search_fields = ["cm_pessoa__nome"]
+    readonly_fields = ("cm_pessoa", "ed_vaga")
+
+
 class EdPessoaVagaConfirmacaoAdmin(admin.ModelAdmin):
     list_display = ("pessoa", "edital", "vaga")
     search_fields = ["cm_pessoa__nome"]
@@ -742,6 +788,18 @@ class EdPessoaVagaJustificativaAdmin(admin.ModelAdmin):
         return "-"
 
 
+class EdPessoaVagaPontuacaoAdmin(admin.ModelAdmin):
+    list_display = (
+        "cm_pessoa",
+        "ed_vaga",
+        "pontuacao",
+        "pontuacao_total",
+        "atualizado_em",
+    )
+    search_fields = ["cm_pessoa__nome"]
+    readonly_fields = ("cm_pessoa", "ed_vaga")
+
+
 class EdPessoaVagaValidacaoAdmin(admin.ModelAdmin):
     list_display = (
         "pessoa",
@@ -752,6 +810,12 @@ class EdPessoaVagaValidacaoAdmin(admin.ModelAdmin):
         "data",
         "codigo",
     )
+    list_select_related = [
+        "cm_pessoa",
+        "cm_pessoa_responsavel_validacao",
+        "ed_vaga__ed_edital",
+        "codigo_validacao",
+    ]
     search_fields = ["cm_pessoa__nome"]
     fields = (
         "cm_pessoa",
@@ -1424,6 +1488,7 @@ admin.site.register(AcDisciplina, AcDisciplinaAdmin)
 admin.site.register(AcMantenedor, AcMantenedorAdmin)
 admin.site.register(AcPolo, AcPoloAdmin)
 
+admin.site.register(CmEmailFila, CmEmailFilaAdmin)
 admin.site.register(CmFormacao, CmFormacaoAdmin)
 admin.site.register(DjUri, DjUriAdmin)
 admin.site.register(DjGrupoUri, DjGrupoUriAdmin)
@@ -1450,14 +1515,17 @@ admin.site.register(
     EdPessoaVagaCampoComboboxUpload, EdPessoaVagaCampoComboboxUploadAdmin
 )
 admin.site.register(EdPessoaVagaCampoDateboxUpload, EdPessoaVagaCampoDateboxUploadAdmin)
+admin.site.register(EdPessoaVagaCampoUploadTarefa, EdPessoaVagaCampoUploadTarefaAdmin)
 admin.site.register(EdPessoaVagaConfirmacao, EdPessoaVagaConfirmacaoAdmin)
 admin.site.register(EdPessoaVagaCota, EdPessoaVagaCotaAdmin)
 admin.site.register(EdPessoaVagaInscricao, EdPessoaVagaInscricaoAdmin)
 admin.site.register(EdPessoaVagaJustificativa, EdPessoaVagaJustificativaAdmin)
+admin.site.register(EdPessoaVagaPontuacao, EdPessoaVagaPontuacaoAdmin)
 admin.site.register(EdPessoaVagaValidacao, EdPessoaVagaValidacaoAdmin)
 admin.site.register(EdUnidade, EdUnidadeAdmin)
 admin.site.register(EdVaga, EdVagaAdmin)
 admin.site.register(EdVagaCota, EdVagaCotaAdmin)
+admin.site.register(EdVagaResultado, EdVagaResultadoAdmin)
 admin.site.register(EdVagaCampoCheckbox, EdVagaCampoCheckboxAdmin)
 admin.site.register(EdVagaCampoCombobox, EdVagaCampoComboboxAdmin)
 admin.site.register(EdVagaCampoDatebox, EdVagaCampoDateboxAdmin)
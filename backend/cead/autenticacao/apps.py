@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class AutenticacaoConfig(AppConfig):
+    name = "cead.autenticacao"
+
+    def ready(self):
+        # Invalidacao dos grupos de cada usuario usados pelas permissoes
+        from . import signals  # noqa: F401
@@ -0,0 +1,36 @@
+from django.core.cache import caches
+
+from cead.settings import CACHE_GRUPOS_USUARIO_TEMPO
+
+# Nomes dos grupos do usuario, para as permissoes (permissions.py de cada app)
+# e as views que mudam o que mostram pelo grupo: lidos do banco uma vez e
+# guardados no cache compartilhado, e no proprio objeto do usuario para as
+# outras verificacoes da mesma requisicao. As alteracoes de grupos (admin ou
+# user.groups.add) invalidam o cache do usuario (signals.py)
+cache = caches["compartilhado"]
+
+
+def _chave(user_id):
+    return f"autenticacao:grupos_usuario:{user_id}"
+
+
+def grupos_do_usuario(user):
+    if not user or not user.is_authenticated:
+        return frozenset()
+
+    grupos = getattr(user, "_grupos_do_usuario", None)
+    if grupos is None:
+        grupos = cache.get(_chave(user.pk))
+        if grupos is None:
+            grupos = frozenset(user.groups.values_list("name", flat=True))
+            cache.set(_chave(user.pk), grupos, CACHE_GRUPOS_USUARIO_TEMPO)
+        user._grupos_do_usuario = grupos
+    return grupos
+
+
+def esta_em_algum_grupo(user, grupos):
+    return not grupos_do_usuario(user).isdisjoint(grupos)
+
+
+def invalidar_grupos_usuarios(user_ids):
+    cache.delete_many([_chave(user_id) for user_id in user_ids])
@@ -0,0 +1,37 @@
+from django.contrib.auth.models import Group, User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.dispatch import receiver
+
+from .grupos import invalidar_grupos_usuarios
+
+
+def _invalidar_apos_commit(user_ids):
+    user_ids = list(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: invalidar_grupos_usuarios(user_ids))
+
+
+def _membros(grupo):
+    return grupo.user_set.values_list("id", flat=True)
+
+
+# user.groups.add/remove/clear (admin do usuario, migrate_users) ou, do outro
+# lado, group.user_set; no clear pelo grupo os membros sao lidos antes
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidar_grupos_da_associacao(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            _invalidar_apos_commit([instance.pk])
+    elif action in ("post_add", "post_remove"):
+        _invalidar_apos_commit(pk_set)
+    elif action == "pre_clear":
+        _invalidar_apos_commit(_membros(instance))
+
+
+# Grupo renomeado ou apagado: muda o nome visto por todos os membros
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def invalidar_grupos_dos_membros(sender, instance, **kwargs):
+    if instance.pk is not None:
+        _invalidar_apos_commit(_membros(instance))
@@ -0,0 +1,37 @@
+from cead.env import config
+
+# "default" continua local a cada processo (throttling do DRF)
+# "compartilhado" e' visto por todos os workers do gunicorn: o padrao usa a
+# tabela cead_cache do banco (python manage.py createcachetable), e pode ser
+# trocado por Redis ou Memcached pelas variaveis de ambiente
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "compartilhado": {
+        "BACKEND": config(
+            "CACHE_COMPARTILHADO_BACKEND",
+            default="django.core.cache.backends.db.DatabaseCache",
+        ),
+        "LOCATION": config("CACHE_COMPARTILHADO_LOCATION", default="cead_cache"),
+    },
+}
+
+# Segundos que o esquema do formulario de uma vaga (inscricao/esquema.py) fica
+# no cache compartilhado; alteracoes no admin invalidam antes disso
+CACHE_ESQUEMA_VAGA_TEMPO = config("CACHE_ESQUEMA_VAGA_TEMPO", cast=int, default=86400)
+
+# Segundos que a vaga (com o edital) da sessao fica na memoria de cada processo
+# (inscricao/sessao.py); alteracoes no admin aparecem no formulario apos esse tempo
+INSCRICAO_CACHE_VAGA_TEMPO = config("INSCRICAO_CACHE_VAGA_TEMPO", cast=int, default=60)
+
+# Segundos que o total de inscritos da vaga, na listagem da validacao por
+# cursor (ValidarVagaAPIView), fica no cache compartilhado
+CACHE_VALIDACAO_TOTAL_TEMPO = config(
+    "CACHE_VALIDACAO_TOTAL_TEMPO", cast=int, default=300
+)
+
+# Segundos que os nomes dos grupos de cada usuario (autenticacao/grupos.py),
+# usados pelas permissoes, ficam no cache compartilhado; alteracoes nos grupos
+# invalidam antes disso
+CACHE_GRUPOS_USUARIO_TEMPO = config("CACHE_GRUPOS_USUARIO_TEMPO", cast=int, default=600)
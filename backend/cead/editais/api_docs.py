@@ -6,6 +6,7 @@ from cead.messages import (
     ERRO_GET_VAGA,
     ERRO_GET_VAGAS,
     ERRO_GET_PESSOA_VAGA_VALIDACAO,
+    ERRO_SESSAO_INVALIDA,
 )
 from cead.serializers import CmPessoaIdNomeCpfSerializer
 from .messages import *
@@ -49,11 +50,13 @@ DOCS_ENVIAR_EMAIL_APIVIEW = {
 DOCS_ENVIAR_EMAILS_APIVIEW = {
     "summary": "Envia e-mails de ficha para vários candidatos de uma vaga",
     "description": (
-        "Envia e-mails de ficha de inscrição para todos os candidatos validados na vaga atualmente registrada na sessão do usuário."
+        "Enfileira e-mails de ficha de inscrição para todos os candidatos validados na vaga atualmente registrada na sessão do usuário."
         "\n\n**Pré-requisito:** a sessão deve conter 'vaga_id' e 'vaga_id_hash' válidos, criados em _editais/enviar_emails/_."
         "\n\nVocê pode opcionalmente limitar até qual candidato o envio deve ocorrer, usando o campo `enviar_ate` no corpo da requisição."
         "\n\n**Nota:** _editais/enviar_emails/_ traz os candidatos organizados por nota, logo `enviar_ate` considerará candidatos em ordem de pontuação."
         "\n\n**Nota:** o e-mail é a única forma de preencher a ficha, haja vista que há um digest SHA-256 que será validado no início do preenchimento."
+        "\n\n**Nota:** a resposta é imediata; o envio é feito em segundo plano pelo comando `enviar_emails`, e o andamento é consultado em _editais/enviar_emails/progresso/_. "
+        "Pedir o envio de novo não reenvia a quem já recebeu (ou ainda está na fila) o mesmo código; apenas os envios que falharam voltam para a fila."
     ),
     "tags": ["Editais - Mensagens"],
     "request": {
@@ -72,28 +75,64 @@ DOCS_ENVIAR_EMAILS_APIVIEW = {
         }
     },
     "responses": {
-        200: OpenApiResponse(
-            description=EMAILS_BOLSA_ENVIADOS,
+        202: OpenApiResponse(
+            description=EMAILS_BOLSA_ENFILEIRADOS,
             examples=[
                 OpenApiExample(
                     "Exemplo de sucesso",
                     value={
-                        "numero_emails_enviados": 10,
+                        "detail": EMAILS_BOLSA_ENFILEIRADOS,
+                        "lote": "ficha_vaga:42",
+                        "numero_emails_solicitados": 10,
+                        "numero_emails_enfileirados": 10,
                         "nome_ultima_pessoa_que_o_email_foi_enviado": "Fulano da Silva",
-                        "detail": EMAILS_BOLSA_ENVIADOS,
                     },
                 )
             ],
         ),
-        400: OpenApiResponse(
-            description=EMAILS_BOLSA_ENVIADOS + " (registros individuais dos erros)"
-        ),
         404: OpenApiResponse(description=ERRO_GET_PESSOAVAGAVALIDACOES),
         500: OpenApiResponse(description=ERRO_ENVIO_EMAIL),
     },
     "auth": [{"type": "bearer"}],
 }
 
+DOCS_ENVIAR_EMAILS_PROGRESSO_APIVIEW = {
+    "summary": "Andamento do envio de e-mails de ficha de uma vaga",
+    "description": (
+        "Retorna quantos e-mails de ficha da vaga registrada na sessão estão em cada situação da fila de saída, "
+        "e os destinatários cujo envio falhou de vez, com o erro."
+        "\n\n**Pré-requisito:** a sessão deve conter 'vaga_id' e 'vaga_id_hash' válidos, criados em _editais/enviar_emails/_."
+        "\n\n**Nota:** os envios que falharam podem ser retomados pedindo o envio de novo em _editais/enviar_emails/_."
+    ),
+    "tags": ["Editais - Mensagens"],
+    "responses": {
+        200: OpenApiResponse(
+            description="Andamento do envio",
+            examples=[
+                OpenApiExample(
+                    "Exemplo de sucesso",
+                    value={
+                        "lote": "ficha_vaga:42",
+                        "pendente": 3,
+                        "enviando": 1,
+                        "enviado": 5,
+                        "erro": 1,
+                        "total": 10,
+                        "falhas": [
+                            {
+                                "destinatario": "fulano@exemplo.com",
+                                "erro": "(550, b'Mailbox unavailable')",
+                            }
+                        ],
+                    },
+                )
+            ],
+        ),
+        400: OpenApiResponse(description=ERRO_SESSAO_INVALIDA),
+    },
+    "auth": [{"type": "bearer"}],
+}
+
 DOCS_LISTAR_EDITAIS_EMISSORES_MENSAGEM_FICHA_APIVIEW = {
     "summary": "Lista editais passíveis de envio de mensagem para preenchimento de ficha",
     "description": (
@@ -330,6 +369,7 @@ DOCS_VALIDAR_VAGA_APIVIEW = {
         "\nPOST: Permite ao validador enviar a validação de um candidato (pontuação, justificativa, arquivos validados e pontuações individuais)."
         "\n\n- Permite somente em período de validação do edital."
         "\n- Paginador disponível via parâmetros `page` e `page_size` no GET."
+        "\n- Com `cursor` (vazio na primeira página), a paginação é por cursor: a resposta traz `next_cursor` e `previous_cursor`, `page_size` vai até 100, `count=0` omite o total e `prefetch=1` inclui a próxima página em `proxima_pagina`."
         "\n- POST aceita pontuação, justificativa e listas de arquivos/documentos com pontuação individual."
         "\n- Erros específicos para fora de prazo, formato de IDs, tipo de documento e pontuação inválida."
     ),
@@ -354,7 +394,28 @@ DOCS_VALIDAR_VAGA_APIVIEW = {
             type=int,
             location=OpenApiParameter.QUERY,
             required=False,
-            description="Tamanho da página (máx. 20, padrão: 10).",
+            description="Tamanho da página (máx. 20, padrão: 10; com cursor, máx. 100).",
+        ),
+        OpenApiParameter(
+            name="cursor",
+            type=str,
+            location=OpenApiParameter.QUERY,
+            required=False,
+            description="Cursor da página (`next_cursor` ou `previous_cursor` da resposta anterior; vazio para a primeira).",
+        ),
+        OpenApiParameter(
+            name="count",
+            type=int,
+            location=OpenApiParameter.QUERY,
+            required=False,
+            description="Com cursor, 0 omite o total de inscritos.",
+        ),
+        OpenApiParameter(
+            name="prefetch",
+            type=int,
+            location=OpenApiParameter.QUERY,
+            required=False,
+            description="Com cursor, 1 inclui os inscritos da próxima página.",
         ),
     ],
     "responses": {
@@ -414,6 +475,67 @@ DOCS_VALIDAR_VAGA_APIVIEW = {
     "auth": [{"type": "bearer"}],
 }
 
+DOCS_VALIDAR_VAGA_LOTE_APIVIEW = {
+    "summary": "Valida vários candidatos de uma vaga de uma vez",
+    "description": (
+        "Recebe em `validacoes` a validação de vários candidatos da vaga, cada uma com os mesmos campos do POST de `validar/vaga/<vaga_id>/`."
+        "\n\n- Permite somente em período de validação do edital."
+        "\n- Até 100 validações por requisição; erro de formato em qualquer uma recusa o lote todo."
+        "\n- Inscrição, documentos e pontuações são conferidos para o lote todo de uma vez; candidato com erro fica de fora, sem impedir a gravação dos demais."
+        "\n- As validações aceitas são gravadas em uma única transação."
+        "\n- A resposta traz, por candidato, `salvo` e a pontuação ou os erros."
+    ),
+    "tags": ["Editais - Validação"],
+    "parameters": [
+        OpenApiParameter(
+            name="vaga_id",
+            type=int,
+            location=OpenApiParameter.PATH,
+            required=True,
+            description="ID da vaga.",
+        ),
+    ],
+    "responses": {
+        200: OpenApiResponse(
+            description=OK_LOTE_VALIDACOES,
+            examples=[
+                OpenApiExample(
+                    "Exemplo de resposta",
+                    value={
+                        "detail": OK_LOTE_VALIDACOES,
+                        "salvos": 1,
+                        "resultados": [
+                            {
+                                "inscrito_id": 9876,
+                                "salvo": True,
+                                "pontuacao": 22.0,
+                                "indeferido": False,
+                            },
+                            {
+                                "inscrito_id": 9877,
+                                "salvo": False,
+                                "erros": {
+                                    "inscrito_id": [ERRO_GET_PESSOAVAGAINSCRICAO]
+                                },
+                            },
+                        ],
+                    },
+                ),
+            ],
+        ),
+        400: OpenApiResponse(
+            description=(
+                ERRO_EDITAL_FORA_PRAZO_VALIDACAO
+                + " ou "
+                + ERRO_POST_PESSOAVAGAVALIDACAO
+            ),
+        ),
+        404: OpenApiResponse(description=ERRO_GET_VAGA),
+    },
+    "request": {"application/json": ValidarVagaLoteSerializer},
+    "auth": [{"type": "bearer"}],
+}
+
 DOCS_EMITIR_MENSAGEM_FICHA_VAGA_APIVIEW = {
     "summary": "Lista candidatos de uma vaga para envio de mensagem de ficha",
     "description": (
@@ -816,6 +938,13 @@ DOCS_RELATORIO_DO_EDITAL_APIVIEW = {
             required=True,
             description="Ano do edital.",
         ),
+        OpenApiParameter(
+            name="stream",
+            type=int,
+            location=OpenApiParameter.QUERY,
+            required=False,
+            description="Com `1`, o CSV é enviado enquanto as inscrições são lidas, já ordenadas pelo banco, sem montar o relatório inteiro na memória.",
+        ),
     ],
     "responses": {
         200: OpenApiResponse(
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class EditaisConfig(AppConfig):
+    name = "cead.editais"
+
+    def ready(self):
+        # Invalidacao do resultado das vagas
+        from . import signals  # noqa: F401
@@ -9,6 +9,7 @@ EMAIL_BOLSA_DUVIDAS_PARA_O_FINANCEIRO = "Dúvidas no preenchimento da ficha?"
 EMAIL_BOLSA_ENDERECO_FICHA = "A ficha deve ser preenchida em"
 EMAIL_BOLSA_ENVIADO = "Mensagem enviada para"
 EMAILS_BOLSA_ENVIADOS = "Mensagens enviadas"
+EMAILS_BOLSA_ENFILEIRADOS = "Mensagens enfileiradas para envio"
 
 # ------------------------------
 # MENSAGENS DE EMAIL - JUSTIFICATIVA
@@ -30,12 +31,14 @@ ERRO_EDITAL_FORA_PRAZO_EMISSAO_MENSAGEM = (
     "O edital está fora do prazo para o envio de mensagem de geração de ficha"
 )
 ERRO_EDITAL_FORA_PRAZO_VALIDACAO = "O edital está fora do prazo de validação"
+ERRO_INSCRITO_REPETIDO_NO_LOTE = "Inscrito repetido no lote de validações"
 ERRO_PONTUACAO_INVALIDA_DOCUMENTO = "Pontuação inválida para o documento"
 ERRO_PONTUACAO_INVALIDA_FRASE_INCOMPLETA = "A pontuação deve estar entre 0 e"
 
 # ------------------------------
 # MENSAGENS DE ERRO - FORMATAÇÃO E POST
 # ------------------------------
+ERRO_CURSOR_INVALIDO = "Cursor de paginação inválido"
 ERRO_POST_FORMATO_ID_INVALIDO = "Formato do identificador de arquivo inválido"
 ERRO_POST_PESSOAVAGAVALIDACAO = "Erro no serializer que valida o candidato"
 ERRO_POST_TIPO_DOCUMENTO_INVALIDO = "Tipo de documento inválido"
@@ -78,6 +81,7 @@ ERRO_NAO_ESTA_NO_GRUPO_VISUALIZADORES_DE_RELATORIO_DE_EDITAIS = (
 # MENSAGENS DE SUCESSO
 # ------------------------------
 OK_DADOS_CANDIDATO = "Informações salvas para o candidato"
+OK_LOTE_VALIDACOES = "Lote de validações processado"
 
 # ------------------------------
 # COMPLETA MENSAGENS DE ERRO COM CONTATO DO SUPORTE
@@ -1,6 +1,7 @@
 from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.permissions import BasePermission
 
+from cead.autenticacao.grupos import esta_em_algum_grupo
 from cead.messages import (
     ERRO_GET_EDITAL,
 )
@@ -24,15 +25,13 @@ class IsEmissorMensagemCriacaoFicha(BasePermission):
     message = ERRO_NAO_ESTA_NO_GRUPO_EMISSORES_DE_MENSAGEM_FICHA
 
     def has_permission(self, request, view):
-        if (
-            request.user
-            and request.user.groups.filter(
-                name__in=[
-                    "Emissores de mensagem para criação de ficha",
-                    "Acadêmico - administradores",
-                    "Financeiro - administradores",
-                ]
-            ).exists()
+        if request.user and esta_em_algum_grupo(
+            request.user,
+            [
+                "Emissores de mensagem para criação de ficha",
+                "Acadêmico - administradores",
+                "Financeiro - administradores",
+            ],
         ):
             return True
         raise PermissionDenied(detail=self.message)
@@ -42,14 +41,12 @@ class IsValidadorDeEditais(BasePermission):
     message = ERRO_NAO_ESTA_NO_GRUPO_VALIDADORES_DE_EDITAIS
 
     def has_permission(self, request, view):
-        if (
-            request.user
-            and request.user.groups.filter(
-                name__in=[
-                    "Validadores de editais",
-                    "Acadêmico - administradores",
-                ]
-            ).exists()
+        if request.user and esta_em_algum_grupo(
+            request.user,
+            [
+                "Validadores de editais",
+                "Acadêmico - administradores",
+            ],
         ):
             return True
         raise PermissionDenied(detail=self.message)
@@ -59,15 +56,13 @@ class IsAssociadorEditalPessoa(BasePermission):
     message = ERRO_NAO_ESTA_NO_GRUPO_ASSOCIADORES_DE_EDITAIS_PESSOAS
 
     def has_permission(self, request, view):
-        if (
-            request.user
-            and request.user.groups.filter(
-                name__in=[
-                    "Associadores de editais e pessoas",
-                    "Acadêmico - administradores",
-                    "Financeiro - administradores",
-                ]
-            ).exists()
+        if request.user and esta_em_algum_grupo(
+            request.user,
+            [
+                "Associadores de editais e pessoas",
+                "Acadêmico - administradores",
+                "Financeiro - administradores",
+            ],
         ):
             return True
         raise PermissionDenied(detail=self.message)
@@ -77,15 +72,13 @@ class IsVisualizadordeRelatorioDeEditais(BasePermission):
     message = ERRO_NAO_ESTA_NO_GRUPO_VISUALIZADORES_DE_RELATORIO_DE_EDITAIS
 
     def has_permission(self, request, view):
-        if (
-            request.user
-            and request.user.groups.filter(
-                name__in=[
-                    "Visualizadores de relatório de editais",
-                    "Acadêmico - administradores",
-                    "Financeiro - administradores",
-                ]
-            ).exists()
+        if request.user and esta_em_algum_grupo(
+            request.user,
+            [
+                "Visualizadores de relatório de editais",
+                "Acadêmico - administradores",
+                "Financeiro - administradores",
+            ],
         ):
             return True
         raise PermissionDenied(detail=self.message)
@@ -96,26 +89,23 @@ class PodeAcessarEditalEspecifico(BasePermission):
 
     def has_permission(self, request, view):
         # Administradores têm acesso total
-        if request.user.groups.filter(name="Acadêmico - administradores").exists():
+        if esta_em_algum_grupo(request.user, ["Acadêmico - administradores"]):
             return True
 
         # Para outros usuários, verificar se eles estão vinculados ao edital
-        try:
-            ano = view.kwargs.get("ano")
-            numero = view.kwargs.get("numero")
-            edital = EdEdital.objects.get(ano=ano, numero=numero)
-
-            try:
-                pessoa = CmPessoa.objects.get(cpf=request.user.username)
-            except CmPessoa.DoesNotExist:
-                raise PermissionDenied(detail=ERRO_GET_PESSOA)
-
-            if EdEditalPessoa.objects.filter(
-                cm_pessoa=pessoa, ed_edital=edital
-            ).exists():
-                return True
-
-            raise PermissionDenied(detail=self.message)
+        ano = view.kwargs.get("ano")
+        numero = view.kwargs.get("numero")
+        # Uma consulta para o caso comum (vinculado); as de baixo so' para
+        # escolher o erro
+        if EdEditalPessoa.objects.filter(
+            cm_pessoa__cpf=request.user.username,
+            ed_edital__ano=ano,
+            ed_edital__numero=numero,
+        ).exists():
+            return True
 
-        except EdEdital.DoesNotExist:
+        if not EdEdital.objects.filter(ano=ano, numero=numero).exists():
             raise NotFound(detail=ERRO_GET_EDITAL)
+        if not CmPessoa.objects.filter(cpf=request.user.username).exists():
+            raise PermissionDenied(detail=ERRO_GET_PESSOA)
+        raise PermissionDenied(detail=self.message)
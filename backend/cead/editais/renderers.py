@@ -1,3 +1,5 @@
+import csv
+
 from rest_framework.renderers import BaseRenderer
 
 
@@ -10,7 +12,6 @@ class CSVRenderer(BaseRenderer):
         if isinstance(data, dict) and "detail" in data:
             return f'Erro: {data["detail"]}'.encode("utf-8")
 
-        import csv
         from io import StringIO
 
         output = StringIO()
@@ -28,3 +29,28 @@ class CSVRenderer(BaseRenderer):
                 writer.writerow(row.values())
 
         return output.getvalue().encode("utf-8")
+
+
+class _Eco:
+    """
+    "Arquivo" que devolve o que recebe: csv.writer formata a linha e ela e'
+    entregue direto ao gerador, sem buffer
+    """
+
+    def write(self, valor):
+        return valor
+
+
+def gerar_csv(linhas):
+    """
+    O CSV do CSVRenderer (BOM, ";" e cabecalho com as chaves da primeira
+    linha), uma linha por vez, para StreamingHttpResponse
+    """
+    writer = csv.writer(_Eco(), delimiter=";", quotechar='"', quoting=csv.QUOTE_MINIMAL)
+    yield "\ufeff"
+    cabecalho = False
+    for linha in linhas:
+        if not cabecalho:
+            yield writer.writerow(linha.keys())
+            cabecalho = True
+        yield writer.writerow(linha.values())
@@ -0,0 +1,263 @@
+import uuid
+
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from cead.models import (
+    EdPessoaVagaCota,
+    EdPessoaVagaInscricao,
+    EdPessoaVagaJustificativa,
+    EdPessoaVagaValidacao,
+    EdPessoaVagaValidacaoIndeferimento,
+    EdVaga,
+    EdVagaResultado,
+)
+
+from .utils import (
+    get_sort_score,
+    get_status_order,
+    montar_linha_relatorio,
+    processar_inscricao_para_relatorio,
+)
+
+# Resultado das vagas (EdVagaResultado): status, pontuacao real e ordem de cada
+# inscricao, calculados por processar_inscricao_para_relatorio uma vez e lidos
+# pelos relatorios e pela emissao da ficha. Uma validacao apaga o resultado da
+# vaga, que e' regerado na proxima leitura; depois de data_fim_validacao as
+# validacoes estao encerradas e o resultado fica congelado
+# A invalidacao so' trava a vaga se ha' resultado gravado para apagar: quem
+# finaliza a inscricao nao espera o relatorio que esta' gerando o resultado.
+# A versao da vaga no cache compartilhado, trocada a cada invalidacao, avisa
+# quem estava gerando que a vaga mudou durante o calculo
+cache = caches["compartilhado"]
+
+ORDEM_RESULTADO = ("ordem_status", "-pontuacao_ordenacao")
+TENTATIVAS_GERAR_RESULTADO = 3
+
+
+def _chave_versao(vaga_id):
+    return f"editais:resultado_vaga:{vaga_id}:versao"
+
+
+def _versoes(vaga_ids):
+    chaves = {_chave_versao(vaga_id): vaga_id for vaga_id in vaga_ids}
+    return {chaves[chave]: versao for chave, versao in cache.get_many(chaves).items()}
+
+
+def calcular_resultados(vaga_ids):
+    """
+    EdVagaResultado (sem gravar) de todas as inscricoes das vagas, com uma
+    consulta por tabela; os dicionarios de cada vaga, que
+    processar_inscricao_para_relatorio recebe, sao separados na memoria
+    """
+    validacoes = {}
+    for validacao in EdPessoaVagaValidacao.objects.filter(
+        ed_vaga_id__in=vaga_ids
+    ).select_related("cm_pessoa_responsavel_validacao"):
+        validacoes.setdefault(validacao.ed_vaga_id, {})[
+            validacao.cm_pessoa_id
+        ] = validacao
+
+    justificativas = {}
+    for justificativa in EdPessoaVagaJustificativa.objects.filter(
+        ed_vaga_id__in=vaga_ids
+    ).select_related("cm_pessoa_responsavel_justificativa"):
+        justificativas.setdefault(justificativa.ed_vaga_id, {})[
+            justificativa.cm_pessoa_id
+        ] = justificativa
+
+    cotas = {}
+    for cota in EdPessoaVagaCota.objects.filter(
+        ed_vaga_cota__ed_vaga_id__in=vaga_ids
+    ).select_related("ed_vaga_cota__ed_cota"):
+        cotas.setdefault(cota.ed_vaga_cota.ed_vaga_id, {})[cota.cm_pessoa_id] = cota
+
+    indeferidos = {}
+    for vaga_id, pessoa_id in EdPessoaVagaValidacaoIndeferimento.objects.filter(
+        ed_pessoa_vaga_validacao__ed_vaga_id__in=vaga_ids
+    ).values_list(
+        "ed_pessoa_vaga_validacao__ed_vaga_id",
+        "ed_pessoa_vaga_validacao__cm_pessoa_id",
+    ):
+        indeferidos.setdefault(vaga_id, set()).add(pessoa_id)
+
+    agora = timezone.now()
+    resultados = []
+    for inscricao in EdPessoaVagaInscricao.objects.filter(
+        ed_vaga_id__in=vaga_ids
+    ).select_related("cm_pessoa"):
+        vaga_id = inscricao.ed_vaga_id
+        pessoa_id = inscricao.cm_pessoa_id
+        dados = processar_inscricao_para_relatorio(
+            inscricao,
+            validacoes.get(vaga_id, {}),
+            justificativas.get(vaga_id, {}),
+            cotas.get(vaga_id, {}),
+            indeferidos.get(vaga_id, set()),
+        )
+        validacao = validacoes.get(vaga_id, {}).get(pessoa_id)
+        justificativa = justificativas.get(vaga_id, {}).get(pessoa_id)
+        cota = cotas.get(vaga_id, {}).get(pessoa_id)
+        resultados.append(
+            EdVagaResultado(
+                ed_vaga_id=vaga_id,
+                ed_pessoa_vaga_inscricao=inscricao,
+                ed_pessoa_vaga_validacao=validacao,
+                status_validacao=dados["status_validacao"],
+                ordem_status=get_status_order(dados["status_validacao"]),
+                pontuacao_real=(
+                    None if dados["pontuacao_real"] == "-" else dados["pontuacao_real"]
+                ),
+                pontuacao_ordenacao=get_sort_score(dados),
+                responsavel=dados["responsavel"],
+                data_validacao=dados["data_validacao"],
+                justificativa=justificativa.justificativa if justificativa else None,
+                cota=cota.ed_vaga_cota.ed_cota.cota if cota else None,
+                gerado_em=agora,
+            )
+        )
+    return resultados
+
+
+def _travar_vagas(vagas):
+    """
+    Trava as linhas das vagas ate' o fim da transacao: quem gera o resultado e
+    quem o apaga depois de uma validacao nao se cruzam, entao um resultado
+    calculado com dados antigos nao sobrevive a' validacao
+    """
+    return list(
+        vagas.select_for_update(of=("self",))
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+
+
+def _vagas_com_resultado(vaga_ids):
+    return set(
+        EdVagaResultado.objects.filter(ed_vaga_id__in=vaga_ids)
+        .values_list("ed_vaga_id", flat=True)
+        .distinct()
+    )
+
+
+def gerar_resultados(vaga_ids, somente_sem_resultado=True):
+    """
+    Grava o resultado das vagas; com somente_sem_resultado, so' das que nao
+    tem (nunca geradas ou apagadas por uma validacao), senao regera todas,
+    inclusive as congeladas
+    Vagas invalidadas durante o calculo sao calculadas de novo, ate'
+    TENTATIVAS_GERAR_RESULTADO vezes; na ultima o resultado fica, e a
+    proxima invalidacao (que ja' encontra as linhas) o apaga
+    """
+    vaga_ids = set(vaga_ids)
+    for tentativa in range(TENTATIVAS_GERAR_RESULTADO):
+        vaga_ids = _gravar_resultados(vaga_ids, somente_sem_resultado)
+        if not vaga_ids or tentativa == TENTATIVAS_GERAR_RESULTADO - 1:
+            return
+        for vaga_id in vaga_ids:
+            _apagar_resultado_vaga(vaga_id)
+        somente_sem_resultado = True
+
+
+def _gravar_resultados(vaga_ids, somente_sem_resultado):
+    """
+    Grava o resultado das vagas e retorna as que foram invalidadas durante o
+    calculo, quando ainda nao havia linhas para a invalidacao apagar
+    """
+    if somente_sem_resultado:
+        vaga_ids = vaga_ids - _vagas_com_resultado(vaga_ids)
+    if not vaga_ids:
+        return set()
+
+    with transaction.atomic():
+        _travar_vagas(EdVaga.objects.filter(id__in=vaga_ids))
+        if somente_sem_resultado:
+            # Outro processo pode ter gerado enquanto esperavamos a trava
+            vaga_ids -= _vagas_com_resultado(vaga_ids)
+        else:
+            EdVagaResultado.objects.filter(ed_vaga_id__in=vaga_ids).delete()
+        versoes = _versoes(vaga_ids)
+        EdVagaResultado.objects.bulk_create(
+            calcular_resultados(vaga_ids), batch_size=1000
+        )
+
+    versoes_atuais = _versoes(vaga_ids)
+    return {
+        vaga_id
+        for vaga_id in vaga_ids
+        if versoes_atuais.get(vaga_id) != versoes.get(vaga_id)
+    }
+
+
+def invalidar_resultado_vaga(vaga_id):
+    """
+    Apaga o resultado da vaga, para ser regerado na proxima leitura; depois de
+    data_fim_validacao o resultado da vaga fica como esta'
+    """
+    cache.set(_chave_versao(vaga_id), uuid.uuid4().hex, timeout=None)
+    # Sem linhas nao ha' o que apagar nem trava a esperar; quem estiver
+    # gerando o resultado confere a versao depois de gravar
+    if EdVagaResultado.objects.filter(ed_vaga_id=vaga_id).exists():
+        _apagar_resultado_vaga(vaga_id)
+
+
+def _apagar_resultado_vaga(vaga_id):
+    with transaction.atomic():
+        if _travar_vagas(
+            EdVaga.objects.filter(
+                id=vaga_id, ed_edital__data_fim_validacao__gte=timezone.now()
+            )
+        ):
+            EdVagaResultado.objects.filter(ed_vaga_id=vaga_id).delete()
+
+
+def resultados_das_vagas(vaga_ids):
+    """
+    Resultado das vagas, ja' na ordem do relatorio, gerando o que faltar
+    """
+    gerar_resultados(vaga_ids)
+    return (
+        EdVagaResultado.objects.filter(ed_vaga_id__in=vaga_ids)
+        .select_related(
+            "ed_pessoa_vaga_inscricao__cm_pessoa", "ed_pessoa_vaga_inscricao__ed_vaga"
+        )
+        .order_by(*ORDEM_RESULTADO, "ed_vaga_id", "ed_pessoa_vaga_inscricao_id")
+    )
+
+
+def linha_relatorio(resultado, incluir_vaga=False):
+    """
+    Linha do relatorio (processar_inscricao_para_relatorio) a partir do
+    resultado gravado
+    """
+    return montar_linha_relatorio(
+        resultado.ed_pessoa_vaga_inscricao,
+        resultado.status_validacao,
+        resultado.pontuacao_real,
+        resultado.responsavel,
+        resultado.data_validacao,
+        resultado.justificativa,
+        resultado.cota,
+        incluir_vaga,
+    )
+
+
+def validados_da_vaga(vaga_id):
+    """
+    Validacoes da vaga na ordem do resultado (maior pontuacao primeiro, as sem
+    pontuacao no fim), com o codigo gravado, para a emissao da ficha
+    """
+    gerar_resultados([vaga_id])
+    return [
+        resultado.ed_pessoa_vaga_validacao
+        for resultado in EdVagaResultado.objects.filter(
+            ed_vaga_id=vaga_id, ed_pessoa_vaga_validacao__isnull=False
+        )
+        .select_related(
+            "ed_pessoa_vaga_validacao__cm_pessoa",
+            "ed_pessoa_vaga_validacao__ed_vaga__ed_edital",
+            "ed_pessoa_vaga_validacao__codigo_validacao",
+        )
+        .order_by(*ORDEM_RESULTADO, "ed_pessoa_vaga_inscricao_id")
+    ]
@@ -1,7 +1,10 @@
+from collections import Counter
 from typing import Optional
 
 from django.db import transaction
 from django.contrib.auth.models import User
+from django.db.models import CharField, F, FloatField, Value
+from django.db.models.functions import Cast
 from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.exceptions import NotFound
@@ -19,6 +22,7 @@ from cead.models import (
     EdPessoaVagaInscricao,
     EdPessoaVagaJustificativa,
     EdPessoaVagaValidacao,
+    EdPessoaVagaValidacaoCodigo,
     EdPessoaVagaValidacaoIndeferimento,
     EdVaga,
 )
@@ -26,11 +30,13 @@ from .messages import (
     ERRO_EDITAL_FORA_PRAZO_VALIDACAO,
     ERRO_GET_PESSOA,
     ERRO_GET_PESSOAVAGAINSCRICAO,
+    ERRO_INSCRITO_REPETIDO_NO_LOTE,
     ERRO_PONTUACAO_INVALIDA_DOCUMENTO,
     ERRO_PONTUACAO_INVALIDA_FRASE_INCOMPLETA,
     ERRO_POST_FORMATO_ID_INVALIDO,
     ERRO_POST_TIPO_DOCUMENTO_INVALIDO,
 )
+from .resultado import invalidar_resultado_vaga
 from .utils import calcular_maximo_de_pontos
 
 
@@ -144,6 +150,101 @@ class ValidarVagaGetSerializer(serializers.ModelSerializer):
         return calcular_maximo_de_pontos(obj)
 
 
+# Validacao: tipo do documento -> (modelo do upload, modelo da pontuacao dada
+# pelo validador, campo da vaga com a pontuacao maxima do documento)
+MODELOS_DOCUMENTO = {
+    "checkbox": (
+        EdPessoaVagaCampoCheckboxUpload,
+        EdPessoaVagaCampoCheckboxPontuacao,
+        "pontuacao",
+    ),
+    "combobox": (
+        EdPessoaVagaCampoComboboxUpload,
+        EdPessoaVagaCampoComboboxPontuacao,
+        "pontuacao",
+    ),
+    "datebox": (
+        EdPessoaVagaCampoDateboxUpload,
+        EdPessoaVagaCampoDateboxPontuacao,
+        "pontuacao_maxima",
+    ),
+}
+
+
+def separar_id_documento(full_id):
+    """
+    "checkbox-70" -> ("checkbox", 70); ValueError fora desse formato
+    """
+    tipo, separador, id_str = full_id.partition("-")
+    if not separador:
+        raise ValueError(full_id)
+    return tipo, int(id_str)
+
+
+def get_uploads_da_vaga(vaga, pessoa_ids):
+    """
+    {(tipo, id do upload): (pessoa_id, id do campo da pessoa, pontuacao
+    maxima do documento)} dos tres tipos, em uma consulta; so' os uploads
+    dos pessoa_ids na vaga
+    """
+    consultas = []
+    for tipo, (modelo_upload, _, campo_pontuacao) in MODELOS_DOCUMENTO.items():
+        pessoa_campo = f"ed_pessoa_vaga_campo_{tipo}"
+        vaga_campo = f"{pessoa_campo}__ed_vaga_campo_{tipo}"
+        consultas.append(
+            modelo_upload.objects.filter(
+                **{
+                    f"{pessoa_campo}__cm_pessoa_id__in": pessoa_ids,
+                    f"{vaga_campo}__ed_vaga": vaga,
+                }
+            )
+            .annotate(
+                tipo=Value(tipo, output_field=CharField()),
+                pessoa_id=F(f"{pessoa_campo}__cm_pessoa_id"),
+                pessoa_campo_id=F(f"{pessoa_campo}_id"),
+                pontuacao_do_campo=Cast(
+                    f"{vaga_campo}__{campo_pontuacao}", FloatField()
+                ),
+            )
+            .values_list(
+                "tipo", "id", "pessoa_id", "pessoa_campo_id", "pontuacao_do_campo"
+            )
+        )
+    uploads = consultas[0].union(*consultas[1:], all=True)
+    return {
+        (tipo, id): (pessoa_id, pessoa_campo_id, pontuacao_do_campo or 0)
+        for tipo, id, pessoa_id, pessoa_campo_id, pontuacao_do_campo in uploads
+    }
+
+
+def gravar_pontuacoes_documentos(modelo_pontuacao, campo, pontuacoes):
+    """
+    Grava {id do campo da pessoa: pontuacao} em modelo_pontuacao, como um
+    update_or_create por documento, mas com uma consulta pelas pontuacoes
+    existentes, um UPDATE e um INSERT. As tabelas de pontuacao nao tem
+    restricao unica pelo campo da pessoa, o que impede o ON CONFLICT
+    """
+    existentes = {}
+    for objeto in modelo_pontuacao.objects.filter(
+        **{f"{campo}__in": pontuacoes}
+    ).order_by("id"):
+        existentes.setdefault(getattr(objeto, campo), objeto)
+
+    alteradas = []
+    novas = []
+    for pessoa_campo_id, pontuacao in pontuacoes.items():
+        objeto = existentes.get(pessoa_campo_id)
+        if objeto is None:
+            novas.append(
+                modelo_pontuacao(**{campo: pessoa_campo_id, "pontuacao": pontuacao})
+            )
+        else:
+            objeto.pontuacao = pontuacao
+            alteradas.append(objeto)
+    modelo_pontuacao.objects.bulk_update(alteradas, ["pontuacao"])
+    modelo_pontuacao.objects.bulk_create(novas)
+
+
 class ValidarVagaPostSerializer(serializers.Serializer):
     inscrito_id = serializers.IntegerField()
     justificativa = serializers.CharField(allow_blank=True, required=False)
@@ -336,69 +437,38 @@ class ValidarVagaPostSerializer(serializers.Serializer):
         if not pontuacoes_documentos:
             return
 
-        # Mapeamento: tipo -> (modelo_upload, modelo_pontuacao, campo_relacionado, vaga)
-        modelos = {
-            "checkbox": (
-                EdPessoaVagaCampoCheckboxUpload,
-                EdPessoaVagaCampoCheckboxPontuacao,
-                "ed_pessoa_vaga_campo_checkbox",
-                "ed_vaga_campo_checkbox__ed_vaga",
-            ),
-            "combobox": (
-                EdPessoaVagaCampoComboboxUpload,
-                EdPessoaVagaCampoComboboxPontuacao,
-                "ed_pessoa_vaga_campo_combobox",
-                "ed_vaga_campo_combobox__ed_vaga",
-            ),
-            "datebox": (
-                EdPessoaVagaCampoDateboxUpload,
-                EdPessoaVagaCampoDateboxPontuacao,
-                "ed_pessoa_vaga_campo_datebox",
-                "ed_vaga_campo_datebox__ed_vaga",
-            ),
-        }
+        # Todos os uploads do candidato na vaga, em uma consulta: so' recebe
+        # pontuacao o documento que e' dele e desta vaga
+        uploads = get_uploads_da_vaga(inscricao.ed_vaga, [inscricao.cm_pessoa_id])
 
-        with transaction.atomic():
-            # Exemplo de full_id -> checkbox-70
-            for full_id, pontuacao in pontuacoes_documentos.items():
-                try:
-                    tipo, id_str = full_id.split("-")
-                    upload_id = int(id_str)
-                    pontuacao = None if float(pontuacao) == 0.0 else float(pontuacao)
-                except (ValueError, TypeError):
-                    continue
-
-                # Segurança: limpar lixo do post
-                if tipo not in modelos:
-                    continue
-
-                # Associa o item do laço com o modelo que se pretende salvar
-                modelo_upload, modelo_pontuacao, campo_relacionado, campo_vaga = (
-                    modelos[tipo]
-                )
+        # tipo -> {id do campo da pessoa: pontuacao}
+        pontuacoes = {tipo: {} for tipo in MODELOS_DOCUMENTO}
 
-                # Filtro para buscar se há upload da pessoa/vaga/campo
-                filtro = {
-                    "id": upload_id,
-                    f"{campo_relacionado}__cm_pessoa": inscricao.cm_pessoa,
-                    f"{campo_relacionado}__{campo_vaga}": inscricao.ed_vaga,
-                }
+        # Exemplo de full_id -> checkbox-70
+        for full_id, pontuacao in pontuacoes_documentos.items():
+            try:
+                tipo, upload_id = separar_id_documento(full_id)
+                pontuacao = None if float(pontuacao) == 0.0 else float(pontuacao)
+            except (ValueError, TypeError):
+                continue
 
-                upload = (
-                    modelo_upload.objects.filter(**filtro)
-                    .select_related(campo_relacionado)
-                    .first()
-                )
-                # Se não tem upload, não faz sentido salvar a pontuação
-                if not upload:
-                    continue
+            # Se não tem upload (ou o tipo é lixo do post), não faz sentido
+            # salvar a pontuação
+            upload = uploads.get((tipo, upload_id))
+            if not upload:
+                continue
 
-                objeto_relacionado = getattr(upload, campo_relacionado)
+            _, pessoa_campo_id, _ = upload
+            pontuacoes[tipo][pessoa_campo_id] = pontuacao
 
-                modelo_pontuacao.objects.update_or_create(
-                    **{campo_relacionado: objeto_relacionado},
-                    defaults={"pontuacao": pontuacao},
-                )
+        with transaction.atomic():
+            for tipo, (_, modelo_pontuacao, _) in MODELOS_DOCUMENTO.items():
+                if pontuacoes[tipo]:
+                    gravar_pontuacoes_documentos(
+                        modelo_pontuacao,
+                        f"ed_pessoa_vaga_campo_{tipo}_id",
+                        pontuacoes[tipo],
+                    )
 
     def save(self):
         inscricao = self.validated_data["inscricao"]
@@ -496,6 +566,270 @@ class ValidarVagaPostSerializer(serializers.Serializer):
         }
 
 
+TAMANHO_MAXIMO_LOTE_VALIDACAO = 100
+
+
+class ValidarVagaLoteItemSerializer(ValidarVagaPostSerializer):
+    """
+    Validacao de um candidato dentro do lote: aqui so' o formato; o que
+    depende do banco e' conferido de uma vez para o lote todo
+    """
+
+    def validate(self, data):
+        for campo in ("arquivo_valido", "pontuacoes_documentos"):
+            for full_id in data.get(campo, []):
+                try:
+                    tipo, _ = separar_id_documento(full_id)
+                except ValueError:
+                    raise serializers.ValidationError(
+                        {campo: [f"{ERRO_POST_FORMATO_ID_INVALIDO}: {full_id}"]}
+                    )
+                if tipo not in MODELOS_DOCUMENTO:
+                    raise serializers.ValidationError(
+                        {campo: [f"{ERRO_POST_TIPO_DOCUMENTO_INVALIDO}: {tipo}"]}
+                    )
+        return data
+
+
+class ValidarVagaLoteSerializer(serializers.Serializer):
+    """
+    Validacoes de varios candidatos da vaga: a inscricao, os uploads (com a
+    pontuacao maxima do campo), o maximo da vaga e o responsavel sao lidos
+    uma vez para o lote; o que passa e' gravado em uma transacao, com
+    comandos em lote. Candidato com erro fica de fora sem barrar os demais
+    """
+
+    validacoes = ValidarVagaLoteItemSerializer(
+        many=True, allow_empty=False, max_length=TAMANHO_MAXIMO_LOTE_VALIDACAO
+    )
+
+    def validate(self, data):
+        try:
+            data["responsavel"] = CmPessoa.objects.get(
+                cpf=self.context["request"].user.username
+            )
+        except CmPessoa.DoesNotExist:
+            raise serializers.ValidationError({"non_field_errors": [ERRO_GET_PESSOA]})
+        return data
+
+    def get_documentos(self, validacao, campo, uploads):
+        """
+        Documentos de validacao[campo] que sao uploads do proprio inscrito
+        na vaga, como (full_id, tipo, id do upload, upload); os demais sao
+        ignorados, como na validacao individual
+        """
+        documentos = []
+        for full_id in validacao.get(campo, []):
+            tipo, id = separar_id_documento(full_id)
+            upload = uploads.get((tipo, id))
+            if upload and upload[0] == validacao["inscrito_id"]:
+                documentos.append((full_id, tipo, id, upload))
+        return documentos
+
+    def conferir(self, validacao, inscritos, repetidos, uploads, maximo):
+        """
+        Erros da validacao de um candidato, no formato de serializer.errors;
+        sem erros, grava a pontuacao total em validacao["pontuacao"]
+        """
+        inscrito_id = validacao["inscrito_id"]
+        if inscrito_id in repetidos:
+            return {"inscrito_id": [ERRO_INSCRITO_REPETIDO_NO_LOTE]}
+        if inscrito_id not in inscritos:
+            return {"inscrito_id": [ERRO_GET_PESSOAVAGAINSCRICAO]}
+
+        erros = {}
+        pontuacoes_documentos = validacao.get("pontuacoes_documentos", {})
+        for full_id, _, _, (_, _, pontuacao_maxima) in self.get_documentos(
+            validacao, "pontuacoes_documentos", uploads
+        ):
+            pontuacao_informada = pontuacoes_documentos[full_id]
+            if pontuacao_informada < 0 or pontuacao_informada > pontuacao_maxima:
+                erros.setdefault("pontuacoes_documentos", []).append(
+                    f"{ERRO_PONTUACAO_INVALIDA_DOCUMENTO} {full_id}. "
+                    f"{ERRO_PONTUACAO_INVALIDA_FRASE_INCOMPLETA} {pontuacao_maxima}"
+                )
+
+        pontuacao = round(sum(float(p) for p in pontuacoes_documentos.values()), 2)
+        if pontuacao < 0 or pontuacao > maximo:
+            erros["pontuacao"] = [
+                f"{ERRO_PONTUACAO_INVALIDA_FRASE_INCOMPLETA} {maximo}."
+            ]
+
+        if not erros:
+            validacao["pontuacao"] = pontuacao
+        return erros
+
+    def _gravar(self, vaga, aceitas, uploads, responsavel):
+        # Uploads validos e pontuacoes dos documentos, por tipo
+        validos = {tipo: [] for tipo in MODELOS_DOCUMENTO}
+        pontuacoes = {tipo: {} for tipo in MODELOS_DOCUMENTO}
+        for validacao in aceitas:
+            for _, tipo, upload_id, _ in self.get_documentos(
+                validacao, "arquivo_valido", uploads
+            ):
+                validos[tipo].append(upload_id)
+            for full_id, tipo, _, (_, pessoa_campo_id, _) in self.get_documentos(
+                validacao, "pontuacoes_documentos", uploads
+            ):
+                pontuacao = float(validacao["pontuacoes_documentos"][full_id])
+                pontuacoes[tipo][pessoa_campo_id] = (
+                    None if pontuacao == 0.0 else pontuacao
+                )
+
+        for tipo, (modelo_upload, modelo_pontuacao, _) in MODELOS_DOCUMENTO.items():
+            if validos[tipo]:
+                modelo_upload.objects.filter(id__in=validos[tipo]).update(validado=True)
+            if pontuacoes[tipo]:
+                gravar_pontuacoes_documentos(
+                    modelo_pontuacao,
+                    f"ed_pessoa_vaga_campo_{tipo}_id",
+                    pontuacoes[tipo],
+                )
+
+        pessoa_ids = [validacao["inscrito_id"] for validacao in aceitas]
+        agora = timezone.now()
+
+        # Validacoes: todo indeferido e zerado recebe nota None
+        existentes = {}
+        for objeto in EdPessoaVagaValidacao.objects.filter(
+            ed_vaga=vaga, cm_pessoa_id__in=pessoa_ids
+        ).order_by("id"):
+            existentes.setdefault(objeto.cm_pessoa_id, objeto)
+
+        validacoes_por_pessoa = {}
+        alteradas = []
+        novas = []
+        for validacao in aceitas:
+            pontuacao = validacao["pontuacao"]
+            objeto = existentes.get(validacao["inscrito_id"])
+            if objeto is None:
+                objeto = EdPessoaVagaValidacao(
+                    cm_pessoa_id=validacao["inscrito_id"], ed_vaga=vaga
+                )
+                novas.append(objeto)
+            else:
+                alteradas.append(objeto)
+            objeto.cm_pessoa_responsavel_validacao = responsavel
+            objeto.pontuacao = (
+                None if validacao.get("indeferido") or pontuacao == 0 else pontuacao
+            )
+            # bulk_update nao aplica o auto_now
+            objeto.data = agora
+            validacoes_por_pessoa[validacao["inscrito_id"]] = objeto
+        EdPessoaVagaValidacao.objects.bulk_update(
+            alteradas, ["cm_pessoa_responsavel_validacao", "pontuacao", "data"]
+        )
+        EdPessoaVagaValidacao.objects.bulk_create(novas)
+        EdPessoaVagaValidacaoCodigo.gravar(alteradas + novas)
+
+        # Indeferimentos
+        indeferidas = set()
+        deferidas = set()
+        for validacao in aceitas:
+            validacao_id = validacoes_por_pessoa[validacao["inscrito_id"]].id
+            if validacao.get("indeferido"):
+                indeferidas.add(validacao_id)
+            else:
+                deferidas.add(validacao_id)
+        EdPessoaVagaValidacaoIndeferimento.objects.filter(
+            ed_pessoa_vaga_validacao_id__in=deferidas
+        ).delete()
+        ja_indeferidas = set(
+            EdPessoaVagaValidacaoIndeferimento.objects.filter(
+                ed_pessoa_vaga_validacao_id__in=indeferidas
+            ).values_list("ed_pessoa_vaga_validacao_id", flat=True)
+        )
+        EdPessoaVagaValidacaoIndeferimento.objects.bulk_create(
+            EdPessoaVagaValidacaoIndeferimento(ed_pessoa_vaga_validacao_id=validacao_id)
+            for validacao_id in indeferidas - ja_indeferidas
+        )
+
+        # Justificativas: em branco remove
+        justificativas = {
+            validacao["inscrito_id"]: validacao.get("justificativa", "")
+            for validacao in aceitas
+        }
+        EdPessoaVagaJustificativa.objects.filter(
+            ed_vaga=vaga,
+            cm_pessoa_id__in=[
+                pessoa_id
+                for pessoa_id, justificativa in justificativas.items()
+                if not (justificativa and justificativa.strip())
+            ],
+        ).delete()
+        justificativas = {
+            pessoa_id: justificativa
+            for pessoa_id, justificativa in justificativas.items()
+            if justificativa and justificativa.strip()
+        }
+        existentes = {}
+        for objeto in EdPessoaVagaJustificativa.objects.filter(
+            ed_vaga=vaga, cm_pessoa_id__in=justificativas
+        ).order_by("id"):
+            existentes.setdefault(objeto.cm_pessoa_id, objeto)
+
+        alteradas = []
+        novas = []
+        for pessoa_id, justificativa in justificativas.items():
+            objeto = existentes.get(pessoa_id)
+            if objeto is None:
+                objeto = EdPessoaVagaJustificativa(cm_pessoa_id=pessoa_id, ed_vaga=vaga)
+                novas.append(objeto)
+            else:
+                alteradas.append(objeto)
+            objeto.cm_pessoa_responsavel_justificativa = responsavel
+            objeto.justificativa = justificativa
+        EdPessoaVagaJustificativa.objects.bulk_update(
+            alteradas, ["cm_pessoa_responsavel_justificativa", "justificativa"]
+        )
+        EdPessoaVagaJustificativa.objects.bulk_create(novas)
+
+    def save(self):
+        vaga = self.context["vaga"]
+        validacoes = self.validated_data["validacoes"]
+
+        contagem = Counter(validacao["inscrito_id"] for validacao in validacoes)
+        repetidos = {pessoa_id for pessoa_id, total in contagem.items() if total > 1}
+        inscritos = set(
+            EdPessoaVagaInscricao.objects.filter(
+                ed_vaga=vaga, cm_pessoa_id__in=list(contagem)
+            ).values_list("cm_pessoa_id", flat=True)
+        )
+        uploads = get_uploads_da_vaga(vaga, list(inscritos))
+        maximo = calcular_maximo_de_pontos(vaga)
+
+        resultados = []
+        aceitas = []
+        for validacao in validacoes:
+            erros = self.conferir(validacao, inscritos, repetidos, uploads, maximo)
+            if erros:
+                resultados.append(
+                    {
+                        "inscrito_id": validacao["inscrito_id"],
+                        "salvo": False,
+                        "erros": erros,
+                    }
+                )
+                continue
+            aceitas.append(validacao)
+            resultados.append(
+                {
+                    "inscrito_id": validacao["inscrito_id"],
+                    "salvo": True,
+                    "pontuacao": validacao["pontuacao"],
+                    "indeferido": validacao.get("indeferido", False),
+                }
+            )
+
+        if aceitas:
+            with transaction.atomic():
+                self._gravar(vaga, aceitas, uploads, self.validated_data["responsavel"])
+                # Os comandos em lote nao disparam os sinais que apagam o
+                # resultado da vaga (editais/signals.py)
+                transaction.on_commit(lambda: invalidar_resultado_vaga(vaga.id))
+        return resultados
+
+
 ## BLOCO: relatórios
 class ListarEditaisRelatorioSerializer(serializers.ModelSerializer):
     edital_str = serializers.SerializerMethodField()
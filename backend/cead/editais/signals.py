@@ -0,0 +1,60 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from cead.models import (
+    EdPessoaVagaCota,
+    EdPessoaVagaInscricao,
+    EdPessoaVagaJustificativa,
+    EdPessoaVagaValidacao,
+    EdPessoaVagaValidacaoCodigo,
+    EdPessoaVagaValidacaoIndeferimento,
+    EdVagaCota,
+)
+from cead.utils import on_commit_unico
+
+from .resultado import invalidar_resultado_vaga
+
+
+def _invalidar_apos_commit(vaga_id):
+    if vaga_id is not None:
+        on_commit_unico(invalidar_resultado_vaga, vaga_id)
+
+
+# on_commit: o resultado e' regerado na proxima leitura, que precisa ver a
+# alteracao; as gravacoes em lote (validacao em lote) invalidam por conta propria
+@receiver(post_save, sender=EdPessoaVagaInscricao)
+@receiver(post_delete, sender=EdPessoaVagaInscricao)
+@receiver(post_save, sender=EdPessoaVagaValidacao)
+@receiver(post_delete, sender=EdPessoaVagaValidacao)
+@receiver(post_save, sender=EdPessoaVagaJustificativa)
+@receiver(post_delete, sender=EdPessoaVagaJustificativa)
+def invalidar_resultado_da_vaga(sender, instance, **kwargs):
+    _invalidar_apos_commit(instance.ed_vaga_id)
+
+
+@receiver(post_save, sender=EdPessoaVagaCota)
+@receiver(post_delete, sender=EdPessoaVagaCota)
+def invalidar_resultado_da_vaga_da_cota(sender, instance, **kwargs):
+    _invalidar_apos_commit(
+        EdVagaCota.objects.filter(id=instance.ed_vaga_cota_id)
+        .values_list("ed_vaga_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=EdPessoaVagaValidacaoIndeferimento)
+@receiver(post_delete, sender=EdPessoaVagaValidacaoIndeferimento)
+def invalidar_resultado_da_vaga_do_indeferimento(sender, instance, **kwargs):
+    _invalidar_apos_commit(
+        EdPessoaVagaValidacao.objects.filter(id=instance.ed_pessoa_vaga_validacao_id)
+        .values_list("ed_vaga_id", flat=True)
+        .first()
+    )
+
+
+# O codigo depende dos campos da validacao (e da data, que muda a cada
+# gravacao): grava na mesma transacao, para a entrada da ficha nunca achar o
+# codigo antigo; a validacao em lote grava os codigos por conta propria
+@receiver(post_save, sender=EdPessoaVagaValidacao)
+def gravar_codigo_da_validacao(sender, instance, **kwargs):
+    EdPessoaVagaValidacaoCodigo.gravar([instance])
@@ -0,0 +1,166 @@
+from datetime import date
+
+from django.test import TestCase
+
+from cead.models import (
+    CmPessoa,
+    EdCampo,
+    EdEdital,
+    EdPessoaVagaCampoCheckbox,
+    EdPessoaVagaCampoCheckboxPontuacao,
+    EdPessoaVagaCampoCheckboxUpload,
+    EdPessoaVagaCampoCombobox,
+    EdPessoaVagaCampoComboboxPontuacao,
+    EdPessoaVagaCampoComboboxUpload,
+    EdPessoaVagaCampoDatebox,
+    EdPessoaVagaCampoDateboxPeriodo,
+    EdPessoaVagaCampoDateboxPontuacao,
+    EdPessoaVagaCampoDateboxUpload,
+    EdVaga,
+    EdVagaCampoCheckbox,
+    EdVagaCampoCombobox,
+    EdVagaCampoDatebox,
+)
+
+from .views import ValidarVagaAPIView
+
+
+class UploadsPontuacoesValidacaoTest(TestCase):
+    """
+    ValidarVagaAPIView.get_uploads_pontuacoes faz sempre tres consultas (uploads
+    dos tres tipos, maximo dos grupos de combobox e periodos dos dateboxes),
+    qualquer que seja o numero de inscritos, arquivos e periodos
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        edital = EdEdital.objects.create(numero=1, ano=2026)
+        cls.vaga = EdVaga.objects.create(ed_edital=edital, descricao="Tutor")
+
+        rotulo_checkbox = EdCampo.objects.create(descricao="Especialização")
+        rotulo_combobox = EdCampo.objects.create(descricao="Titulação")
+        rotulo_datebox = EdCampo.objects.create(descricao="Experiência")
+        campo_checkbox = EdVagaCampoCheckbox.objects.create(
+            ed_vaga=cls.vaga,
+            ed_campo=rotulo_checkbox,
+            pontuacao=2,
+            obrigatorio=False,
+            assinado=False,
+        )
+        opcoes_combobox = [
+            EdVagaCampoCombobox.objects.create(
+                ed_vaga=cls.vaga,
+                ed_campo=rotulo_combobox,
+                descricao=descricao,
+                ordem=ordem,
+                pontuacao=pontuacao,
+                obrigatorio=False,
+                assinado=False,
+            )
+            for ordem, (descricao, pontuacao) in enumerate(
+                (("Mestrado", 3), ("Doutorado", 5))
+            )
+        ]
+        campo_datebox = EdVagaCampoDatebox.objects.create(
+            ed_vaga=cls.vaga,
+            ed_campo=rotulo_datebox,
+            fracao_pontuacao=0.5,
+            multiplicador_fracao_pontuacao=30,
+            pontuacao_maxima=7.5,
+            obrigatorio=False,
+            assinado=False,
+        )
+
+        cls.pessoa_ids = []
+        for indice in range(3):
+            pessoa = CmPessoa.objects.create(
+                nome=f"Candidato {indice}",
+                cpf=f"{indice:011d}",
+                email=f"candidato{indice}@example.com",
+            )
+            cls.pessoa_ids.append(pessoa.id)
+
+            checkbox = EdPessoaVagaCampoCheckbox.objects.create(
+                cm_pessoa=pessoa, ed_vaga_campo_checkbox=campo_checkbox
+            )
+            EdPessoaVagaCampoCheckboxUpload.objects.create(
+                ed_pessoa_vaga_campo_checkbox=checkbox,
+                caminho_arquivo=f"{pessoa.cpf}/especializacao.pdf",
+                validado=True,
+            )
+            EdPessoaVagaCampoCheckboxPontuacao.objects.create(
+                ed_pessoa_vaga_campo_checkbox=checkbox, pontuacao=2
+            )
+
+            combobox = EdPessoaVagaCampoCombobox.objects.create(
+                cm_pessoa=pessoa, ed_vaga_campo_combobox=opcoes_combobox[0]
+            )
+            EdPessoaVagaCampoComboboxUpload.objects.create(
+                ed_pessoa_vaga_campo_combobox=combobox,
+                caminho_arquivo=f"{pessoa.cpf}/mestrado.pdf",
+                validado=False,
+            )
+            EdPessoaVagaCampoComboboxPontuacao.objects.create(
+                ed_pessoa_vaga_campo_combobox=combobox, pontuacao=3
+            )
+
+            datebox = EdPessoaVagaCampoDatebox.objects.create(
+                cm_pessoa=pessoa, ed_vaga_campo_datebox=campo_datebox
+            )
+            for arquivo in ("contrato.pdf", "declaracao.pdf"):
+                EdPessoaVagaCampoDateboxUpload.objects.create(
+                    ed_pessoa_vaga_campo_datebox=datebox,
+                    caminho_arquivo=f"{pessoa.cpf}/{arquivo}",
+                    validado=True,
+                )
+            for ano in (2020, 2022):
+                EdPessoaVagaCampoDateboxPeriodo.objects.create(
+                    ed_pessoa_vaga_campo_datebox=datebox,
+                    inicio=date(ano, 1, 1),
+                    fim=date(ano, 12, 31),
+                )
+            EdPessoaVagaCampoDateboxPontuacao.objects.create(
+                ed_pessoa_vaga_campo_datebox=datebox, pontuacao=6.5
+            )
+
+    def test_consultas_fixas_para_varios_inscritos(self):
+        with self.assertNumQueries(3):
+            uploads = ValidarVagaAPIView().get_uploads_pontuacoes(
+                self.vaga, self.pessoa_ids
+            )
+
+        self.assertEqual(set(uploads), set(self.pessoa_ids))
+        for uploads_da_pessoa in uploads.values():
+            por_tipo = {}
+            for upload in uploads_da_pessoa:
+                por_tipo.setdefault(upload["fields"]["tipo"], []).append(
+                    upload["fields"]
+                )
+
+            (checkbox,) = por_tipo["checkbox"]
+            self.assertEqual(checkbox["descricao"], "Especialização (2 pontos)")
+            self.assertEqual(checkbox["pontuacao_obtida"], 2)
+
+            # A descricao mostra o maximo do grupo; o input, o valor da opcao
+            (combobox,) = por_tipo["combobox"]
+            self.assertEqual(combobox["descricao"], "Titulação (5 pontos)")
+            self.assertEqual(combobox["pontuacao_do_campo"], 3)
+            self.assertEqual(combobox["pontuacao_obtida"], 3)
+
+            self.assertEqual(len(por_tipo["datebox"]), 2)
+            for datebox in por_tipo["datebox"]:
+                self.assertEqual(
+                    datebox["descricao"],
+                    "Experiência (7,5 pontos)\n"
+                    "(2020-01-01 a 2020-12-31, 2022-01-01 a 2022-12-31)",
+                )
+                self.assertEqual(len(datebox["periodos"]), 2)
+                self.assertEqual(datebox["pontuacao_obtida"], 6.5)
+
+    def test_consultas_fixas_para_um_inscrito(self):
+        with self.assertNumQueries(3):
+            uploads = ValidarVagaAPIView().get_uploads_pontuacoes(
+                self.vaga, self.pessoa_ids[:1]
+            )
+
+        self.assertEqual(len(uploads[self.pessoa_ids[0]]), 4)
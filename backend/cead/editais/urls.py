@@ -9,6 +9,11 @@ urlpatterns = [
         name="enviar_email",
     ),
     path("enviar_emails/", views.EnviarEmailsAPIView.as_view(), name="enviar_emails"),
+    path(
+        "enviar_emails/progresso/",
+        views.EnviarEmailsProgressoAPIView.as_view(),
+        name="enviar_emails_progresso",
+    ),
     # Validacao
     path(
         "validar/",
@@ -25,6 +30,11 @@ urlpatterns = [
         views.ValidarVagaAPIView.as_view(),
         name="validar_vaga",
     ),
+    path(
+        "validar/vaga/<int:vaga_id>/lote/",
+        views.ValidarVagaLoteAPIView.as_view(),
+        name="validar_vaga_lote",
+    ),
     path(
         "validar/verifica_validacao/<int:vaga_id>/<int:pessoa_id>/",
         views.VerificaValidacaoAPIView.as_view(),
@@ -1,11 +1,7 @@
-from django.db.models import Max, Sum, FloatField
-from django.db.models.functions import Coalesce
 from django.utils import timezone
 
+from cead.inscricao.esquema import get_esquema_vaga
 from cead.models import (
-    EdVagaCampoCheckbox,
-    EdVagaCampoCombobox,
-    EdVagaCampoDatebox,
     EdPessoaVagaValidacao,
     EdPessoaVagaJustificativa,
     EdPessoaVagaCota,
@@ -14,28 +10,9 @@ from cead.models import (
 
 
 def calcular_maximo_de_pontos(vaga):
-    soma_checkbox = EdVagaCampoCheckbox.objects.filter(
-        ed_vaga=vaga, pontuacao__isnull=False
-    ).aggregate(total=Coalesce(Sum("pontuacao", output_field=FloatField()), 0.0))[
-        "total"
-    ]
-
-    soma_combobox = (
-        EdVagaCampoCombobox.objects.filter(ed_vaga=vaga, pontuacao__isnull=False)
-        .values("ed_campo_id")
-        .annotate(max_pontuacao=Max("pontuacao"))
-        .aggregate(total=Coalesce(Sum("max_pontuacao", output_field=FloatField()), 0.0))
-    )["total"]
-
-    soma_datebox = EdVagaCampoDatebox.objects.filter(
-        ed_vaga=vaga, pontuacao_maxima__isnull=False
-    ).aggregate(
-        total=Coalesce(Sum("pontuacao_maxima", output_field=FloatField()), 0.0)
-    )[
-        "total"
-    ]
-
-    return round(float(soma_checkbox + soma_combobox + soma_datebox), 2)
+    # Do esquema da vaga (inscricao/esquema.py): so' e' recalculado quando os
+    # campos da vaga mudam no admin
+    return get_esquema_vaga(vaga.id).pontuacao_maxima
 
 
 def get_status_order(status):
@@ -116,6 +93,31 @@ def processar_inscricao_para_relatorio(
             status_validacao = "Validado (sem pontuação)"
             pontuacao_real = 0.0
 
+    return montar_linha_relatorio(
+        inscricao,
+        status_validacao,
+        pontuacao_real,
+        responsavel,
+        data_validacao,
+        justificativa.justificativa if justificativa else None,
+        cota.ed_vaga_cota.ed_cota.cota if cota else None,
+        incluir_vaga,
+    )
+
+
+def montar_linha_relatorio(
+    inscricao,
+    status_validacao,
+    pontuacao_real,
+    responsavel,
+    data_validacao,
+    justificativa,
+    cota,
+    incluir_vaga,
+):
+    """
+    Linha do relatório de uma inscrição, com as colunas do CSV
+    """
     dados_inscricao = {
         "protocolo": inscricao.id,
         "nome": inscricao.cm_pessoa.nome,
@@ -133,10 +135,8 @@ def processar_inscricao_para_relatorio(
             else "-"
         ),
         "data_validacao": data_validacao,
-        "justificativa_pontuacao": (
-            justificativa.justificativa if justificativa else "-"
-        ),
-        "cota": cota.ed_vaga_cota.ed_cota.cota if cota else "-",
+        "justificativa_pontuacao": justificativa if justificativa is not None else "-",
+        "cota": cota if cota is not None else "-",
     }
 
     if incluir_vaga:
@@ -1,14 +1,30 @@
 # Vai fazer 'confirmacao' de vaga?
 
+import base64
+import json
 import os
 import textwrap
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from urllib.parse import urlencode
 
 from django.contrib.auth.models import User, Group
+from django.core.cache import caches
 from django.core.mail import send_mail
-from django.db.models import F, FloatField, Max, Q, Sum
-from django.db.models.functions import Coalesce
-from django.http import HttpResponse
+from django.db import connection
+from django.db.models import (
+    CharField,
+    F,
+    FloatField,
+    Max,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+)
+from django.db.models.functions import Cast
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.utils import timezone
 
 from drf_spectacular.utils import extend_schema
@@ -41,14 +57,14 @@ from cead.models import (
     CmPessoa,
     EdEdital,
     EdEditalPessoa,
-    EdPessoaVagaCampoCheckbox,
+    EdPessoaVagaCampoCheckboxPontuacao,
     EdPessoaVagaCampoCheckboxUpload,
-    EdPessoaVagaCampoCombobox,
+    EdPessoaVagaCampoComboboxPontuacao,
     EdPessoaVagaCampoComboboxUpload,
-    EdPessoaVagaCampoDatebox,
+    EdPessoaVagaCampoDateboxPeriodo,
+    EdPessoaVagaCampoDateboxPontuacao,
     EdPessoaVagaCampoDateboxUpload,
     EdPessoaVagaConfirmacao,
-    EdPessoaVagaCota,
     EdPessoaVagaInscricao,
     EdPessoaVagaJustificativa,
     EdPessoaVagaValidacao,
@@ -58,12 +74,19 @@ from cead.models import (
     EdVagaCampoCombobox,
     EdVagaCampoDatebox,
 )
+from cead.autenticacao.grupos import esta_em_algum_grupo
+from cead.fila_email import enfileirar_emails, progresso_lote
+from cead.inscricao.pontuacao import get_pontuacoes_totais
 from cead.serializers import (
     CPFSerializer,
     CmPessoaIdNomeCpfSerializer,
     GetPessoaEmailSerializer,
 )
-from cead.settings import EMAIL_HOST_USER, RAIZ_ARQUIVOS_UPLOAD
+from cead.settings import (
+    CACHE_VALIDACAO_TOTAL_TEMPO,
+    EMAIL_HOST_USER,
+    RAIZ_ARQUIVOS_UPLOAD,
+)
 from cead.utils import gerar_hash
 
 from .api_docs import *
@@ -75,7 +98,8 @@ from .permissions import (
     IsVisualizadordeRelatorioDeEditais,
     PodeAcessarEditalEspecifico,
 )
-from .renderers import CSVRenderer
+from .renderers import CSVRenderer, gerar_csv
+from .resultado import linha_relatorio, resultados_das_vagas, validados_da_vaga
 from .serializers import (
     EdGetEditalPessoaSerializer,
     EdPostEditalPessoaSerializer,
@@ -90,17 +114,21 @@ from .serializers import (
     ListarVagasValidacaoSerializer,
     UsuarioPorCpfSerializer,
     ValidarVagaGetSerializer,
+    ValidarVagaLoteSerializer,
     ValidarVagaPostSerializer,
     VerificaValidacaoSerializer,
 )
-from .utils import (
-    get_status_order,
-    get_sort_score,
-    processar_inscricao_para_relatorio,
-)
 
+cache = caches["compartilhado"]
 
-def enviar_email_base(pessoa_vaga_validacao, request):
+# Paginacao por cursor de ValidarVagaAPIView
+TAMANHO_MAXIMO_PAGINA_CURSOR = 100
+
+# Resultados lidos por vez do banco no relatorio em streaming
+TAMANHO_LOTE_RELATORIO_STREAM = 500
+
+
+def montar_email_ficha(pessoa_vaga_validacao, request):
     codigo = pessoa_vaga_validacao.codigo
     ficha_url = request.build_absolute_uri(f"/ficha/index.html?codigo={codigo}")
 
@@ -118,7 +146,11 @@ def enviar_email_base(pessoa_vaga_validacao, request):
         {EMAIL_ASSINATURA}
     """
     ).strip()
+    return assunto, mensagem
 
+
+def enviar_email_base(pessoa_vaga_validacao, request):
+    assunto, mensagem = montar_email_ficha(pessoa_vaga_validacao, request)
     send_mail(
         assunto,
         mensagem,
@@ -128,6 +160,10 @@ def enviar_email_base(pessoa_vaga_validacao, request):
     )
 
 
+def lote_emails_ficha(vaga_id):
+    return f"ficha_vaga:{vaga_id}"
+
+
 @extend_schema(**DOCS_ENVIAR_EMAIL_APIVIEW)
 class EnviarEmailAPIView(APIView):
     authentication_classes = [JWTAuthentication]
@@ -188,65 +224,79 @@ class EnviarEmailsAPIView(APIView):
         if request.session["vaga_id_hash"] != gerar_hash(request.session["vaga_id"]):
             raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
 
-        try:
-            validados = EdPessoaVagaValidacao.objects.filter(
-                ed_vaga=request.session["vaga_id"]
-            ).order_by(F("pontuacao").desc(nulls_last=True))
-        except EdPessoaVagaValidacao.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_PESSOAVAGAVALIDACOES})
-
-        request.validados = validados
+        # Na ordem do resultado da vaga (editais/resultado.py)
+        request.validados = validados_da_vaga(request.session["vaga_id"])
 
     def post(self, request):
         email_limite = request.data.get("enviar_ate")
 
-        deve_enviar = True
-        numero_emails_enviados = 0
-        nome_ultima_pessoa_que_o_email_foi_enviado = ""
-        erros = []
-
-        try:
-            for validado in request.validados:
-                if deve_enviar:
-                    if validado.cm_pessoa.email == email_limite:
-                        deve_enviar = False
-                    try:
-                        enviar_email_base(validado, request)
-                        numero_emails_enviados += 1
-                        nome_ultima_pessoa_que_o_email_foi_enviado = (
-                            validado.cm_pessoa.nome
-                        )
-                    except Exception as e:
-                        erros.append(
-                            f"{ERRO_ENVIO_EMAIL} {validado.cm_pessoa.nome}: {str(e)}"
-                        )
-
-            informacoes_envio = {
-                "numero_emails_enviados": numero_emails_enviados,
-                "nome_ultima_pessoa_que_o_email_foi_enviado": nome_ultima_pessoa_que_o_email_foi_enviado,
-            }
+        if not request.validados:
+            return Response(
+                {"detail": ERRO_GET_PESSOAVAGAVALIDACOES},
+                status=status.HTTP_404_NOT_FOUND,
+            )
 
-            if numero_emails_enviados > 0:
-                return Response(
-                    {**informacoes_envio, "detail": EMAILS_BOLSA_ENVIADOS},
-                    status=status.HTTP_200_OK,
-                )
-            if erros:
-                informacoes_envio["erros"] = erros
-                return Response(
-                    {**informacoes_envio, "detail": EMAILS_BOLSA_ENVIADOS},
-                    status=status.HTTP_400_BAD_REQUEST,
+        # As mensagens vao para a fila (cead/fila_email.py) e o comando
+        # enviar_emails as envia pela mesma conexao SMTP; a chave com o codigo
+        # impede reenviar a quem ja' recebeu se o envio for pedido de novo
+        mensagens = []
+        nome_ultima_pessoa_que_o_email_foi_enviado = ""
+        for validado in request.validados:
+            assunto, mensagem = montar_email_ficha(validado, request)
+            mensagens.append(
+                (
+                    validado.cm_pessoa.email,
+                    assunto,
+                    mensagem,
+                    f"ficha:{validado.id}:{validado.codigo}",
                 )
-            return Response(
-                {"detail": ERRO_ENVIO_EMAIL},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+            nome_ultima_pessoa_que_o_email_foi_enviado = validado.cm_pessoa.nome
+            if validado.cm_pessoa.email == email_limite:
+                break
+
+        lote = lote_emails_ficha(request.session["vaga_id"])
+        try:
+            numero_emails_enfileirados = enfileirar_emails(mensagens, lote)
         except Exception as e:
             return Response(
                 {"detail": f"{ERRO_ENVIO_EMAIL}: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+        return Response(
+            {
+                "detail": EMAILS_BOLSA_ENFILEIRADOS,
+                "lote": lote,
+                "numero_emails_solicitados": len(mensagens),
+                "numero_emails_enfileirados": numero_emails_enfileirados,
+                "nome_ultima_pessoa_que_o_email_foi_enviado": nome_ultima_pessoa_que_o_email_foi_enviado,
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+@extend_schema(**DOCS_ENVIAR_EMAILS_PROGRESSO_APIVIEW)
+class EnviarEmailsProgressoAPIView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsEmissorMensagemCriacaoFicha]
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        if "vaga_id" not in request.session:
+            raise ValidationError({"detail": ERRO_VAGAID_NA_SESSAO})
+        if "vaga_id_hash" not in request.session:
+            raise ValidationError({"detail": ERRO_VAGAIDHASH_NA_SESSAO})
+        if request.session["vaga_id_hash"] != gerar_hash(request.session["vaga_id"]):
+            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
+
+    def get(self, request):
+        lote = lote_emails_ficha(request.session["vaga_id"])
+        return Response(
+            {"lote": lote, **progresso_lote(lote)}, status=status.HTTP_200_OK
+        )
+
 
 @extend_schema(**DOCS_LISTAR_EDITAIS_EMISSORES_MENSAGEM_FICHA_APIVIEW)
 class ListarEditaisEmissoresMensagemFichaAPIView(APIView):
@@ -257,9 +307,10 @@ class ListarEditaisEmissoresMensagemFichaAPIView(APIView):
         agora = timezone.now()
 
         # Filtro = editais depois da validacao e antes da validade
-        if request.user.groups.filter(
-            name__in=["Acadêmico - administradores", "Financeiro - administradores"]
-        ).exists():
+        if esta_em_algum_grupo(
+            request.user,
+            ["Acadêmico - administradores", "Financeiro - administradores"],
+        ):
             editais = EdEdital.objects.filter(
                 data_fim_validacao__lte=agora, data_validade__gte=agora
             )
@@ -291,9 +342,10 @@ class ListarEditaisRelatoriosAPIView(APIView):
     permission_classes = [IsAuthenticated, IsVisualizadordeRelatorioDeEditais]
 
     def get(self, request):
-        if request.user.groups.filter(
-            name__in=["Acadêmico - administradores", "Financeiro - administradores"]
-        ).exists():
+        if esta_em_algum_grupo(
+            request.user,
+            ["Acadêmico - administradores", "Financeiro - administradores"],
+        ):
             editais = EdEdital.objects.all()
         else:
             pessoa = CmPessoa.objects.get(cpf=request.user.username)
@@ -323,7 +375,7 @@ class ListarEditaisValidacaoAPIView(APIView):
     def get(self, request):
         agora = timezone.now()
 
-        if request.user.groups.filter(name="Acadêmico - administradores").exists():
+        if esta_em_algum_grupo(request.user, ["Acadêmico - administradores"]):
             editais = EdEdital.objects.filter(
                 data_inicio_validacao__lte=agora,
                 data_fim_validacao__gte=agora,
@@ -351,7 +403,7 @@ class ListarEditaisAntigosValidacaoAPIView(APIView):
     def get(self, request):
         agora = timezone.now()
 
-        if request.user.groups.filter(name="Acadêmico - administradores").exists():
+        if esta_em_algum_grupo(request.user, ["Acadêmico - administradores"]):
             editais = EdEdital.objects.filter(data_fim_validacao__lte=agora)
         else:
             editais = EdEdital.objects.filter(
@@ -485,6 +537,11 @@ class ValidarVagaAPIView(APIView):
 
             vaga_data = ValidarVagaGetSerializer(vaga).data
 
+            # Com cursor (mesmo vazio, para a primeira pagina), a paginacao e'
+            # por (nome, id); page continua funcionando para o front antigo
+            if "cursor" in request.query_params:
+                return Response({**vaga_data, **self.get_pagina_cursor(request, vaga)})
+
             # Parâmetros de paginação
             page_size = request.query_params.get("page_size", 10)
             page = request.query_params.get("page", 1)
@@ -505,9 +562,10 @@ class ValidarVagaAPIView(APIView):
                 EdPessoaVagaInscricao.objects.filter(ed_vaga=vaga)
                 .select_related("cm_pessoa")
                 .only("id", "cm_pessoa")
-                .order_by("cm_pessoa__nome")[offset : offset + page_size]
+                .order_by("cm_pessoa__nome", "id")[offset : offset + page_size]
             )
 
+            # Contagem exata: sem cursor, count, total_pages e next dependem dela
             total_count = EdPessoaVagaInscricao.objects.filter(ed_vaga=vaga).count()
 
             pagination_data = {
@@ -532,12 +590,127 @@ class ValidarVagaAPIView(APIView):
         except EdVaga.DoesNotExist:
             return Response({"detail": ERRO_GET_VAGA}, status=status.HTTP_404_NOT_FOUND)
 
+    def get_total_inscritos(self, vaga):
+        # Durante a validacao as inscricoes ja' estao encerradas: o total muda
+        # pouco e nao precisa ser contado a cada pagina
+        chave = f"editais:validacao:total_inscritos:{vaga.id}"
+        total = cache.get(chave)
+        if total is None:
+            total = EdPessoaVagaInscricao.objects.filter(ed_vaga=vaga).count()
+            cache.set(chave, total, CACHE_VALIDACAO_TOTAL_TEMPO)
+        return total
+
+    def get_pagina_cursor(self, request, vaga):
+        """
+        Paginacao por cursor (nome, id): cada pagina e' um WHERE sobre a
+        ultima linha da anterior, sem OFFSET, entao as ultimas paginas custam
+        o mesmo que as primeiras
+        - cursor: next_cursor ou previous_cursor da resposta anterior
+        - page_size: ate' TAMANHO_MAXIMO_PAGINA_CURSOR
+        - count=0: nao informa o total (que vem do cache)
+        - prefetch=1: devolve tambem a proxima pagina, montada em paralelo
+        """
+        try:
+            page_size = int(request.query_params.get("page_size", 10))
+        except ValueError:
+            page_size = 10
+        page_size = max(1, min(page_size, TAMANHO_MAXIMO_PAGINA_CURSOR))
+        prefetch = request.query_params.get("prefetch") == "1"
+
+        cursor = request.query_params.get("cursor")
+        nome = id = None
+        antes = False
+        if cursor:
+            try:
+                nome, id, antes = json.loads(base64.urlsafe_b64decode(cursor))
+                if not isinstance(nome, str) or not isinstance(id, int):
+                    raise ValueError
+            except (ValueError, TypeError):
+                raise ValidationError({"detail": ERRO_CURSOR_INVALIDO})
+
+        inscricoes = EdPessoaVagaInscricao.objects.filter(ed_vaga=vaga).values_list(
+            "id", "cm_pessoa__nome"
+        )
+        if antes:
+            inscricoes = inscricoes.filter(
+                Q(cm_pessoa__nome__lt=nome) | Q(cm_pessoa__nome=nome, id__lt=id)
+            ).order_by("-cm_pessoa__nome", "-id")
+        else:
+            if cursor:
+                inscricoes = inscricoes.filter(
+                    Q(cm_pessoa__nome__gt=nome) | Q(cm_pessoa__nome=nome, id__gt=id)
+                )
+            inscricoes = inscricoes.order_by("cm_pessoa__nome", "id")
+
+        # Uma linha a mais diz se ha' outra pagina; com prefetch, a proxima
+        # pagina vem na mesma consulta
+        paginas = 2 if prefetch and not antes else 1
+        linhas = list(inscricoes[: page_size * paginas + 1])
+        pagina = linhas[:page_size]
+        proxima = linhas[page_size : page_size * 2] if paginas == 2 else []
+        tem_mais = len(linhas) > page_size
+        if antes:
+            pagina.reverse()
+
+        def codificar(linha, antes=False):
+            id, nome = linha
+            return base64.urlsafe_b64encode(
+                json.dumps([nome, id, antes]).encode()
+            ).decode()
+
+        pagination_data = {
+            "page_size": page_size,
+            "next_cursor": (
+                codificar(pagina[-1]) if pagina and (antes or tem_mais) else None
+            ),
+            "previous_cursor": (
+                codificar(pagina[0], antes=True)
+                if pagina and ((cursor and not antes) or (antes and tem_mais))
+                else None
+            ),
+        }
+        if request.query_params.get("count") != "0":
+            pagination_data["count"] = self.get_total_inscritos(vaga)
+
+        ids_pagina = [id for id, _ in pagina]
+        if not proxima:
+            return {
+                "inscritos": self.get_inscritos(vaga, ids_pagina),
+                "pagination": pagination_data,
+            }
+
+        # A proxima pagina e' montada em outra thread (com outra conexao com o
+        # banco) enquanto esta e' montada aqui
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            futuro = executor.submit(
+                self._get_inscritos_em_thread, vaga, [id for id, _ in proxima]
+            )
+            inscritos = self.get_inscritos(vaga, ids_pagina)
+            inscritos_proxima = futuro.result()
+
+        return {
+            "inscritos": inscritos,
+            "pagination": pagination_data,
+            "proxima_pagina": {
+                "inscritos": inscritos_proxima,
+                "next_cursor": (
+                    codificar(proxima[-1]) if len(linhas) > page_size * 2 else None
+                ),
+            },
+        }
+
+    def _get_inscritos_em_thread(self, vaga, inscrito_ids):
+        try:
+            return self.get_inscritos(vaga, inscrito_ids)
+        finally:
+            connection.close()
+
     def get_inscritos(self, vaga, inscrito_ids):
         # 1. Buscar os inscritos paginados
         inscritos = (
             EdPessoaVagaInscricao.objects.filter(id__in=inscrito_ids)
             .select_related("cm_pessoa")
-            .order_by("cm_pessoa__nome")
+            .order_by("cm_pessoa__nome", "id")
         )
 
         # Extrair pessoa_ids para usar nas consultas
@@ -584,77 +757,16 @@ class ValidarVagaAPIView(APIView):
         ]
 
     def get_pontuacoes(self, vaga, pessoa_ids):
-        pontuacoes = {}
-
-        # Checkbox scores - uma query para todas as pessoas
-        checkbox_scores = (
-            EdPessoaVagaCampoCheckbox.objects.filter(
-                ed_vaga_campo_checkbox__ed_vaga=vaga,
-                cm_pessoa_id__in=pessoa_ids,
-            )
-            .values("cm_pessoa_id")
-            .annotate(
-                total=Coalesce(
-                    Sum("ed_vaga_campo_checkbox__pontuacao", output_field=FloatField()),
-                    0.0,
-                )
-            )
-        )
-
-        # Combobox scores - uma query para todas as pessoas
-        combobox_scores = (
-            EdPessoaVagaCampoCombobox.objects.filter(
-                ed_vaga_campo_combobox__ed_vaga=vaga,
-                cm_pessoa_id__in=pessoa_ids,
-            )
-            .values("cm_pessoa_id")
-            .annotate(
-                total=Coalesce(
-                    Max("ed_vaga_campo_combobox__pontuacao", output_field=FloatField()),
-                    0.0,
-                )
-            )
-        )
-
-        # Datebox scores - uma query para todas as pessoas
-        datebox_scores = (
-            EdPessoaVagaCampoDatebox.objects.filter(
-                ed_vaga_campo_datebox__ed_vaga=vaga,
-                cm_pessoa_id__in=pessoa_ids,
-            )
-            .values("cm_pessoa_id")
-            .annotate(
-                total=Coalesce(
-                    Max(
-                        "ed_vaga_campo_datebox__pontuacao_maxima",
-                        output_field=FloatField(),
-                    ),
-                    0.0,
-                )
-            )
-        )
-
-        # Transforma os resultados em dicionários para acesso rápido
-        checkbox_dict = {
-            item["cm_pessoa_id"]: item["total"] for item in checkbox_scores
-        }
-        combobox_dict = {
-            item["cm_pessoa_id"]: item["total"] for item in combobox_scores
-        }
-        datebox_dict = {item["cm_pessoa_id"]: item["total"] for item in datebox_scores}
-
-        # Consolida os valores
-        for pessoa_id in pessoa_ids:
-            pontuacoes[pessoa_id] = (
-                float(checkbox_dict.get(pessoa_id, 0.0))
-                + float(combobox_dict.get(pessoa_id, 0.0))
-                + float(datebox_dict.get(pessoa_id, 0.0))
-            )
-
-        return pontuacoes
+        # Uma linha por pessoa, mantida quando os campos marcados mudam
+        return get_pontuacoes_totais(vaga.id, pessoa_ids)
 
     def get_uploads_pontuacoes(self, vaga, pessoa_ids):
-        """Busca todos os uploads de uma vez, já com descrições padronizadas."""
+        """
+        Busca todos os uploads de uma vez, já com descrições padronizadas: uma
+        consulta para os três tipos (com a pontuação do validador), uma para o
+        máximo dos grupos de combobox e uma para os períodos dos dateboxes,
+        qualquer que seja o número de inscritos e de arquivos
+        """
         uploads_por_pessoa = {pessoa_id: [] for pessoa_id in pessoa_ids}
 
         def fmt_num(v):
@@ -675,47 +787,72 @@ class ValidarVagaAPIView(APIView):
             except Exception:
                 return "pontos"
 
-        # -------- Checkbox uploads --------
-        checkbox_uploads = (
-            EdPessoaVagaCampoCheckboxUpload.objects.filter(
-                ed_pessoa_vaga_campo_checkbox__ed_vaga_campo_checkbox__ed_vaga=vaga,
-                ed_pessoa_vaga_campo_checkbox__cm_pessoa_id__in=pessoa_ids,
-            )
-            .select_related(
-                "ed_pessoa_vaga_campo_checkbox__ed_vaga_campo_checkbox__ed_campo",
-                "ed_pessoa_vaga_campo_checkbox__ed_vaga_campo_checkbox",
-            )
-            .prefetch_related("ed_pessoa_vaga_campo_checkbox__pontuacoes")
+        # -------- Uploads dos tres tipos, em uma consulta --------
+        colunas = (
+            "tipo",
+            "id",
+            "pessoa_id",
+            "pessoa_campo_id",
+            "ed_campo_id",
+            "descricao",
+            "pontuacao_do_campo",
+            "pontuacao_obtida",
+            "caminho_arquivo",
+            "validado",
         )
-
-        for upload in checkbox_uploads:
-            pessoa_id = upload.ed_pessoa_vaga_campo_checkbox.cm_pessoa_id
-            pontuacao_obtida = 0
-            pontuacao_obj = upload.ed_pessoa_vaga_campo_checkbox.pontuacoes.first()
-            if pontuacao_obj:
-                pontuacao_obtida = pontuacao_obj.pontuacao or 0
-
-            campo = upload.ed_pessoa_vaga_campo_checkbox.ed_vaga_campo_checkbox
-            descricao = campo.ed_campo.descricao
-            pmax = campo.pontuacao or 0
-            if pmax > 0:
-                descricao += f" ({fmt_num(pmax)} {plural_ponto(pmax)})"
-
-            uploads_por_pessoa[pessoa_id].append(
-                {
-                    "pk": upload.id,
-                    "fields": {
-                        "tipo": "checkbox",
-                        "descricao": descricao,
-                        "pontuacao_obtida": pontuacao_obtida,
-                        "pontuacao_do_campo": pmax,  # usado no front como max do input
-                        "caminho_arquivo": upload.url_download,
-                        "validado": upload.validado,
-                    },
-                }
+        consultas = []
+        for tipo, modelo_upload, modelo_pontuacao, campo_pontuacao in (
+            (
+                "checkbox",
+                EdPessoaVagaCampoCheckboxUpload,
+                EdPessoaVagaCampoCheckboxPontuacao,
+                "pontuacao",
+            ),
+            (
+                "combobox",
+                EdPessoaVagaCampoComboboxUpload,
+                EdPessoaVagaCampoComboboxPontuacao,
+                "pontuacao",
+            ),
+            (
+                "datebox",
+                EdPessoaVagaCampoDateboxUpload,
+                EdPessoaVagaCampoDateboxPontuacao,
+                "pontuacao_maxima",
+            ),
+        ):
+            pessoa_campo = f"ed_pessoa_vaga_campo_{tipo}"
+            vaga_campo = f"{pessoa_campo}__ed_vaga_campo_{tipo}"
+            consultas.append(
+                modelo_upload.objects.filter(
+                    **{
+                        f"{pessoa_campo}__cm_pessoa_id__in": pessoa_ids,
+                        f"{vaga_campo}__ed_vaga": vaga,
+                    }
+                )
+                .annotate(
+                    tipo=Value(tipo, output_field=CharField()),
+                    pessoa_id=F(f"{pessoa_campo}__cm_pessoa_id"),
+                    pessoa_campo_id=F(f"{pessoa_campo}_id"),
+                    ed_campo_id=F(f"{vaga_campo}__ed_campo_id"),
+                    descricao=F(f"{vaga_campo}__ed_campo__descricao"),
+                    pontuacao_do_campo=Cast(
+                        f"{vaga_campo}__{campo_pontuacao}", FloatField()
+                    ),
+                    pontuacao_obtida=Subquery(
+                        modelo_pontuacao.objects.filter(
+                            **{pessoa_campo: OuterRef(pessoa_campo)}
+                        )
+                        .order_by("id")
+                        .values("pontuacao")[:1]
+                    ),
+                )
+                .values_list(*colunas)
             )
+        uploads = list(
+            consultas[0].union(*consultas[1:], all=True).order_by("tipo", "id")
+        )
 
-        # -------- Combobox uploads --------
         # máximo do GRUPO por (vaga + campo): uma agregação só
         maiores_por_campo = (
             EdVagaCampoCombobox.objects.filter(ed_vaga=vaga)
@@ -724,103 +861,92 @@ class ValidarVagaAPIView(APIView):
         )
         max_por_campo = {m["ed_campo"]: m["maior"] for m in maiores_por_campo}
 
-        combobox_uploads = (
-            EdPessoaVagaCampoComboboxUpload.objects.filter(
-                ed_pessoa_vaga_campo_combobox__cm_pessoa_id__in=pessoa_ids,
-                ed_pessoa_vaga_campo_combobox__ed_vaga_campo_combobox__ed_vaga=vaga,
-            )
-            .select_related(
-                "ed_pessoa_vaga_campo_combobox__ed_vaga_campo_combobox__ed_campo",
-                "ed_pessoa_vaga_campo_combobox__ed_vaga_campo_combobox",
-            )
-            .prefetch_related("ed_pessoa_vaga_campo_combobox__pontuacoes")
-        )
-
-        for upload in combobox_uploads:
-            pessoa_id = upload.ed_pessoa_vaga_campo_combobox.cm_pessoa_id
-            pontuacao_obtida = 0
-            pontuacao_obj = upload.ed_pessoa_vaga_campo_combobox.pontuacoes.first()
-            if pontuacao_obj:
-                pontuacao_obtida = pontuacao_obj.pontuacao or 0
-
-            campo = upload.ed_pessoa_vaga_campo_combobox.ed_vaga_campo_combobox
-            descricao = campo.ed_campo.descricao
-
-            # máximo do grupo (vaga + campo), NÃO o valor da opção
-            pmax_grupo = max_por_campo.get(campo.ed_campo_id, 0) or 0
-            if pmax_grupo > 0:
-                descricao += f" ({fmt_num(pmax_grupo)} {plural_ponto(pmax_grupo)})"
-
-            # mas o input no front continua limitado ao valor da opção escolhida:
-            pmax_da_opcao = campo.pontuacao or 0
-
-            uploads_por_pessoa[pessoa_id].append(
-                {
-                    "pk": upload.id,
-                    "fields": {
-                        "tipo": "combobox",
-                        "descricao": descricao,
-                        "pontuacao_obtida": pontuacao_obtida,
-                        "pontuacao_do_campo": pmax_da_opcao,  # mantém limite correto do input
-                        "caminho_arquivo": upload.url_download,
-                        "validado": upload.validado,
-                    },
-                }
-            )
-
-        # -------- Datebox uploads --------
-        datebox_uploads = (
-            EdPessoaVagaCampoDateboxUpload.objects.filter(
-                ed_pessoa_vaga_campo_datebox__cm_pessoa_id__in=pessoa_ids,
-                ed_pessoa_vaga_campo_datebox__ed_vaga_campo_datebox__ed_vaga=vaga,
-            )
-            .select_related(
-                "ed_pessoa_vaga_campo_datebox__ed_vaga_campo_datebox__ed_campo",
-                "ed_pessoa_vaga_campo_datebox__ed_vaga_campo_datebox",
-            )
-            .prefetch_related(
-                "ed_pessoa_vaga_campo_datebox__pontuacoes",
-                "ed_pessoa_vaga_campo_datebox__periodos",
-            )
-        )
+        # Periodos de todos os dateboxes com upload: uma consulta
+        periodos_por_datebox = {}
+        for periodo in (
+            EdPessoaVagaCampoDateboxPeriodo.objects.filter(
+                ed_pessoa_vaga_campo_datebox_id__in=[
+                    upload[3] for upload in uploads if upload[0] == "datebox"
+                ]
+            )
+            .order_by("id")
+            .values("ed_pessoa_vaga_campo_datebox_id", "inicio", "fim")
+        ):
+            periodos_por_datebox.setdefault(
+                periodo.pop("ed_pessoa_vaga_campo_datebox_id"), []
+            ).append(periodo)
+
+        url_baixar_arquivo = reverse("baixar_arquivo")
+        for (
+            tipo,
+            id,
+            pessoa_id,
+            pessoa_campo_id,
+            ed_campo_id,
+            descricao,
+            pontuacao_do_campo,
+            pontuacao_obtida,
+            caminho_arquivo,
+            validado,
+        ) in uploads:
+            pontuacao_obtida = pontuacao_obtida or 0
+            caminho_arquivo = (
+                f"{url_baixar_arquivo}?{urlencode({'caminho': caminho_arquivo})}"
+            )
+
+            if tipo == "datebox":
+                pmax = pontuacao_do_campo or 0
+                descricao = f"{descricao}"
+                if pmax > 0:
+                    descricao += f" ({fmt_num(pmax)} {plural_ponto(pmax)})"
+
+                periodos = periodos_por_datebox.get(pessoa_campo_id, [])
+                if periodos:
+                    descricao += (
+                        "\n("
+                        + ", ".join(f"{p['inicio']} a {p['fim']}" for p in periodos)
+                        + ")"
+                    )
 
-        for upload in datebox_uploads:
-            pessoa_id = upload.ed_pessoa_vaga_campo_datebox.cm_pessoa_id
-            pontuacao_obtida = 0
-            pontuacao_obj = upload.ed_pessoa_vaga_campo_datebox.pontuacoes.first()
-            if pontuacao_obj:
-                pontuacao_obtida = pontuacao_obj.pontuacao or 0
-
-            campo = upload.ed_pessoa_vaga_campo_datebox.ed_vaga_campo_datebox
-            pmax = campo.pontuacao_maxima or 0
-            descricao = f"{campo.ed_campo.descricao}"
-            if pmax > 0:
-                descricao += f" ({fmt_num(pmax)} {plural_ponto(pmax)})"
-
-            periodos = [
-                f"{p['inicio']} a {p['fim']}"
-                for p in upload.ed_pessoa_vaga_campo_datebox.periodos.values(
-                    "inicio", "fim"
+                uploads_por_pessoa[pessoa_id].append(
+                    {
+                        "pk": id,
+                        "fields": {
+                            "tipo": "datebox",
+                            "descricao": descricao,
+                            "pontuacao_obtida": pontuacao_obtida,
+                            "pontuacao_maxima": pmax,
+                            "periodos": periodos,
+                            "caminho_arquivo": caminho_arquivo,
+                            "validado": validado,
+                        },
+                    }
+                )
+                continue
+
+            # checkbox e combobox: a pontuacao do campo e' smallint
+            pmax = int(pontuacao_do_campo or 0)
+            if tipo == "checkbox":
+                pmax_descricao = pmax
+            else:
+                # máximo do grupo (vaga + campo), NÃO o valor da opção; o input
+                # no front continua limitado ao valor da opção escolhida
+                pmax_descricao = max_por_campo.get(ed_campo_id, 0) or 0
+            if pmax_descricao > 0:
+                descricao += (
+                    f" ({fmt_num(pmax_descricao)} {plural_ponto(pmax_descricao)})"
                 )
-            ]
-            if periodos:
-                descricao += "\n(" + ", ".join(periodos) + ")"
 
             uploads_por_pessoa[pessoa_id].append(
                 {
-                    "pk": upload.id,
+                    "pk": id,
                     "fields": {
-                        "tipo": "datebox",
+                        "tipo": tipo,
                         "descricao": descricao,
                         "pontuacao_obtida": pontuacao_obtida,
-                        "pontuacao_maxima": pmax,
-                        "periodos": list(
-                            upload.ed_pessoa_vaga_campo_datebox.periodos.values(
-                                "inicio", "fim"
-                            )
-                        ),
-                        "caminho_arquivo": upload.url_download,
-                        "validado": upload.validado,
+                        "pontuacao_do_campo": pmax,  # usado no front como max do input
+                        "caminho_arquivo": caminho_arquivo,
+                        "validado": validado,
                     },
                 }
             )
@@ -862,6 +988,49 @@ class ValidarVagaAPIView(APIView):
             )
 
 
+@extend_schema(**DOCS_VALIDAR_VAGA_LOTE_APIVIEW)
+class ValidarVagaLoteAPIView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsValidadorDeEditais]
+
+    def post(self, request, vaga_id):
+        try:
+            vaga = EdVaga.objects.select_related("ed_edital").get(id=vaga_id)
+            edital = vaga.ed_edital
+            agora = timezone.now()
+
+            if not (
+                edital.data_inicio_validacao <= agora <= edital.data_fim_validacao
+                and edital.data_validade >= agora
+            ):
+                return Response(
+                    {"detail": ERRO_EDITAL_FORA_PRAZO_VALIDACAO},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        except EdVaga.DoesNotExist:
+            return Response({"detail": ERRO_GET_VAGA}, status=status.HTTP_404_NOT_FOUND)
+
+        serializer = ValidarVagaLoteSerializer(
+            data=request.data, context={"vaga": vaga, "request": request}
+        )
+        if not serializer.is_valid():
+            return Response(
+                {"detail": ERRO_POST_PESSOAVAGAVALIDACAO, "details": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        resultados = serializer.save()
+        return Response(
+            {
+                "detail": OK_LOTE_VALIDACOES,
+                "salvos": sum(1 for resultado in resultados if resultado["salvo"]),
+                "resultados": resultados,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 @extend_schema(**DOCS_EMITIR_MENSAGEM_FICHA_VAGA_APIVIEW)
 class EmitirMensagemFichaVagaAPIView(APIView):
     authentication_classes = [JWTAuthentication]
@@ -884,11 +1053,10 @@ class EmitirMensagemFichaVagaAPIView(APIView):
         request.session["vaga_id"] = vaga_id
         request.session["vaga_id_hash"] = gerar_hash(vaga_id)
 
-        validados = EdPessoaVagaValidacao.objects.filter(ed_vaga=vaga).order_by(
-            F("pontuacao").desc(nulls_last=True)
-        )
         return Response(
-            EmitirMensagemFichaVagaSerializer(validados, many=True).data,
+            EmitirMensagemFichaVagaSerializer(
+                validados_da_vaga(vaga.id), many=True
+            ).data,
             status=status.HTTP_200_OK,
         )
 
@@ -1239,55 +1407,29 @@ class RelatorioDoEditalAPIView(APIView):
                 {"detail": ERRO_GET_EDITAL}, status=status.HTTP_404_NOT_FOUND
             )
 
-        vagas = EdVaga.objects.filter(ed_edital=edital)
-        relatorio = []
+        resultados = resultados_das_vagas(
+            list(EdVaga.objects.filter(ed_edital=edital).values_list("id", flat=True))
+        )
 
-        for vaga in vagas:
-            validacoes_dict = {
-                v.cm_pessoa_id: v
-                for v in EdPessoaVagaValidacao.objects.filter(
-                    ed_vaga=vaga
-                ).select_related("cm_pessoa_responsavel_validacao")
-            }
-            justificativas_dict = {
-                j.cm_pessoa_id: j
-                for j in EdPessoaVagaJustificativa.objects.filter(
-                    ed_vaga=vaga
-                ).select_related("cm_pessoa_responsavel_justificativa")
-            }
-            cotas_dict = {
-                c.cm_pessoa.id: c
-                for c in EdPessoaVagaCota.objects.filter(
-                    ed_vaga_cota__ed_vaga=vaga
-                ).select_related("ed_vaga_cota__ed_cota", "cm_pessoa")
-            }
-            indeferidos_da_vaga = EdPessoaVagaValidacaoIndeferimento.objects.filter(
-                ed_pessoa_vaga_validacao__ed_vaga=vaga
-            ).values_list("ed_pessoa_vaga_validacao__cm_pessoa_id", flat=True)
-
-            for inscricao in EdPessoaVagaInscricao.objects.filter(
-                ed_vaga=vaga
-            ).select_related("cm_pessoa", "ed_vaga"):
-                dados = processar_inscricao_para_relatorio(
-                    inscricao,
-                    validacoes_dict,
-                    justificativas_dict,
-                    cotas_dict,
-                    indeferidos_da_vaga,
-                    incluir_vaga=True,
+        # stream=1: o CSV sai enquanto o resultado e' lido do banco, em vez de
+        # montar o relatorio inteiro na memoria
+        if request.query_params.get("stream") == "1":
+            linhas = (
+                linha_relatorio(resultado, incluir_vaga=True)
+                for resultado in resultados.iterator(
+                    chunk_size=TAMANHO_LOTE_RELATORIO_STREAM
                 )
-                relatorio.append(dados)
+            )
+            return StreamingHttpResponse(
+                gerar_csv(linhas), content_type="text/csv; charset=utf-8"
+            )
 
+        relatorio = [
+            linha_relatorio(resultado, incluir_vaga=True) for resultado in resultados
+        ]
         if not relatorio:
             return Response([], status=status.HTTP_200_OK)
 
-        relatorio.sort(
-            key=lambda r: (
-                get_status_order(r["status_validacao"]),
-                -get_sort_score(r),
-            )
-        )
-
         return Response(relatorio, status=status.HTTP_200_OK)
 
 
@@ -1303,50 +1445,10 @@ class RelatorioDaVagaAPIView(APIView):
         except EdVaga.DoesNotExist:
             return Response({"detail": ERRO_GET_VAGA}, status=status.HTTP_404_NOT_FOUND)
 
-        validacoes_dict = {
-            v.cm_pessoa_id: v
-            for v in EdPessoaVagaValidacao.objects.filter(ed_vaga=vaga).select_related(
-                "cm_pessoa_responsavel_validacao"
-            )
-        }
-        justificativas_dict = {
-            j.cm_pessoa_id: j
-            for j in EdPessoaVagaJustificativa.objects.filter(
-                ed_vaga=vaga
-            ).select_related("cm_pessoa_responsavel_justificativa")
-        }
-        cotas_dict = {
-            c.cm_pessoa.id: c
-            for c in EdPessoaVagaCota.objects.filter(
-                ed_vaga_cota__ed_vaga=vaga
-            ).select_related("ed_vaga_cota__ed_cota", "cm_pessoa")
-        }
-        indeferidos_da_vaga = EdPessoaVagaValidacaoIndeferimento.objects.filter(
-            ed_pessoa_vaga_validacao__ed_vaga=vaga
-        ).values_list("ed_pessoa_vaga_validacao__cm_pessoa_id", flat=True)
-
-        relatorio = []
-        for inscricao in EdPessoaVagaInscricao.objects.filter(
-            ed_vaga=vaga
-        ).select_related("cm_pessoa"):
-            dados = processar_inscricao_para_relatorio(
-                inscricao,
-                validacoes_dict,
-                justificativas_dict,
-                cotas_dict,
-                indeferidos_da_vaga,
-                incluir_vaga=False,
-            )
-            relatorio.append(dados)
-
+        relatorio = [
+            linha_relatorio(resultado) for resultado in resultados_das_vagas([vaga.id])
+        ]
         if not relatorio:
             return Response([], status=status.HTTP_200_OK)
 
-        relatorio.sort(
-            key=lambda r: (
-                get_status_order(r["status_validacao"]),
-                -get_sort_score(r),
-            )
-        )
-
         return Response(relatorio, status=status.HTTP_200_OK)
@@ -12,3 +12,20 @@ EMAIL_USE_TLS = env.bool("EMAIL_USE_TLS", default=True)
 EMAIL_HOST_USER = env("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = env("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = env("DEFAULT_FROM_EMAIL", default=EMAIL_HOST_USER)
+
+# Fila de saida (cead/fila_email.py, comando enviar_emails)
+# Mensagens enviadas por conexao SMTP a cada lote
+EMAIL_FILA_LOTE = env.int("EMAIL_FILA_LOTE", default=50)
+# Segundos de espera quando a fila esta' vazia
+EMAIL_FILA_INTERVALO = env.int("EMAIL_FILA_INTERVALO", default=2)
+EMAIL_FILA_MAXIMO_TENTATIVAS = env.int("EMAIL_FILA_MAXIMO_TENTATIVAS", default=6)
+# Espera (segundos) apos a primeira falha, dobrada a cada nova tentativa ate'
+# EMAIL_FILA_ESPERA_MAXIMA
+EMAIL_FILA_ESPERA_BASE = env.int("EMAIL_FILA_ESPERA_BASE", default=30)
+EMAIL_FILA_ESPERA_MAXIMA = env.int("EMAIL_FILA_ESPERA_MAXIMA", default=1800)
+# E-mails sendo enviados ha mais tempo que isso (segundos) sao considerados
+# de worker interrompido e voltam para a fila
+EMAIL_FILA_TEMPO_MAXIMO = env.int("EMAIL_FILA_TEMPO_MAXIMO", default=300)
+# Limite de envios por minuto do worker (0: sem limite), para nao estourar a
+# cota do servidor SMTP nos envios em massa
+EMAIL_FILA_ENVIOS_POR_MINUTO = env.int("EMAIL_FILA_ENVIOS_POR_MINUTO", default=0)
@@ -0,0 +1,21 @@
+from django.apps import apps
+from django.test.runner import DiscoverRunner
+
+
+class ExecutorTestes(DiscoverRunner):
+    """
+    Marca os modelos nao gerenciados como gerenciados antes de criar o banco de
+    teste, para que o migrate (com run_syncdb) crie as tabelas deles; os que so'
+    espelham tabelas do proprio Django (auth_user, django_session...) ficam de fora
+    """
+
+    def setup_databases(self, **kwargs):
+        modelos = apps.get_models(include_auto_created=True)
+        tabelas_gerenciadas = {m._meta.db_table for m in modelos if m._meta.managed}
+        for modelo in modelos:
+            if (
+                not modelo._meta.managed
+                and modelo._meta.db_table not in tabelas_gerenciadas
+            ):
+                modelo._meta.managed = True
+        return super().setup_databases(**kwargs)
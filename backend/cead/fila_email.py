@@ -0,0 +1,238 @@
+import time
+from datetime import timedelta
+
+from django.core.mail import EmailMessage
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from cead.models import SITUACOES_EMAIL, CmEmailFila
+from cead.settings import (
+    EMAIL_FILA_ESPERA_BASE,
+    EMAIL_FILA_ESPERA_MAXIMA,
+    EMAIL_FILA_MAXIMO_TENTATIVAS,
+    EMAIL_FILA_TEMPO_MAXIMO,
+    EMAIL_HOST_USER,
+)
+
+# CmEmailFila.prioridade: o codigo de verificacao (valido por 10 minutos) nao
+# pode esperar atras das fichas de uma vaga inteira
+PRIORIDADE_NORMAL = 0
+PRIORIDADE_URGENTE = 1
+
+# Motivos gravados em erro quando a falha nao vem do servidor SMTP
+ERRO_EMAIL_EXPIRADO = "Mensagem expirada antes do envio"
+ERRO_EMAIL_INTERROMPIDO = "Envio interrompido (worker parado) e tentativas esgotadas"
+
+
+def enfileirar_email(
+    destinatario,
+    assunto,
+    mensagem,
+    chave=None,
+    expira_em=None,
+    prioridade=PRIORIDADE_NORMAL,
+):
+    """
+    Grava a mensagem na fila de saida; o envio fica com o comando enviar_emails
+    Com chave, a mesma mensagem pedida de novo nao e' enfileirada outra vez
+    (volta para a fila apenas se o envio anterior falhou de vez)
+    Com expira_em, a mensagem nao e' enviada (nem tentada de novo) depois
+    desse momento
+    prioridade: as maiores sao enviadas antes das que ja' estao na fila
+    Retorna True se a mensagem entrou na fila
+    """
+    dados = {
+        "destinatario": destinatario,
+        "assunto": assunto,
+        "mensagem": mensagem,
+        "expira_em": expira_em,
+        "prioridade": prioridade,
+    }
+    if chave is None:
+        CmEmailFila.objects.create(**dados)
+        return True
+
+    email, criado = CmEmailFila.objects.get_or_create(chave=chave, defaults=dados)
+    if criado:
+        return True
+    return bool(
+        CmEmailFila.objects.filter(id=email.id, situacao="erro").update(
+            situacao="pendente",
+            tentativas=0,
+            erro=None,
+            proxima_tentativa_em=timezone.now(),
+            expira_em=expira_em,
+        )
+    )
+
+
+def enfileirar_emails(mensagens, lote=None):
+    """
+    Enfileira de uma vez as mensagens (destinatario, assunto, mensagem, chave),
+    com as mesmas regras de enfileirar_email para a chave; lote agrupa as
+    mensagens para progresso_lote
+    Retorna quantas entraram na fila (as ja' enviadas ou ainda pendentes de um
+    pedido anterior nao contam)
+    """
+    mensagens = list(mensagens)
+    existentes = dict(
+        CmEmailFila.objects.filter(
+            chave__in=[chave for _, _, _, chave in mensagens if chave is not None]
+        ).values_list("chave", "situacao")
+    )
+
+    novas = [
+        CmEmailFila(
+            destinatario=destinatario,
+            assunto=assunto,
+            mensagem=mensagem,
+            chave=chave,
+            lote=lote,
+        )
+        for destinatario, assunto, mensagem, chave in mensagens
+        if chave is None or chave not in existentes
+    ]
+    # ignore_conflicts: o mesmo envio pedido duas vezes ao mesmo tempo
+    CmEmailFila.objects.bulk_create(novas, ignore_conflicts=True)
+
+    reenfileiradas = CmEmailFila.objects.filter(
+        chave__in=[
+            chave for chave, situacao in existentes.items() if situacao == "erro"
+        ],
+        situacao="erro",
+    ).update(
+        situacao="pendente",
+        tentativas=0,
+        erro=None,
+        proxima_tentativa_em=timezone.now(),
+        lote=lote,
+    )
+    return len(novas) + reenfileiradas
+
+
+def progresso_lote(lote):
+    """
+    Quantidade de mensagens do lote em cada situacao e as que falharam de vez,
+    com o erro
+    """
+    mensagens = CmEmailFila.objects.filter(lote=lote)
+    progresso = {situacao: 0 for situacao, _ in SITUACOES_EMAIL}
+    progresso.update(
+        mensagens.values_list("situacao").annotate(total=Count("id")).order_by()
+    )
+    progresso["total"] = sum(progresso.values())
+    progresso["falhas"] = list(
+        mensagens.filter(situacao="erro").order_by("id").values("destinatario", "erro")
+    )
+    return progresso
+
+
+def reservar_emails(quantidade):
+    """
+    Marca ate' quantidade e-mails pendentes (e ja' sem espera) como em envio
+    e os retorna; skip_locked permite varios workers consumindo a mesma fila
+    Os pendentes que passaram de expira_em falham sem ser enviados; os de
+    maior prioridade saem primeiro
+    """
+    agora = timezone.now()
+    CmEmailFila.objects.filter(situacao="pendente", expira_em__lte=agora).update(
+        situacao="erro", erro=ERRO_EMAIL_EXPIRADO
+    )
+    with transaction.atomic():
+        ids = list(
+            CmEmailFila.objects.select_for_update(skip_locked=True)
+            .filter(situacao="pendente", proxima_tentativa_em__lte=agora)
+            .filter(Q(expira_em__isnull=True) | Q(expira_em__gt=agora))
+            .order_by("-prioridade", "id")
+            .values_list("id", flat=True)[:quantidade]
+        )
+        CmEmailFila.objects.filter(id__in=ids).update(
+            situacao="enviando", iniciado_em=agora, tentativas=F("tentativas") + 1
+        )
+    return list(CmEmailFila.objects.filter(id__in=ids).order_by("-prioridade", "id"))
+
+
+def recuperar_emails_interrompidos():
+    """
+    E-mails em envio ha' mais de EMAIL_FILA_TEMPO_MAXIMO pertencem a worker
+    que morreu: voltam para a fila, ou falham se ja' esgotaram as tentativas
+    """
+    limite = timezone.now() - timedelta(seconds=EMAIL_FILA_TEMPO_MAXIMO)
+    interrompidos = CmEmailFila.objects.filter(
+        situacao="enviando", iniciado_em__lt=limite
+    )
+    interrompidos.filter(tentativas__gte=EMAIL_FILA_MAXIMO_TENTATIVAS).update(
+        situacao="erro", erro=ERRO_EMAIL_INTERROMPIDO
+    )
+    return interrompidos.filter(tentativas__lt=EMAIL_FILA_MAXIMO_TENTATIVAS).update(
+        situacao="pendente"
+    )
+
+
+def _adiar_email(email, erro):
+    """
+    Devolve o e-mail para a fila com espera dobrada a cada tentativa, ou o
+    marca como erro se esgotou as tentativas ou se a proxima tentativa ja'
+    seria depois de expira_em
+    """
+    espera = min(
+        EMAIL_FILA_ESPERA_BASE * 2 ** (email.tentativas - 1), EMAIL_FILA_ESPERA_MAXIMA
+    )
+    proxima_tentativa_em = timezone.now() + timedelta(seconds=espera)
+    if email.tentativas >= EMAIL_FILA_MAXIMO_TENTATIVAS or (
+        email.expira_em and proxima_tentativa_em >= email.expira_em
+    ):
+        CmEmailFila.objects.filter(id=email.id).update(situacao="erro", erro=erro)
+        return
+    CmEmailFila.objects.filter(id=email.id).update(
+        situacao="pendente",
+        erro=erro,
+        proxima_tentativa_em=proxima_tentativa_em,
+    )
+
+
+def enviar_emails(emails, conexao, intervalo=0):
+    """
+    Envia os e-mails reservados pela conexao SMTP conexao (get_connection()),
+    aberta aqui se ainda nao estiver; quem chama decide quando fecha-la, para
+    reaproveita-la entre lotes
+    intervalo: segundos de espera depois de cada mensagem (limite de envios
+    por minuto)
+    Retorna a quantidade enviada
+    """
+    try:
+        conexao.open()
+    except Exception as e:
+        for email in emails:
+            _adiar_email(email, str(e))
+        return 0
+
+    enviados = 0
+    for email in emails:
+        mensagem = EmailMessage(
+            email.assunto,
+            email.mensagem,
+            EMAIL_HOST_USER,
+            [email.destinatario],
+            connection=conexao,
+        )
+        try:
+            mensagem.send()
+        except Exception as e:
+            _adiar_email(email, str(e))
+            # A conexao pode ter caido: a proxima mensagem abre outra
+            try:
+                conexao.close()
+                conexao.open()
+            except Exception:
+                pass
+        else:
+            CmEmailFila.objects.filter(id=email.id).update(
+                situacao="enviado", erro=None, enviado_em=timezone.now()
+            )
+            enviados += 1
+
+        if intervalo:
+            time.sleep(intervalo)
+    return enviados
@@ -1,6 +1,8 @@
 from rest_framework import permissions
 from rest_framework.exceptions import PermissionDenied
 
+from cead.autenticacao.grupos import esta_em_algum_grupo
+
 from .messages import (
     ERRO_FINANCEIRO_NAO_ESTA_NO_GRUPO_DE_ASSOCIADOR_VAGA_FICHA,
     ERRO_FINANCEIRO_NAO_ESTA_NO_GRUPO_DE_GERENCIADORES_VINCULACAO_FICHAS,
@@ -11,14 +13,12 @@ class IsGerenciadorVinculacaoFichas(permissions.BasePermission):
     message = ERRO_FINANCEIRO_NAO_ESTA_NO_GRUPO_DE_GERENCIADORES_VINCULACAO_FICHAS
 
     def has_permission(self, request, view):
-        if (
-            request.user
-            and request.user.groups.filter(
-                name__in=[
-                    "Gerenciadores de vinculação de fichas",
-                    "Financeiro - administradores",
-                ]
-            ).exists()
+        if request.user and esta_em_algum_grupo(
+            request.user,
+            [
+                "Gerenciadores de vinculação de fichas",
+                "Financeiro - administradores",
+            ],
         ):
             return True
         raise PermissionDenied(detail=self.message)
@@ -28,14 +28,12 @@ class IsAssociadorEditalFuncaoFichaOferta(permissions.BasePermission):
     message = ERRO_FINANCEIRO_NAO_ESTA_NO_GRUPO_DE_ASSOCIADOR_VAGA_FICHA
 
     def has_permission(self, request, view):
-        if (
-            request.user
-            and request.user.groups.filter(
-                name__in=[
-                    "Associadores de edital, função da ficha e oferta",
-                    "Financeiro - administradores",
-                ]
-            ).exists()
+        if request.user and esta_em_algum_grupo(
+            request.user,
+            [
+                "Associadores de edital, função da ficha e oferta",
+                "Financeiro - administradores",
+            ],
         ):
             return True
         raise PermissionDenied(detail=self.message)
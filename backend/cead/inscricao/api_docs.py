@@ -184,7 +184,9 @@ DOCS_ENVIAR_CODIGO_EMAIL_VIEW = {
         "Envia um código de verificação para o e-mail do candidato da sessão. "
         "Gera o código de acordo com o hash e bloco de tempo.\n\n"
         "**GET:** Retorna informações truncadas para exibir mensagem de sucesso.\n\n"
-        "**POST:** Envia o código."
+        "**POST:** Coloca o e-mail com o código na fila de saída e responde sem "
+        "aguardar o envio. Pedidos repetidos dentro do mesmo bloco de tempo não "
+        "geram outro e-mail."
     ),
     "tags": ["Inscrição"],
     "responses": {
@@ -473,7 +475,7 @@ DOCS_PESSOA_VAGA_CAMPO_VIEW = {
     "description": (
         "Consulta e marca quais campos da vaga foram preenchidos pelo candidato, registrando a pontuação.<br><br>"
         "**GET:** Retorna os campos já preenchidos ou pendentes para o candidato.<br>"
-        "**POST:** Marca os campos informados e atualiza a pontuação do candidato.<br>"
+        "**POST:** Marca os campos informados e atualiza a pontuação do candidato. A seleção é gravada inteira ou não é gravada, e a pontuação recalculada vem no retorno.<br>"
         "<br>"
         "**Formato do retorno:**<br>"
         " - `checkboxes`: lista dos campos de checkbox preenchidos.<br>"
@@ -489,7 +491,7 @@ DOCS_PESSOA_VAGA_CAMPO_VIEW = {
             examples=[
                 OpenApiExample(
                     "Campos marcados",
-                    value={"detail": "Campos marcados com sucesso."},
+                    value={"detail": "Campos marcados com sucesso.", "pontuacao": 35},
                     summary="Campos registrados",
                 )
             ],
@@ -560,7 +562,9 @@ DOCS_ANEXAR_ARQUIVOS_VIEW = {
     "summary": "Anexa arquivos aos campos da inscrição",
     "description": (
         "**GET:** Retorna os arquivos já anexados.\n\n"
-        "**POST:** Salva ou atualiza os arquivos do candidato."
+        "**POST:** Recebe os arquivos do candidato. A compressão, o redimensionamento "
+        "e a verificação de assinatura são feitos depois, em fila: a situação de cada "
+        "arquivo é consultada em `anexar_arquivos/situacao/`."
     ),
     "tags": ["Inscrição"],
     "request": {
@@ -574,12 +578,15 @@ DOCS_ANEXAR_ARQUIVOS_VIEW = {
         }
     },
     "responses": {
-        200: OpenApiResponse(
-            description="Arquivos anexados com sucesso.",
+        201: OpenApiResponse(
+            description="Arquivos recebidos, aguardando processamento.",
             examples=[
                 OpenApiExample(
-                    "Arquivos anexados",
-                    value={"detail": "Arquivos anexados com sucesso."},
+                    "Arquivos recebidos",
+                    value={
+                        "detail": "Recebeu os arquivos do candidato, que estão sendo processados",
+                        "arquivos": [{"campo": "checkbox_1", "situacao": "pendente"}],
+                    },
                 )
             ],
         ),
@@ -602,6 +609,49 @@ DOCS_ANEXAR_ARQUIVOS_VIEW = {
         500: OpenApiResponse(
             description="Erro interno ao anexar.",
         ),
+        503: OpenApiResponse(
+            description="Fila de processamento cheia; tentar de novo após o tempo do cabeçalho Retry-After.",
+            examples=[
+                OpenApiExample(
+                    "Fila cheia",
+                    value={
+                        "detail": "O sistema está recebendo muitos arquivos neste momento, tente novamente em instantes"
+                    },
+                )
+            ],
+        ),
+    },
+}
+
+DOCS_SITUACAO_ARQUIVOS_VIEW = {
+    "summary": "Situação do processamento dos arquivos da inscrição",
+    "description": (
+        "Retorna, para cada campo, a situação do último arquivo enviado: "
+        "`pendente`, `processando`, `concluido` ou `erro` (com a mensagem para o candidato). "
+        "Feito para o front end consultar periodicamente após o envio."
+    ),
+    "tags": ["Inscrição"],
+    "responses": {
+        200: OpenApiResponse(
+            description="Situação dos arquivos.",
+            examples=[
+                OpenApiExample(
+                    "Situação",
+                    value=[
+                        {
+                            "campo": "checkbox_1",
+                            "situacao": "concluido",
+                            "mensagem": None,
+                        },
+                        {
+                            "campo": "datebox_3",
+                            "situacao": "erro",
+                            "mensagem": "Erro na verificação da assinatura digital",
+                        },
+                    ],
+                )
+            ],
+        ),
     },
 }
 
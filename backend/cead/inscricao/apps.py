@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class InscricaoConfig(AppConfig):
+    name = "cead.inscricao"
+
+    def ready(self):
+        # Invalidacao do esquema do formulario das vagas
+        from . import signals  # noqa: F401
@@ -0,0 +1,128 @@
+import os
+import time
+import uuid
+
+from cead.settings import RAIZ_ARQUIVOS_UPLOAD, UPLOAD_CONTEUDO_CARENCIA
+
+# Arquivos ja' processados, um por conteudo enviado, em
+# .conteudo/<2 primeiros caracteres do sha256>/<sha256>[_assinado]<extensao>
+# Os arquivos dos candidatos (<pessoa>_<vaga>/<campo>.<extensao>) sao hardlinks
+# para eles: o mesmo diploma enviado para varias vagas ocupa o disco uma vez e
+# e' processado (gs, Pillow) uma vez
+# A contagem de referencias e' a do proprio sistema de arquivos (st_nlink):
+# apagar o arquivo do candidato, como faz a reconciliacao, ja' libera a
+# referencia, e o conteudo com st_nlink == 1 nao e' mais usado
+PASTA_CONTEUDO = os.path.join(RAIZ_ARQUIVOS_UPLOAD, ".conteudo")
+
+# Pastas de candidatos de inscricoes apagadas, esperando a reconciliacao: mover
+# a pasta e' instantaneo, apagar os arquivos fica fora da requisicao
+PASTA_LIXEIRA = os.path.join(RAIZ_ARQUIVOS_UPLOAD, ".lixeira")
+
+
+def caminho_conteudo(sha256: str, extensao: str, requer_assinatura: bool) -> str:
+    # Arquivo de campo assinado nao e' comprimido, entao e' outro conteudo final
+    sufixo = "_assinado" if requer_assinatura else ""
+    return os.path.join(PASTA_CONTEUDO, sha256[:2], f"{sha256}{sufixo}{extensao}")
+
+
+def guardar_conteudo(caminho_processado: str, conteudo: str):
+    """
+    Guarda o arquivo ja' processado como conteudo. Se outro worker guardou o
+    mesmo conteudo antes, fica o dele
+    """
+    os.makedirs(os.path.dirname(conteudo), exist_ok=True)
+    try:
+        os.link(caminho_processado, conteudo)
+    except FileExistsError:
+        pass
+
+
+def preparar_vinculo(conteudo: str, caminho: str) -> str:
+    """
+    Cria, oculto na pasta de caminho, um vinculo para o conteudo, que
+    vincular_conteudo coloca no lugar; enquanto existir, o conteudo nao e'
+    coletado. Levanta FileNotFoundError se o conteudo acabou de ser coletado
+    """
+    vinculo = os.path.join(os.path.dirname(caminho), f".{uuid.uuid4().hex}")
+    os.link(conteudo, vinculo)
+    return vinculo
+
+
+def vincular_conteudo(vinculo: str, caminho: str):
+    """
+    Substitui o arquivo anterior de caminho pelo vinculo (preparar_vinculo)
+    de forma atomica
+    """
+    os.replace(vinculo, caminho)
+
+
+def coletar_conteudos_sem_referencia():
+    """
+    Apaga os conteudos que nenhum arquivo de candidato usa mais. Respeita a
+    carencia de UPLOAD_CONTEUDO_CARENCIA segundos, para nao apagar o que um
+    worker acabou de guardar e ainda vai vincular
+    Retorna (quantidade, bytes) apagados
+    """
+    limite = time.time() - UPLOAD_CONTEUDO_CARENCIA
+    quantidade = bytes_apagados = 0
+    if not os.path.isdir(PASTA_CONTEUDO):
+        return quantidade, bytes_apagados
+
+    for pasta, _, arquivos in os.walk(PASTA_CONTEUDO):
+        for arquivo in arquivos:
+            caminho = os.path.join(pasta, arquivo)
+            try:
+                estado = os.stat(caminho)
+                if estado.st_nlink == 1 and estado.st_mtime < limite:
+                    os.remove(caminho)
+                    quantidade += 1
+                    bytes_apagados += estado.st_size
+            except FileNotFoundError:
+                continue
+
+    return quantidade, bytes_apagados
+
+
+def mover_para_lixeira(pasta_relativa: str):
+    """
+    Move a pasta de RAIZ_ARQUIVOS_UPLOAD para a lixeira, com nome unico (a
+    mesma pessoa pode se inscrever e ser apagada de novo na mesma vaga)
+    """
+    os.makedirs(PASTA_LIXEIRA, exist_ok=True)
+    destino = os.path.join(
+        PASTA_LIXEIRA, f"{os.path.basename(pasta_relativa)}_{uuid.uuid4().hex}"
+    )
+    try:
+        os.rename(os.path.join(RAIZ_ARQUIVOS_UPLOAD, pasta_relativa), destino)
+    except FileNotFoundError:
+        pass
+
+
+def esvaziar_lixeira():
+    """
+    Apaga o que esta' na lixeira. Deve rodar antes de
+    coletar_conteudos_sem_referencia, ja' que os arquivos da lixeira ainda
+    contam como referencia aos conteudos
+    Retorna (quantidade, bytes) de arquivos apagados
+    """
+    quantidade = bytes_apagados = 0
+    if not os.path.isdir(PASTA_LIXEIRA):
+        return quantidade, bytes_apagados
+
+    for pasta, subpastas, arquivos in os.walk(PASTA_LIXEIRA, topdown=False):
+        for arquivo in arquivos:
+            caminho = os.path.join(pasta, arquivo)
+            try:
+                tamanho = os.lstat(caminho).st_size
+                os.remove(caminho)
+            except FileNotFoundError:
+                continue
+            quantidade += 1
+            bytes_apagados += tamanho
+        for subpasta in subpastas:
+            try:
+                os.rmdir(os.path.join(pasta, subpasta))
+            except OSError:
+                continue
+
+    return quantidade, bytes_apagados
@@ -0,0 +1,199 @@
+import uuid
+
+from django.core.cache import caches
+from django.db.models import F
+
+from cead.models import EdVagaCampoCheckbox, EdVagaCampoCombobox, EdVagaCampoDatebox
+from cead.settings import CACHE_ESQUEMA_VAGA_TEMPO
+
+# Esquema do formulario da vaga: os campos (checkbox, combobox e datebox) com o
+# necessario para montar a tela, validar o POST e pontuar. So' muda quando a
+# vaga e' editada no admin, entao e' montado uma vez por vaga e versao:
+# - a versao fica no cache compartilhado e e' trocada a cada alteracao
+#   (signals.py), o que invalida o esquema em todos os workers
+# - o esquema compilado fica no cache compartilhado, pela versao, e na memoria
+#   do processo, para nao ser desserializado a cada requisicao
+cache = caches["compartilhado"]
+_esquemas = {}
+
+# Entra na chave do esquema compilado: trocar quando mudarem os dados
+# guardados, para nao ler do cache um esquema no formato anterior
+FORMATO_ESQUEMA = 2
+
+
+def _chave_versao(vaga_id):
+    return f"inscricao:esquema_vaga:{vaga_id}:versao"
+
+
+def _chave_esquema(vaga_id, versao):
+    return f"inscricao:esquema_vaga:{vaga_id}:{FORMATO_ESQUEMA}:{versao}"
+
+
+class EsquemaVaga:
+    def __init__(self, vaga_id, versao, checkboxes, comboboxes, dateboxes):
+        self.vaga_id = vaga_id
+        self.versao = versao
+        # {id do campo da vaga: dados do campo}
+        self.checkboxes = {checkbox["id"]: checkbox for checkbox in checkboxes}
+        self.comboboxes = {combobox["id"]: combobox for combobox in comboboxes}
+        self.dateboxes = {datebox["id"]: datebox for datebox in dateboxes}
+
+        # Maximo de pontos da vaga: todos os checkboxes, o maior combobox de
+        # cada campo e a pontuacao maxima de cada datebox
+        maiores_comboboxes = {}
+        for combobox in comboboxes:
+            campo, pontuacao = combobox["ed_campo_id"], combobox["pontuacao"]
+            if pontuacao is not None and pontuacao > maiores_comboboxes.get(
+                campo, pontuacao - 1
+            ):
+                maiores_comboboxes[campo] = pontuacao
+        self.pontuacao_maxima = round(
+            float(
+                sum(checkbox["pontuacao"] or 0 for checkbox in checkboxes)
+                + sum(maiores_comboboxes.values())
+                + sum(datebox["pontuacao_maxima"] or 0 for datebox in dateboxes)
+            ),
+            2,
+        )
+
+        # Retorno de VagaCamposView, com os comboboxes agrupados pela
+        # descricao do campo
+        self.campos_da_vaga = {}
+        if checkboxes:
+            self.campos_da_vaga["checkboxes"] = [
+                {
+                    "id": checkbox["id"],
+                    "descricao": checkbox["campo"],
+                    "pontuacao": checkbox["pontuacao"],
+                    "obrigatorio": checkbox["obrigatorio"],
+                }
+                for checkbox in checkboxes
+            ]
+        if comboboxes:
+            comboboxes_da_vaga_separados = {}
+            for combobox in comboboxes:
+                comboboxes_da_vaga_separados.setdefault(combobox["campo"], []).append(
+                    {
+                        "id": combobox["id"],
+                        "descricao": combobox["descricao"],
+                        "pontuacao": combobox["pontuacao"],
+                        "obrigatorio": combobox["obrigatorio"],
+                    }
+                )
+            self.campos_da_vaga["comboboxes"] = comboboxes_da_vaga_separados
+        if dateboxes:
+            self.campos_da_vaga["dateboxes"] = [
+                {
+                    "id": datebox["id"],
+                    "descricao": datebox["campo"],
+                    "fracao_pontuacao": datebox["fracao_pontuacao"],
+                    "multiplicador_fracao_pontuacao": datebox[
+                        "multiplicador_fracao_pontuacao"
+                    ],
+                    "pontuacao_maxima": datebox["pontuacao_maxima"],
+                }
+                for datebox in dateboxes
+            ]
+
+    def checkboxes_obrigatorios(self):
+        return {
+            id for id, checkbox in self.checkboxes.items() if checkbox["obrigatorio"]
+        }
+
+    def dateboxes_obrigatorios(self):
+        return {id for id, datebox in self.dateboxes.items() if datebox["obrigatorio"]}
+
+    def pontuacao_checkboxes(self, ids):
+        return sum(self.checkboxes[id]["pontuacao"] or 0 for id in ids)
+
+    def pontuacao_comboboxes(self, ids):
+        return sum(self.comboboxes[id]["pontuacao"] or 0 for id in ids)
+
+    def pontuacao_datebox(self, id, periodos):
+        """
+        Pontuacao de um datebox pelos periodos [(inicio, fim), ...] informados,
+        limitada a' pontuacao maxima do campo
+        """
+        datebox = self.dateboxes[id]
+        pontuacao_total_por_datebox = sum(
+            int((fim - inicio).days / datebox["multiplicador_fracao_pontuacao"])
+            * datebox["fracao_pontuacao"]
+            for inicio, fim in periodos
+        )
+        return min(pontuacao_total_por_datebox, datebox["pontuacao_maxima"])
+
+
+def _compilar_esquema(vaga_id):
+    return {
+        "checkboxes": list(
+            EdVagaCampoCheckbox.objects.filter(ed_vaga_id=vaga_id)
+            .order_by("id")
+            .values(
+                "id",
+                "pontuacao",
+                "obrigatorio",
+                "assinado",
+                campo=F("ed_campo__descricao"),
+            )
+        ),
+        "comboboxes": list(
+            EdVagaCampoCombobox.objects.filter(ed_vaga_id=vaga_id)
+            .order_by("ed_campo_id", "ordem")
+            .values(
+                "id",
+                "ed_campo_id",
+                "descricao",
+                "ordem",
+                "pontuacao",
+                "obrigatorio",
+                "assinado",
+                campo=F("ed_campo__descricao"),
+            )
+        ),
+        "dateboxes": list(
+            EdVagaCampoDatebox.objects.filter(ed_vaga_id=vaga_id)
+            .order_by("id")
+            .values(
+                "id",
+                "fracao_pontuacao",
+                "multiplicador_fracao_pontuacao",
+                "pontuacao_maxima",
+                "obrigatorio",
+                "assinado",
+                campo=F("ed_campo__descricao"),
+            )
+        ),
+    }
+
+
+def get_esquema_vaga(vaga_id):
+    """
+    Esquema do formulario da vaga na versao atual: da memoria do processo, do
+    cache compartilhado ou, so' na primeira vez apos uma alteracao, do banco
+    """
+    chave_versao = _chave_versao(vaga_id)
+    versao = cache.get(chave_versao)
+    if versao is None:
+        # add nao sobrescreve a versao que outro worker acabou de criar
+        cache.add(chave_versao, uuid.uuid4().hex, timeout=None)
+        versao = cache.get(chave_versao)
+
+    esquema = _esquemas.get(vaga_id)
+    if esquema is not None and esquema.versao == versao:
+        return esquema
+
+    chave_esquema = _chave_esquema(vaga_id, versao)
+    dados = cache.get(chave_esquema)
+    if dados is None:
+        dados = _compilar_esquema(vaga_id)
+        cache.set(chave_esquema, dados, CACHE_ESQUEMA_VAGA_TEMPO)
+
+    esquema = EsquemaVaga(vaga_id, versao, **dados)
+    _esquemas[vaga_id] = esquema
+    return esquema
+
+
+def invalidar_esquema_vaga(vaga_id):
+    # Versao nova em vez de apagar: um worker que ainda compila a versao
+    # anterior grava o resultado em uma chave que ninguem mais le'
+    cache.set(_chave_versao(vaga_id), uuid.uuid4().hex, timeout=None)
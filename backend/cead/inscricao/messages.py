@@ -52,12 +52,18 @@ ERRO_ARQUIVO_INVALIDO_TIPO_INVALIDO = (
     "Tipo de arquivo inválido - são aceitos PDF, PNG, JP(E)G"
 )
 ERRO_ARQUIVO_SENHA = "O arquivo está protegido com senha"
+ERRO_ARQUIVO_TAMANHO_MAXIMO = "O arquivo ultrapassa o tamanho máximo permitido"
+ERRO_ARQUIVOS_EM_PROCESSAMENTO = (
+    "Há arquivos enviados ainda em processamento, aguarde alguns instantes"
+)
 ERRO_CRIACAO_PASTA_UPLOAD = "Erro na criação da pasta de upload de arquivos"
+ERRO_FILA_ARQUIVOS_CHEIA = "O sistema está recebendo muitos arquivos neste momento, tente novamente em instantes"
 ERRO_FALTA_ARQUIVO = (
     "Há campos marcados para envio de arquivos que não estão na base de dados"
 )
 ERRO_GS_NAO_ENCONTRADO = "Executável gs não encontrado"
 ERRO_POST_ARQUIVOS = "Erro no POST dos arquivos"
+ERRO_PROCESSAMENTO_ARQUIVO = "Não foi possível processar o arquivo enviado"
 
 # ------------------------------
 # ERROS - CÓDIGOS DE VALIDAÇÃO
@@ -92,6 +98,9 @@ ERRO_POST_COTA = "O campo cota é obrigatório"
 ERRO_APRESENTACAO_CM_PESSOA = "Os dados da pessoa são inválidos"
 ERRO_INSERCAO_CM_PESSOA = "Houve um erro ao tentar inserir a pessoa"
 ERRO_INSERCAO_ED_PESSOA_FORMACAO = "Houve um erro ao tentar inserir a formação"
+ERRO_INSERCAO_ED_PESSOA_VAGA_CAMPOS = (
+    "Houve um erro ao tentar salvar os campos marcados"
+)
 ERRO_INSERCAO_ED_PESSOA_VAGA_CAMPO_DATEBOX_FIM_INVALIDO = "Data de fim inválida"
 ERRO_INSERCAO_ED_PESSOA_VAGA_CAMPO_DATEBOX_INICIO_INVALIDO = "Data de início inválida"
 ERRO_INSERCAO_ED_PESSOA_VAGA_CAMPO_DATEBOX_OBJETO = (
@@ -142,6 +151,9 @@ OK_CODIGO_EMAIL_ENVIADO = "Código enviado por e-mail"
 OK_CODIGO_EMAIL_VALIDADO = "Código enviado por e-mail validado"
 OK_ED_PESSOA_VAGA_CAMPOS = "Salvou dados de preenchimento de campos do candidato"
 OK_ED_PESSOA_VAGA_CAMPO_UPLOAD = "Salvou os arquivos do candidato"
+OK_ED_PESSOA_VAGA_CAMPO_UPLOAD_RECEBIDO = (
+    "Recebeu os arquivos do candidato, que estão sendo processados"
+)
 OK_EMAIL_VALIDADO = "Endereço de email válido"
 OK_INSERCAO_CM_PESSOA = "Pessoa criada"
 OK_INSERCAO_ED_PESSOA_FORMACAO = "Inseriu a formação para a pessoa"
@@ -0,0 +1,132 @@
+from django.db.models import FloatField, Max, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from cead.models import (
+    EdPessoaVagaCampoCheckbox,
+    EdPessoaVagaCampoCombobox,
+    EdPessoaVagaCampoDatebox,
+    EdPessoaVagaPontuacao,
+)
+
+# Pontuacao do candidato na vaga (EdPessoaVagaPontuacao): gravada junto com os
+# campos marcados no formulario, a partir do esquema da vaga, sem consulta
+# extra. As tabelas dos campos so' sao agregadas para quem ainda nao tem a
+# linha (marcou os campos antes dela existir) ou quando a pontuacao de um
+# campo da vaga muda no admin
+
+
+def atualizar_pontuacao(
+    candidato, vaga, esquema, ids_checkbox, ids_combobox, ids_datebox, pontuacao
+):
+    """
+    Grava a pontuacao do candidato na vaga para os campos que acabaram de ser
+    marcados; chamada dentro da transacao que grava os campos
+    """
+    pontuacao_total = (
+        esquema.pontuacao_checkboxes(ids_checkbox)
+        + max(
+            (esquema.comboboxes[id]["pontuacao"] or 0 for id in ids_combobox),
+            default=0,
+        )
+        + max(
+            (esquema.dateboxes[id]["pontuacao_maxima"] or 0 for id in ids_datebox),
+            default=0,
+        )
+    )
+    EdPessoaVagaPontuacao.objects.update_or_create(
+        cm_pessoa=candidato,
+        ed_vaga=vaga,
+        defaults={
+            "pontuacao": pontuacao,
+            "pontuacao_total": pontuacao_total,
+            "atualizado_em": timezone.now(),
+        },
+    )
+
+
+def calcular_pontuacoes_totais(vaga_id, pessoa_ids=None):
+    """
+    {pessoa_id: pontuacao_total} agregando as tabelas dos campos, uma consulta
+    por tipo de campo; so' aparece quem marcou algum campo
+    """
+    consultas = (
+        (
+            EdPessoaVagaCampoCheckbox.objects.filter(
+                ed_vaga_campo_checkbox__ed_vaga_id=vaga_id
+            ),
+            Sum("ed_vaga_campo_checkbox__pontuacao", output_field=FloatField()),
+        ),
+        (
+            EdPessoaVagaCampoCombobox.objects.filter(
+                ed_vaga_campo_combobox__ed_vaga_id=vaga_id
+            ),
+            Max("ed_vaga_campo_combobox__pontuacao", output_field=FloatField()),
+        ),
+        (
+            EdPessoaVagaCampoDatebox.objects.filter(
+                ed_vaga_campo_datebox__ed_vaga_id=vaga_id
+            ),
+            Max("ed_vaga_campo_datebox__pontuacao_maxima", output_field=FloatField()),
+        ),
+    )
+
+    totais = {}
+    for consulta, agregacao in consultas:
+        if pessoa_ids is not None:
+            consulta = consulta.filter(cm_pessoa_id__in=pessoa_ids)
+        for pessoa_id, total in (
+            consulta.values("cm_pessoa_id")
+            .annotate(total=Coalesce(agregacao, 0.0))
+            .values_list("cm_pessoa_id", "total")
+        ):
+            totais[pessoa_id] = totais.get(pessoa_id, 0.0) + float(total)
+    return totais
+
+
+def recalcular_pontuacoes_totais(vaga_id, pessoa_ids=None):
+    """
+    Recalcula, pelas tabelas dos campos, a pontuacao_total dos pessoa_ids na
+    vaga (sem pessoa_ids, de todos que ja' tem pontuacao ou marcaram campos)
+    e grava com um unico INSERT ... ON CONFLICT. Retorna {pessoa_id: total}
+    """
+    totais = calcular_pontuacoes_totais(vaga_id, pessoa_ids)
+    if pessoa_ids is None:
+        pessoa_ids = set(totais) | set(
+            EdPessoaVagaPontuacao.objects.filter(ed_vaga_id=vaga_id).values_list(
+                "cm_pessoa_id", flat=True
+            )
+        )
+
+    agora = timezone.now()
+    EdPessoaVagaPontuacao.objects.bulk_create(
+        [
+            EdPessoaVagaPontuacao(
+                cm_pessoa_id=pessoa_id,
+                ed_vaga_id=vaga_id,
+                pontuacao_total=totais.get(pessoa_id, 0.0),
+                atualizado_em=agora,
+            )
+            for pessoa_id in pessoa_ids
+        ],
+        update_conflicts=True,
+        unique_fields=["cm_pessoa", "ed_vaga"],
+        update_fields=["pontuacao_total", "atualizado_em"],
+    )
+    return {pessoa_id: totais.get(pessoa_id, 0.0) for pessoa_id in pessoa_ids}
+
+
+def get_pontuacoes_totais(vaga_id, pessoa_ids):
+    """
+    {pessoa_id: pontuacao_total} lendo uma linha por pessoa; quem ainda nao
+    tem a linha e' calculado e gravado aqui
+    """
+    pontuacoes = dict(
+        EdPessoaVagaPontuacao.objects.filter(
+            ed_vaga_id=vaga_id, cm_pessoa_id__in=pessoa_ids
+        ).values_list("cm_pessoa_id", "pontuacao_total")
+    )
+    sem_pontuacao = set(pessoa_ids) - pontuacoes.keys()
+    if sem_pontuacao:
+        pontuacoes.update(recalcular_pontuacoes_totais(vaga_id, sem_pontuacao))
+    return pontuacoes
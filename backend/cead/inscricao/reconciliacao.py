@@ -0,0 +1,125 @@
+import os
+import re
+import time
+from collections import defaultdict
+
+from cead.models import (
+    EdPessoaVagaCampoCheckboxUpload,
+    EdPessoaVagaCampoComboboxUpload,
+    EdPessoaVagaCampoDateboxUpload,
+    EdPessoaVagaCampoUploadTarefa,
+)
+from cead.settings import RAIZ_ARQUIVOS_UPLOAD, UPLOAD_RECONCILIACAO_CARENCIA
+
+from .armazenamento import coletar_conteudos_sem_referencia, esvaziar_lixeira
+from .tarefas import SITUACOES_EM_ANDAMENTO
+
+# So' as pastas dos candidatos; .conteudo e qualquer outra pasta ficam de fora
+REGEX_PASTA_CANDIDATO = re.compile(r"^\d+_\d+$")
+
+
+def indice_arquivos_esperados():
+    """
+    {pasta <pessoa>_<vaga>: {nomes de arquivo}} com os arquivos de todos os
+    uploads e os temporarios das tarefas ainda na fila, montado com uma
+    consulta por tabela
+    """
+    indice = defaultdict(set)
+    consultas = [
+        modelo.objects.values_list("caminho_arquivo", flat=True)
+        for modelo in (
+            EdPessoaVagaCampoCheckboxUpload,
+            EdPessoaVagaCampoComboboxUpload,
+            EdPessoaVagaCampoDateboxUpload,
+        )
+    ]
+    consultas.append(
+        EdPessoaVagaCampoUploadTarefa.objects.filter(
+            situacao__in=SITUACOES_EM_ANDAMENTO
+        ).values_list("caminho_temporario", flat=True)
+    )
+
+    for consulta in consultas:
+        for caminho in consulta.iterator(chunk_size=5000):
+            pasta, arquivo = os.path.split(os.path.normpath(caminho))
+            indice[pasta].add(arquivo)
+    return indice
+
+
+def arquivos_orfaos(indice):
+    """
+    Percorre as pastas dos candidatos em RAIZ_ARQUIVOS_UPLOAD e gera
+    (caminho, tamanho) dos arquivos fora do indice
+    Arquivos alterados ha' menos de UPLOAD_RECONCILIACAO_CARENCIA segundos
+    ficam: o worker prepara o vinculo oculto antes de gravar o upload no
+    banco, e os ocultos podem ser temporarios ainda sendo gravados
+    """
+    limite = time.time() - UPLOAD_RECONCILIACAO_CARENCIA
+    if not os.path.isdir(RAIZ_ARQUIVOS_UPLOAD):
+        return
+
+    with os.scandir(RAIZ_ARQUIVOS_UPLOAD) as pastas:
+        for pasta in pastas:
+            if not (
+                pasta.is_dir(follow_symlinks=False)
+                and REGEX_PASTA_CANDIDATO.match(pasta.name)
+            ):
+                continue
+            esperados = indice.get(pasta.name, set())
+            with os.scandir(pasta.path) as arquivos:
+                for arquivo in arquivos:
+                    if arquivo.name in esperados or not arquivo.is_file(
+                        follow_symlinks=False
+                    ):
+                        continue
+                    try:
+                        estado = arquivo.stat(follow_symlinks=False)
+                    except FileNotFoundError:
+                        continue
+                    # st_ctime muda ao criar o hardlink, st_mtime nao
+                    if max(estado.st_mtime, estado.st_ctime) < limite:
+                        yield arquivo.path, estado.st_size
+
+
+def reconciliar_arquivos(lote=500, apagar=True, progresso=None):
+    """
+    Apaga, em lotes de lote arquivos, os arquivos das pastas dos candidatos
+    que nenhum upload referencia e os da lixeira, e depois os conteudos que
+    ficaram sem referencia. progresso(quantidade, bytes) e' chamado a cada lote
+    Retorna (arquivos, bytes dos arquivos, conteudos, bytes dos conteudos);
+    com apagar=False apenas conta
+    """
+    quantidade = bytes_orfaos = 0
+    pendentes = []
+
+    def apagar_lote():
+        nonlocal quantidade, bytes_orfaos
+        for caminho, tamanho in pendentes:
+            if apagar:
+                try:
+                    os.remove(caminho)
+                except FileNotFoundError:
+                    continue
+            quantidade += 1
+            bytes_orfaos += tamanho
+        pendentes.clear()
+        if progresso:
+            progresso(quantidade, bytes_orfaos)
+
+    for orfao in arquivos_orfaos(indice_arquivos_esperados()):
+        pendentes.append(orfao)
+        if len(pendentes) >= lote:
+            apagar_lote()
+    if pendentes:
+        apagar_lote()
+
+    # Os arquivos apagados acima, e os da lixeira, podem ter liberado a
+    # ultima referencia
+    conteudos = bytes_conteudos = 0
+    if apagar:
+        na_lixeira, bytes_lixeira = esvaziar_lixeira()
+        quantidade += na_lixeira
+        bytes_orfaos += bytes_lixeira
+        conteudos, bytes_conteudos = coletar_conteudos_sem_referencia()
+
+    return quantidade, bytes_orfaos, conteudos, bytes_conteudos
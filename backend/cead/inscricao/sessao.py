@@ -0,0 +1,120 @@
+import time
+
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from cead.messages import (
+    ERRO_GET_VAGA,
+    ERRO_SESSAO_INVALIDA,
+    ERRO_VAGAID_NA_SESSAO,
+    ERRO_VAGAIDHASH_NA_SESSAO,
+)
+from cead.models import CmPessoa, EdPessoaVagaInscricao, EdVaga
+from cead.settings import INSCRICAO_CACHE_VAGA_TEMPO
+from cead.utils import gerar_hash
+
+from .messages import (
+    ERRO_CANDIDATO_NA_SESSAO,
+    ERRO_CANDIDATOHASH_NA_SESSAO,
+    ERRO_CODIGOCANDIDATO_NA_SESSAO,
+    ERRO_CODIGOCANDIDATOHASH_NA_SESSAO,
+    ERRO_GET_CANDIDATO,
+    ERRO_GET_INSCRICAO,
+    ERRO_INSCRICAO_NA_SESSAO,
+    ERRO_INSCRICAOHASH_NA_SESSAO,
+    ERRO_INSCRICOES_ENCERRADAS,
+    ERRO_PONTUACAO_NA_SESSAO,
+    ERRO_PONTUACAOHASH_NA_SESSAO,
+)
+
+# Item da sessao -> (erro se nao estiver na sessao, erro se o hash nao estiver)
+# O hash de cada item e' gravado em <item>_hash
+ITENS_SESSAO = {
+    "vaga_selecionada": (ERRO_VAGAID_NA_SESSAO, ERRO_VAGAIDHASH_NA_SESSAO),
+    "candidato": (ERRO_CANDIDATO_NA_SESSAO, ERRO_CANDIDATOHASH_NA_SESSAO),
+    "codigo_candidato": (
+        ERRO_CODIGOCANDIDATO_NA_SESSAO,
+        ERRO_CODIGOCANDIDATOHASH_NA_SESSAO,
+    ),
+    "pontuacao": (ERRO_PONTUACAO_NA_SESSAO, ERRO_PONTUACAOHASH_NA_SESSAO),
+    "inscricao_id": (ERRO_INSCRICAO_NA_SESSAO, ERRO_INSCRICAOHASH_NA_SESSAO),
+}
+
+# {id da vaga: (vaga com o edital, expira em)}
+_vagas = {}
+
+
+def get_vaga(vaga_id):
+    """
+    Vaga com o edital (select_related), guardada na memoria do processo por
+    INSCRICAO_CACHE_VAGA_TEMPO segundos: todas as etapas do formulario, de
+    todos os candidatos da vaga, leem a mesma
+    """
+    agora = time.monotonic()
+    vaga, expira_em = _vagas.get(vaga_id, (None, 0))
+    if vaga is not None and expira_em > agora:
+        return vaga
+
+    try:
+        vaga = EdVaga.objects.select_related("ed_edital").get(id=vaga_id)
+    except EdVaga.DoesNotExist:
+        raise ValidationError({"detail": ERRO_GET_VAGA})
+    _vagas[vaga_id] = (vaga, agora + INSCRICAO_CACHE_VAGA_TEMPO)
+    return vaga
+
+
+def limpar_cache_vagas():
+    _vagas.clear()
+
+
+def carregar_contexto_inscricao(request, itens_sessao, verificar_prazo_inscricao):
+    """
+    Confere os itens_sessao e seus hashes e carrega request.vaga,
+    request.candidato, request.pontuacao e request.inscricao, conforme os itens
+    """
+    for item in itens_sessao:
+        erro_item, erro_hash = ITENS_SESSAO[item]
+        if item not in request.session:
+            raise ValidationError({"detail": erro_item})
+        if f"{item}_hash" not in request.session:
+            raise ValidationError({"detail": erro_hash})
+
+    for item in itens_sessao:
+        if request.session[f"{item}_hash"] != gerar_hash(request.session[item]):
+            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
+
+    vaga = get_vaga(request.session["vaga_selecionada"])
+    if "candidato" in itens_sessao:
+        try:
+            request.candidato = CmPessoa.objects.get(id=request.session["candidato"])
+        except CmPessoa.DoesNotExist:
+            raise ValidationError({"detail": ERRO_GET_CANDIDATO})
+    if "inscricao_id" in itens_sessao:
+        try:
+            request.inscricao = EdPessoaVagaInscricao.objects.get(
+                id=request.session["inscricao_id"]
+            )
+        except EdPessoaVagaInscricao.DoesNotExist:
+            raise ValidationError({"detail": ERRO_GET_INSCRICAO})
+    if verificar_prazo_inscricao and vaga.ed_edital.data_fim_inscricao < timezone.now():
+        raise ValidationError({"detail": ERRO_INSCRICOES_ENCERRADAS})
+
+    request.vaga = vaga
+    if "pontuacao" in itens_sessao:
+        request.pontuacao = request.session["pontuacao"]
+
+
+class ContextoInscricaoMixin:
+    """
+    Validacao da sessao e carga do contexto comuns a's etapas do formulario
+    de inscricao. Cada view declara os itens que a etapa exige na sessao
+    """
+
+    itens_sessao = ("vaga_selecionada", "candidato", "codigo_candidato")
+    verificar_prazo_inscricao = True
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        carregar_contexto_inscricao(
+            request, self.itens_sessao, self.verificar_prazo_inscricao
+        )
@@ -0,0 +1,68 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from cead.models import (
+    EdCampo,
+    EdEdital,
+    EdVaga,
+    EdVagaCampoCheckbox,
+    EdVagaCampoCombobox,
+    EdVagaCampoDatebox,
+)
+from cead.utils import on_commit_unico
+
+from .esquema import invalidar_esquema_vaga
+from .pontuacao import recalcular_pontuacoes_totais
+from .sessao import limpar_cache_vagas
+
+
+# on_commit: invalida so' depois que a alteracao do admin e' visivel, senao
+# outro worker poderia recompilar o esquema ainda com os dados antigos; uma vez
+# por vaga na transacao, mesmo que o admin grave varios campos
+@receiver(post_save, sender=EdVagaCampoCheckbox)
+@receiver(post_delete, sender=EdVagaCampoCheckbox)
+@receiver(post_save, sender=EdVagaCampoCombobox)
+@receiver(post_delete, sender=EdVagaCampoCombobox)
+@receiver(post_save, sender=EdVagaCampoDatebox)
+@receiver(post_delete, sender=EdVagaCampoDatebox)
+def invalidar_esquema_vaga_do_campo(sender, instance, **kwargs):
+    on_commit_unico(invalidar_esquema_vaga, instance.ed_vaga_id)
+
+
+# A pontuacao_total dos candidatos da vaga usa a pontuacao atual dos campos;
+# recalcula uma vez por vaga na transacao, nao uma vez por campo gravado
+@receiver(post_save, sender=EdVagaCampoCheckbox)
+@receiver(post_delete, sender=EdVagaCampoCheckbox)
+@receiver(post_save, sender=EdVagaCampoCombobox)
+@receiver(post_delete, sender=EdVagaCampoCombobox)
+@receiver(post_save, sender=EdVagaCampoDatebox)
+@receiver(post_delete, sender=EdVagaCampoDatebox)
+def recalcular_pontuacoes_da_vaga(sender, instance, **kwargs):
+    on_commit_unico(recalcular_pontuacoes_totais, instance.ed_vaga_id)
+
+
+# A descricao do rotulo aparece no formulario de todas as vagas que o usam
+@receiver(post_save, sender=EdCampo)
+def invalidar_esquema_vagas_do_rotulo(sender, instance, **kwargs):
+    vagas = set()
+    for modelo in (EdVagaCampoCheckbox, EdVagaCampoCombobox, EdVagaCampoDatebox):
+        vagas.update(
+            modelo.objects.filter(ed_campo=instance).values_list(
+                "ed_vaga_id", flat=True
+            )
+        )
+
+    def invalidar():
+        for vaga_id in vagas:
+            invalidar_esquema_vaga(vaga_id)
+
+    transaction.on_commit(invalidar)
+
+
+# Vaga e edital ficam na memoria por INSCRICAO_CACHE_VAGA_TEMPO; aqui so' o
+# processo que fez a alteracao limpa antes disso
+@receiver(post_save, sender=EdVaga)
+@receiver(post_save, sender=EdEdital)
+def limpar_cache_vagas_alteradas(sender, **kwargs):
+    transaction.on_commit(limpar_cache_vagas)
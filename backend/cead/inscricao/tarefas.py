@@ -0,0 +1,350 @@
+import os
+import time
+from datetime import timedelta
+
+from django.db import DatabaseError, OperationalError, transaction
+from django.db.models import Avg, Count, F, Max, Min
+from django.utils import timezone
+
+from cead.models import (
+    EdPessoaVagaCampoCheckbox,
+    EdPessoaVagaCampoCheckboxUpload,
+    EdPessoaVagaCampoCombobox,
+    EdPessoaVagaCampoComboboxUpload,
+    EdPessoaVagaCampoDatebox,
+    EdPessoaVagaCampoDateboxUpload,
+    EdPessoaVagaCampoUploadTarefa,
+)
+from cead.settings import (
+    RAIZ_ARQUIVOS_UPLOAD,
+    UPLOAD_FILA_MAXIMA,
+    UPLOAD_PROCESSAMENTO_MAXIMO_TENTATIVAS,
+    UPLOAD_PROCESSAMENTO_TEMPO_MAXIMO,
+)
+
+from .messages import ERRO_ARQUIVO_INVALIDO, ERRO_PROCESSAMENTO_ARQUIVO
+from .armazenamento import (
+    caminho_conteudo,
+    guardar_conteudo,
+    preparar_vinculo,
+    vincular_conteudo,
+)
+from .utils import GsIndisponivel, hash_arquivo, processar_arquivo_inscricao
+
+# Tipo do campo -> (modelo do campo da pessoa, modelo do upload, FK do upload)
+MODELOS_POR_TIPO_CAMPO = {
+    "checkbox": (
+        EdPessoaVagaCampoCheckbox,
+        EdPessoaVagaCampoCheckboxUpload,
+        "ed_pessoa_vaga_campo_checkbox",
+    ),
+    "combobox": (
+        EdPessoaVagaCampoCombobox,
+        EdPessoaVagaCampoComboboxUpload,
+        "ed_pessoa_vaga_campo_combobox",
+    ),
+    "datebox": (
+        EdPessoaVagaCampoDatebox,
+        EdPessoaVagaCampoDateboxUpload,
+        "ed_pessoa_vaga_campo_datebox",
+    ),
+}
+
+SITUACOES_EM_ANDAMENTO = ["pendente", "processando"]
+
+
+def _remover_arquivo(caminho_relativo):
+    caminho = os.path.join(RAIZ_ARQUIVOS_UPLOAD, caminho_relativo)
+    if os.path.exists(caminho):
+        os.remove(caminho)
+
+
+def enfileirar_arquivo(
+    candidato,
+    vaga,
+    campo_tipo,
+    ed_vaga_campo_id,
+    ed_pessoa_vaga_campo_id,
+    caminho_temporario,
+    caminho_arquivo,
+    requer_assinatura,
+    sha256,
+):
+    """
+    Registra o arquivo ja' gravado em caminho_temporario para processamento
+    Um envio novo para o mesmo campo cancela o anterior ainda nao concluido
+    """
+    with transaction.atomic():
+        anteriores = list(
+            EdPessoaVagaCampoUploadTarefa.objects.select_for_update()
+            .filter(
+                cm_pessoa=candidato,
+                ed_vaga=vaga,
+                tipo_campo=campo_tipo,
+                ed_vaga_campo_id=ed_vaga_campo_id,
+                situacao__in=SITUACOES_EM_ANDAMENTO,
+            )
+            .values_list("id", "situacao", "caminho_temporario")
+        )
+        EdPessoaVagaCampoUploadTarefa.objects.filter(
+            id__in=[id for id, _, _ in anteriores]
+        ).update(situacao="cancelado", concluido_em=timezone.now())
+
+        tarefa = EdPessoaVagaCampoUploadTarefa.objects.create(
+            cm_pessoa=candidato,
+            ed_vaga=vaga,
+            tipo_campo=campo_tipo,
+            ed_vaga_campo_id=ed_vaga_campo_id,
+            ed_pessoa_vaga_campo_id=ed_pessoa_vaga_campo_id,
+            caminho_temporario=caminho_temporario,
+            caminho_arquivo=caminho_arquivo,
+            requer_assinatura=requer_assinatura,
+            sha256=sha256,
+        )
+
+    # Se estava em processamento, o worker apaga o temporario ao terminar
+    for _, situacao, caminho in anteriores:
+        if situacao == "pendente":
+            _remover_arquivo(caminho)
+
+    return tarefa
+
+
+def cancelar_tarefas(pessoa_id, vaga_id):
+    """
+    Cancela as tarefas ainda na fila do candidato na vaga (inscricao apagada)
+    A que estiver em processamento nao grava o upload: o worker so' finaliza
+    tarefas ainda em processamento
+    """
+    return EdPessoaVagaCampoUploadTarefa.objects.filter(
+        cm_pessoa_id=pessoa_id, ed_vaga_id=vaga_id, situacao__in=SITUACOES_EM_ANDAMENTO
+    ).update(situacao="cancelado", concluido_em=timezone.now())
+
+
+def reservar_tarefas(quantidade):
+    """
+    Marca ate' quantidade tarefas pendentes como em processamento e as retorna
+    skip_locked permite varios workers consumindo a mesma fila
+    """
+    with transaction.atomic():
+        ids = list(
+            EdPessoaVagaCampoUploadTarefa.objects.select_for_update(skip_locked=True)
+            .filter(situacao="pendente")
+            .order_by("id")
+            .values_list("id", flat=True)[:quantidade]
+        )
+        EdPessoaVagaCampoUploadTarefa.objects.filter(id__in=ids).update(
+            situacao="processando",
+            iniciado_em=timezone.now(),
+            tentativas=F("tentativas") + 1,
+        )
+    return list(EdPessoaVagaCampoUploadTarefa.objects.filter(id__in=ids))
+
+
+def recuperar_tarefas_interrompidas():
+    """
+    Tarefas em processamento ha' mais de UPLOAD_PROCESSAMENTO_TEMPO_MAXIMO
+    pertencem a worker que morreu: voltam para a fila, ou falham se ja'
+    esgotaram as tentativas
+    """
+    limite = timezone.now() - timedelta(seconds=UPLOAD_PROCESSAMENTO_TEMPO_MAXIMO)
+    interrompidas = EdPessoaVagaCampoUploadTarefa.objects.filter(
+        situacao="processando", iniciado_em__lt=limite
+    )
+
+    esgotadas = list(
+        interrompidas.filter(
+            tentativas__gte=UPLOAD_PROCESSAMENTO_MAXIMO_TENTATIVAS
+        ).values_list("id", "caminho_temporario")
+    )
+    EdPessoaVagaCampoUploadTarefa.objects.filter(
+        id__in=[id for id, _ in esgotadas]
+    ).update(
+        situacao="erro",
+        mensagem=ERRO_PROCESSAMENTO_ARQUIVO,
+        concluido_em=timezone.now(),
+    )
+    for _, caminho in esgotadas:
+        _remover_arquivo(caminho)
+
+    return interrompidas.filter(
+        tentativas__lt=UPLOAD_PROCESSAMENTO_MAXIMO_TENTATIVAS
+    ).update(situacao="pendente")
+
+
+def _finalizar_tarefa(tarefa, situacao, mensagem=None, duracao=None):
+    # So' grava se ninguem cancelou a tarefa durante o processamento
+    return EdPessoaVagaCampoUploadTarefa.objects.filter(
+        id=tarefa.id, situacao="processando"
+    ).update(
+        situacao=situacao,
+        mensagem=mensagem,
+        duracao=duracao,
+        concluido_em=timezone.now(),
+    )
+
+
+def processar_tarefa(tarefa):
+    """
+    Processa o arquivo temporario (se o conteudo ainda nao estiver guardado),
+    grava o upload e so' entao vincula o caminho definitivo ao conteudo.
+    Se o arquivo for recusado, o upload anterior (se houver) continua
+    valendo e o motivo fica na tarefa, para o candidato consultar
+    """
+    modelo_campo, modelo_upload, fk_upload = MODELOS_POR_TIPO_CAMPO[tarefa.tipo_campo]
+    caminho_temporario = os.path.join(RAIZ_ARQUIVOS_UPLOAD, tarefa.caminho_temporario)
+    caminho = os.path.join(RAIZ_ARQUIVOS_UPLOAD, tarefa.caminho_arquivo)
+
+    try:
+        # O candidato pode ter desmarcado o campo depois do envio
+        if not modelo_campo.objects.filter(id=tarefa.ed_pessoa_vaga_campo_id).exists():
+            _finalizar_tarefa(tarefa, "cancelado")
+            _remover_arquivo(tarefa.caminho_temporario)
+            return
+
+        inicio = time.monotonic()
+        extensao = os.path.splitext(tarefa.caminho_arquivo)[1].lower()
+        sha256 = tarefa.sha256 or hash_arquivo(caminho_temporario)
+        conteudo = caminho_conteudo(sha256, extensao, tarefa.requer_assinatura)
+        # Conteudo repetido (mesmo documento em outra vaga, por exemplo)
+        # ja' foi processado: custa apenas o hash
+        if not os.path.exists(conteudo):
+            processar_arquivo_inscricao(
+                caminho_temporario, extensao, tarefa.requer_assinatura, sha256
+            )
+            guardar_conteudo(caminho_temporario, conteudo)
+        try:
+            vinculo = preparar_vinculo(conteudo, caminho)
+        except FileNotFoundError:
+            # Coletado entre a verificacao e o vinculo: processa de novo, fora
+            # da transacao, para nao segurar a tarefa durante o Ghostscript
+            processar_arquivo_inscricao(
+                caminho_temporario, extensao, tarefa.requer_assinatura, sha256
+            )
+            guardar_conteudo(caminho_temporario, conteudo)
+            vinculo = preparar_vinculo(conteudo, caminho)
+        duracao = time.monotonic() - inicio
+
+        # O arquivo do candidato so' muda depois que o upload foi gravado: se
+        # o banco falhar, o vinculo e' desfeito e o arquivo anterior fica
+        try:
+            with transaction.atomic():
+                # Cancelada por um envio mais recente para o mesmo campo
+                concluida = _finalizar_tarefa(tarefa, "concluido", duracao=duracao)
+                if concluida:
+                    modelo_upload.objects.update_or_create(
+                        **{f"{fk_upload}_id": tarefa.ed_pessoa_vaga_campo_id},
+                        defaults={
+                            "caminho_arquivo": tarefa.caminho_arquivo,
+                            "validado": False,
+                        },
+                    )
+        except Exception:
+            os.remove(vinculo)
+            raise
+
+        if concluida:
+            vincular_conteudo(vinculo, caminho)
+        else:
+            os.remove(vinculo)
+        _remover_arquivo(tarefa.caminho_temporario)
+
+    except GsIndisponivel:
+        # Nao conta como tentativa: so' volta para a fila
+        EdPessoaVagaCampoUploadTarefa.objects.filter(
+            id=tarefa.id, situacao="processando"
+        ).update(situacao="pendente", tentativas=F("tentativas") - 1)
+    except OperationalError:
+        # Falha passageira do banco nao diz nada do arquivo: volta para a
+        # fila, com o arquivo temporario, ate' esgotar as tentativas
+        if tarefa.tentativas >= UPLOAD_PROCESSAMENTO_MAXIMO_TENTATIVAS:
+            _finalizar_tarefa(tarefa, "erro", ERRO_PROCESSAMENTO_ARQUIVO)
+            _remover_arquivo(tarefa.caminho_temporario)
+        else:
+            EdPessoaVagaCampoUploadTarefa.objects.filter(
+                id=tarefa.id, situacao="processando"
+            ).update(situacao="pendente")
+    except DatabaseError:
+        # Erro permanente (integridade, campo apagado depois da verificacao):
+        # tentar de novo nao adianta, e o arquivo nao tem culpa
+        _finalizar_tarefa(tarefa, "erro", ERRO_PROCESSAMENTO_ARQUIVO)
+        _remover_arquivo(tarefa.caminho_temporario)
+    except ValueError as e:
+        _finalizar_tarefa(tarefa, "erro", str(e))
+        _remover_arquivo(tarefa.caminho_temporario)
+    except Exception as e:
+        _finalizar_tarefa(tarefa, "erro", f"{ERRO_ARQUIVO_INVALIDO}: {str(e)}")
+        _remover_arquivo(tarefa.caminho_temporario)
+
+
+def situacao_arquivos(candidato, vaga):
+    """
+    Situacao do envio mais recente de cada campo, para o front end consultar
+    """
+    tarefas = (
+        EdPessoaVagaCampoUploadTarefa.objects.filter(cm_pessoa=candidato, ed_vaga=vaga)
+        .exclude(situacao="cancelado")
+        .order_by("tipo_campo", "ed_vaga_campo_id", "-id")
+        .distinct("tipo_campo", "ed_vaga_campo_id")
+        .values("tipo_campo", "ed_vaga_campo_id", "situacao", "mensagem")
+    )
+    return [
+        {
+            "campo": f"{tarefa['tipo_campo']}_{tarefa['ed_vaga_campo_id']}",
+            "situacao": tarefa["situacao"],
+            "mensagem": tarefa["mensagem"],
+        }
+        for tarefa in tarefas
+    ]
+
+
+def ha_arquivos_em_processamento(candidato, vaga):
+    return EdPessoaVagaCampoUploadTarefa.objects.filter(
+        cm_pessoa=candidato, ed_vaga=vaga, situacao__in=SITUACOES_EM_ANDAMENTO
+    ).exists()
+
+
+def fila_cheia():
+    """
+    Pressao de volta: com a fila acima de UPLOAD_FILA_MAXIMA, novos envios
+    sao recusados ate' os workers darem conta
+    """
+    return (
+        EdPessoaVagaCampoUploadTarefa.objects.filter(situacao="pendente").count()
+        >= UPLOAD_FILA_MAXIMA
+    )
+
+
+def metricas_fila(minutos=60):
+    """
+    Tamanho da fila por situacao, idade da tarefa pendente mais antiga e
+    tempos de processamento dos ultimos minutos
+    """
+    agora = timezone.now()
+    por_situacao = dict(
+        EdPessoaVagaCampoUploadTarefa.objects.filter(
+            situacao__in=SITUACOES_EM_ANDAMENTO
+        )
+        .values_list("situacao")
+        .annotate(total=Count("id"))
+    )
+    pendente_mais_antiga = EdPessoaVagaCampoUploadTarefa.objects.filter(
+        situacao="pendente"
+    ).aggregate(criado_em=Min("criado_em"))["criado_em"]
+    tempos = EdPessoaVagaCampoUploadTarefa.objects.filter(
+        concluido_em__gte=agora - timedelta(minutes=minutos),
+        duracao__isnull=False,
+    ).aggregate(total=Count("id"), media=Avg("duracao"), maximo=Max("duracao"))
+
+    return {
+        "pendentes": por_situacao.get("pendente", 0),
+        "processando": por_situacao.get("processando", 0),
+        "espera_mais_antiga": (
+            (agora - pendente_mais_antiga).total_seconds()
+            if pendente_mais_antiga
+            else 0
+        ),
+        "processados": tempos["total"],
+        "duracao_media": tempos["media"] or 0,
+        "duracao_maxima": tempos["maximo"] or 0,
+    }
@@ -59,6 +59,11 @@ urlpatterns = [
     path(
         "anexar_arquivos/", views.AnexarArquivosView.as_view(), name="anexar_arquivos"
     ),
+    path(
+        "anexar_arquivos/situacao/",
+        views.SituacaoArquivosView.as_view(),
+        name="situacao_arquivos",
+    ),
     path(
         "finalizar_inscricao/",
         views.FinalizarInscricaoView.as_view(),
@@ -1,11 +1,39 @@
+import fcntl
+import hashlib
+import itertools
+import mmap
 import os
+import re
 import subprocess
+import time
 import uuid
 import shutil
+from contextlib import contextmanager
 
 from PIL import Image
 from PyPDF2 import PdfReader
-from .messages import ERRO_ARQUIVO_INVALIDO, ERRO_ARQUIVO_SENHA, ERRO_GS_NAO_ENCONTRADO
+from django.db import IntegrityError
+
+from cead.models import EdArquivoCompressao
+from cead.settings import (
+    GS_ESPERA_MAXIMA,
+    GS_MAXIMO_PROCESSOS,
+    GS_MEMORIA_MAXIMA,
+    GS_PASTA_TRAVAS,
+    GS_TEMPO_MAXIMO,
+    PDF_COMPRESSAO_BYTES_POR_PAGINA,
+    PDF_COMPRESSAO_DPI_MAXIMO,
+    PDF_COMPRESSAO_PAGINAS_ANALISADAS,
+    UPLOAD_TAMANHO_MAXIMO,
+)
+from .messages import (
+    ERRO_ARQUIVO_INVALIDO,
+    ERRO_ARQUIVO_INVALIDO_TIPO_INVALIDO,
+    ERRO_ARQUIVO_SENHA,
+    ERRO_ARQUIVO_TAMANHO_MAXIMO,
+    ERRO_GS_NAO_ENCONTRADO,
+    ERRO_VERIFICACAO_ASSINATURA_DIGITAL,
+)
 
 
 def redimensionar_imagem(image_path, output_path, max_size=(1600, 900)):
@@ -14,24 +42,207 @@ def redimensionar_imagem(image_path, output_path, max_size=(1600, 900)):
     img.save(output_path)
 
 
-def comprimir_pdf(input_path: str, output_path: str):
+class GsIndisponivel(Exception):
+    """
+    Todos os processos gs permitidos estao ocupados: o arquivo deve voltar
+    para a fila, e nao ser recusado
+    """
+
+
+@contextmanager
+def reservar_processo_gs():
+    """
+    Limita a GS_MAXIMO_PROCESSOS os gs simultaneos no servidor, inclusive entre
+    processos diferentes, com um arquivo de trava (flock) por processo permitido
+    """
+    os.makedirs(GS_PASTA_TRAVAS, exist_ok=True)
+    limite = time.monotonic() + GS_ESPERA_MAXIMA
+    while True:
+        for posicao in range(GS_MAXIMO_PROCESSOS):
+            trava = open(os.path.join(GS_PASTA_TRAVAS, f"gs_{posicao}.lock"), "w")
+            try:
+                fcntl.flock(trava, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                trava.close()
+                continue
+            try:
+                yield
+            finally:
+                fcntl.flock(trava, fcntl.LOCK_UN)
+                trava.close()
+            return
+        if time.monotonic() > limite:
+            raise GsIndisponivel()
+        time.sleep(0.5)
+
+
+# Primeiros bytes aceitos para cada extensao, para conferir o tipo real do
+# arquivo; como no imghdr, qualquer imagem (jpeg ou png) vale para as
+# extensoes de imagem (PNG salvo como .jpg, por exemplo)
+ASSINATURA_PDF = b"%PDF-"
+ASSINATURAS_IMAGEM = (b"\x89PNG\r\n\x1a\n", b"\xff\xd8\xff")
+ASSINATURAS_TIPO_ARQUIVO = {
+    ".png": ASSINATURAS_IMAGEM,
+    ".jpg": ASSINATURAS_IMAGEM,
+    ".jpeg": ASSINATURAS_IMAGEM,
+}
+
+
+def gravar_arquivo_enviado(arquivo, extensao: str, destino: str) -> str:
+    """
+    Grava o arquivo enviado em uma unica passada: confere o tamanho maximo e o
+    tipo real (pelos primeiros bytes, antes de abrir o destino) e calcula o
+    sha256 enquanto grava. Retorna o sha256
+    Levanta ValueError, sem deixar nada no disco, se o arquivo for recusado
+    """
+    if arquivo.size and arquivo.size > UPLOAD_TAMANHO_MAXIMO:
+        raise ValueError(ERRO_ARQUIVO_TAMANHO_MAXIMO)
+
+    partes = arquivo.chunks()
+    primeira_parte = next(partes, b"")
+    # O cabecalho do PDF pode vir depois de lixo, ate' o byte 1024
+    if extensao == ".pdf":
+        tipo_valido = ASSINATURA_PDF in primeira_parte[:1024]
+    else:
+        tipo_valido = primeira_parte.startswith(ASSINATURAS_TIPO_ARQUIVO[extensao])
+    if not tipo_valido:
+        raise ValueError(ERRO_ARQUIVO_INVALIDO_TIPO_INVALIDO)
+
+    sha256 = hashlib.sha256()
+    tamanho = 0
     try:
+        with open(destino, "wb") as f:
+            for parte in itertools.chain([primeira_parte], partes):
+                tamanho += len(parte)
+                if tamanho > UPLOAD_TAMANHO_MAXIMO:
+                    raise ValueError(ERRO_ARQUIVO_TAMANHO_MAXIMO)
+                sha256.update(parte)
+                f.write(parte)
+    except BaseException:
+        if os.path.exists(destino):
+            os.remove(destino)
+        raise
+
+    return sha256.hexdigest()
+
+
+def hash_arquivo(caminho: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for parte in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(parte)
+    return sha256.hexdigest()
+
+
+def _filtros_imagem(imagem):
+    filtros = imagem.get("/Filter")
+    if filtros is None:
+        return []
+    if isinstance(filtros, list):
+        return [str(filtro) for filtro in filtros]
+    return [str(filtros)]
+
+
+def analisar_pdf(reader, tamanho: int):
+    """
+    Decide se vale a pena passar o PDF pelo gs (/ebook: imagens a 150 DPI, JPEG)
+    Retorna (comprimir, motivo, paginas). As imagens sao procuradas apenas nas
+    primeiras PDF_COMPRESSAO_PAGINAS_ANALISADAS paginas
+    """
+    paginas = len(reader.pages)
+    if not paginas or tamanho / paginas < PDF_COMPRESSAO_BYTES_POR_PAGINA:
+        return False, "pequeno", paginas
+
+    ha_imagens = False
+    for pagina in reader.pages[:PDF_COMPRESSAO_PAGINAS_ANALISADAS]:
+        recursos = pagina.get("/Resources")
+        xobjetos = recursos.get_object().get("/XObject") if recursos else None
+        if not xobjetos:
+            continue
+
+        # Largura da pagina em polegadas, para estimar o DPI das imagens
+        largura = float(pagina.mediabox.width) / 72 or 1
+        for xobjeto in xobjetos.get_object().values():
+            imagem = xobjeto.get_object()
+            if imagem.get("/Subtype") != "/Image":
+                continue
+            ha_imagens = True
+            dpi = int(imagem.get("/Width", 0)) / largura
+            ja_comprimida = any(
+                filtro in ("/DCTDecode", "/JPXDecode", "/JBIG2Decode")
+                for filtro in _filtros_imagem(imagem)
+            )
+            if dpi > PDF_COMPRESSAO_DPI_MAXIMO or not ja_comprimida:
+                return True, "imagens", paginas
+
+    if not ha_imagens:
+        return False, "sem_imagens", paginas
+    return False, "imagens_otimizadas", paginas
+
+
+def _registrar_compressao(sha256, comprimir, motivo, paginas, tamanho, tamanho_final):
+    try:
+        EdArquivoCompressao.objects.update_or_create(
+            sha256=sha256,
+            defaults={
+                "comprimir": comprimir,
+                "motivo": motivo,
+                "paginas": paginas,
+                "tamanho_original": tamanho,
+                "tamanho_final": tamanho_final,
+            },
+        )
+    except IntegrityError:
+        # Outro worker registrou o mesmo documento ao mesmo tempo
+        pass
+
+
+def comprimir_pdf(input_path: str, output_path: str, sha256: str = None):
+    """
+    Comprime com o gs apenas se a analise indicar ganho, e fica com o menor
+    entre o original e o comprimido. A decisao e' guardada pelo hash do
+    conteudo, para o mesmo documento nao ser analisado de novo
+    """
+    temp_output_path = None
+    try:
+        tamanho = os.path.getsize(input_path)
+        sha256 = sha256 or hash_arquivo(input_path)
+        decisao = EdArquivoCompressao.objects.filter(sha256=sha256).first()
+        if decisao and not decisao.comprimir:
+            return
+
         with open(input_path, "rb") as f:
             reader = PdfReader(f)
             if reader.is_encrypted:
                 raise ValueError(ERRO_ARQUIVO_SENHA)
 
+            if not decisao:
+                comprimir, motivo, paginas = analisar_pdf(reader, tamanho)
+                if not comprimir:
+                    _registrar_compressao(
+                        sha256, False, motivo, paginas, tamanho, tamanho
+                    )
+                    return
+            else:
+                paginas = decisao.paginas
+
         gs_path = shutil.which("gs") or "/usr/local/bin/gs"
         if not os.path.exists(gs_path):
             raise ValueError(ERRO_GS_NAO_ENCONTRADO)
 
         # O gs não consegue escrever no arquivo em uso,
         # então cria outro e depois move para o nome original
+        # Oculto, para não ser confundido com arquivo do candidato
         temp_output_path = os.path.join(
-            os.path.dirname(output_path), f"{uuid.uuid4().hex}.pdf"
+            os.path.dirname(output_path), f".{uuid.uuid4().hex}.pdf"
         )
 
+        # ulimit -v (em KB) limita a memoria do gs, que troca de processo
+        # com o exec (preexec_fn nao e' seguro com as threads do worker)
         args = [
+            "/bin/sh",
+            "-c",
+            f'ulimit -v {GS_MEMORIA_MAXIMA * 1024} && exec "$0" "$@"',
             gs_path,
             "-sDEVICE=pdfwrite",
             "-dCompatibilityLevel=1.4",
@@ -43,8 +254,112 @@ def comprimir_pdf(input_path: str, output_path: str):
             input_path,
         ]
 
-        subprocess.run(args, check=True)
+        with reservar_processo_gs():
+            try:
+                subprocess.run(args, check=True, timeout=GS_TEMPO_MAXIMO)
+            except subprocess.TimeoutExpired:
+                # O PDF e' valido (o PdfReader abriu), so' nao compensa esperar:
+                # fica o original, sem compressao
+                return
+
+        # O gs as vezes aumenta o arquivo (PDF de texto, imagens ja' otimizadas)
+        tamanho_final = os.path.getsize(temp_output_path)
+        if tamanho_final >= tamanho:
+            _registrar_compressao(
+                sha256, False, "saida_maior", paginas, tamanho, tamanho_final
+            )
+            return
+
         os.replace(temp_output_path, output_path)
+        _registrar_compressao(
+            sha256, True, "comprimido", paginas, tamanho, tamanho_final
+        )
 
+    except GsIndisponivel:
+        raise
     except Exception as e:
         raise ValueError(f"{ERRO_ARQUIVO_INVALIDO}: {str(e)}")
+    finally:
+        if temp_output_path and os.path.exists(temp_output_path):
+            os.remove(temp_output_path)
+
+
+# Para verificar_assinatura_pdf_rapida
+REGEX_CAMPO_ASSINATURA = re.compile(rb"/FT\s*/Sig\b")
+REGEX_DICIONARIO_ASSINATURA = re.compile(rb"/Type\s*/Sig\b")
+REGEX_BYTERANGE = re.compile(rb"/ByteRange\s*\[")
+
+
+def verificar_assinatura_pdf_rapida(caminho):
+    """
+    Procura a assinatura direto nos bytes do arquivo (mmap), sem montar o PDF
+    Retorna True ou False quando da' para decidir, None quando e' inconclusivo
+    - Assinado: o dicionario da assinatura (/ByteRange e /Contents) fica sempre
+      em claro no arquivo, em geral na ultima atualizacao incremental, porque o
+      assinador grava os deslocamentos; junto com /AcroForm e o campo /Sig, e'
+      assinatura
+    - Sem nenhum /Sig e sem object streams (/ObjStm, onde os dicionarios ficam
+      comprimidos), nao ha' campo de assinatura
+    """
+    with open(caminho, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as conteudo:
+            tem_byterange = REGEX_BYTERANGE.search(conteudo) is not None
+            tem_campo = REGEX_CAMPO_ASSINATURA.search(conteudo) is not None
+            if (
+                tem_byterange
+                and conteudo.find(b"/AcroForm") != -1
+                and (
+                    tem_campo
+                    or REGEX_DICIONARIO_ASSINATURA.search(conteudo) is not None
+                )
+            ):
+                return True
+            if conteudo.find(b"/Sig") == -1 and conteudo.find(b"/ObjStm") == -1:
+                return False
+    return None
+
+
+def verificar_assinatura_pdf_completa(caminho):
+    with open(caminho, "rb") as f:
+        reader = PdfReader(f)
+        if reader.get_fields():
+            for field_name, field in reader.get_fields().items():
+                if field.get("/FT") == "/Sig":
+                    return True
+        return False
+
+
+def verificar_assinatura_pdf(caminho):
+    """
+    Verifica se um PDF possui pelo menos uma assinatura digital válida
+    Retorna True se encontrar pelo menos uma assinatura, False caso contrário
+    Monta o PDF inteiro (PyPDF2) apenas se a busca direta for inconclusiva
+    """
+    assinado = verificar_assinatura_pdf_rapida(caminho)
+    if assinado is None:
+        assinado = verificar_assinatura_pdf_completa(caminho)
+    return assinado
+
+
+def processar_arquivo_inscricao(
+    caminho: str, extensao: str, requer_assinatura: bool, sha256: str = None
+):
+    """
+    Verifica a assinatura ou comprime o PDF, ou redimensiona a imagem, no proprio
+    caminho. Executado pelo comando processar_arquivos_inscricao, fora do request
+    O tipo real do arquivo ja' foi conferido em gravar_arquivo_enviado
+    Levanta ValueError com a mensagem para o candidato se o arquivo for recusado
+    """
+    if extensao == ".pdf":
+        if requer_assinatura:
+            if not verificar_assinatura_pdf(caminho):
+                raise ValueError(ERRO_VERIFICACAO_ASSINATURA_DIGITAL)
+        else:
+            comprimir_pdf(caminho, caminho, sha256)
+    else:
+        try:
+            redimensionar_imagem(caminho, caminho)
+        except Exception as e:
+            raise ValueError(f"{ERRO_ARQUIVO_INVALIDO}: {str(e)}")
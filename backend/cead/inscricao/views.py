@@ -1,11 +1,10 @@
-import imghdr
 import os
-import shutil
+import uuid
 from datetime import datetime
 from pathlib import Path
 
-from PyPDF2 import PdfReader
-from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import BooleanField, CharField, Exists, F, OuterRef, Value
 from django.http import HttpResponse
 from django.utils import timezone
 from rest_framework import serializers, status
@@ -32,13 +31,15 @@ from cead.models import (
     EdPessoaVagaCampoDateboxUpload,
     EdPessoaVagaCota,
     EdPessoaVagaInscricao,
+    EdPessoaVagaPontuacao,
     EdVaga,
-    EdVagaCampoCheckbox,
-    EdVagaCampoCombobox,
-    EdVagaCampoDatebox,
     EdVagaCota,
 )
-from cead.settings import EMAIL_HOST_USER, RAIZ_ARQUIVOS_UPLOAD
+from cead.settings import (
+    RAIZ_ARQUIVOS_UPLOAD,
+    UPLOAD_FILA_RETRY_AFTER,
+)
+from cead.fila_email import PRIORIDADE_URGENTE, enfileirar_email
 from cead.utils import cortar_nome_arquivo, gerar_hash
 from cead.messages import (
     EMAIL_ASSINATURA,
@@ -46,29 +47,25 @@ from cead.messages import (
     EMAIL_ENDERECO_NAO_MONITORADO,
     ERRO_GET_ARQUIVO,
     ERRO_GET_EDITAL,
-    ERRO_GET_VAGA,
     ERRO_GET_VAGAS,
     ERRO_INSERCAO_ED_PESSOA_VAGA_CAMPO_CHECKBOX,
     ERRO_INSERCAO_ED_PESSOA_VAGA_CAMPO_COMBOBOX,
     ERRO_INSERCAO_ED_PESSOA_VAGA_CAMPO_DATEBOX,
-    ERRO_SESSAO_INVALIDA,
-    ERRO_VAGAID_NA_SESSAO,
-    ERRO_VAGAIDHASH_NA_SESSAO,
     INFO_ENTRE_CONTATO_ACADEMICO,
     INFO_ENTRE_CONTATO_SUPORTE,
 )
 from cead.serializers import CPFSerializer, GetPessoaEmailSerializer
 
 from .api_docs import *
+from .armazenamento import mover_para_lixeira
+from .esquema import get_esquema_vaga
 from .messages import *
 from .serializers import (
     CheckboxPessoaSerializer,
-    CheckboxSerializer,
     CmPessoaPostSerializer,
     ComboboxPessoaSerializer,
     CotaMarcadaSerializer,
     DateboxPessoaSerializer,
-    DateboxSerializer,
     GetEditaisSerializer,
     GetPessoaFormacaoSerializer,
     GetVagasSerializer,
@@ -76,74 +73,67 @@ from .serializers import (
     PostPessoaFormacaoSerializer,
     PostVagasSerializer,
 )
+from .pontuacao import atualizar_pontuacao
+from .sessao import ContextoInscricaoMixin
+from .tarefas import (
+    MODELOS_POR_TIPO_CAMPO,
+    cancelar_tarefas,
+    enfileirar_arquivo,
+    fila_cheia,
+    ha_arquivos_em_processamento,
+    situacao_arquivos,
+)
 from .utils import *
 
 
 def apaga_outra_inscricao_no_mesmo_edital(pessoa_id, ed_pessoa_vaga_inscricao_id):
+    """
+    Apaga a inscricao e o que o candidato marcou e enviou na vaga dela: os ids
+    dos campos sao resolvidos em uma consulta (union dos tres tipos) e cada
+    tabela e' apagada com um DELETE por id, sem joins, em uma transacao
+    A pasta dos arquivos vai para a lixeira so' depois do commit; quem a
+    esvazia e' a reconciliacao, fora da requisicao
+    """
     try:
-        ed_pessoa_vaga_inscricao = EdPessoaVagaInscricao.objects.get(
-            id=ed_pessoa_vaga_inscricao_id
-        )
-        vaga_id = ed_pessoa_vaga_inscricao.ed_vaga_id
-
-        # -----------------------------
-        # 1. Apaga filhos do Datebox (Periodos e Uploads)
-        # -----------------------------
-        EdPessoaVagaCampoDateboxPeriodo.objects.filter(
-            ed_pessoa_vaga_campo_datebox__cm_pessoa_id=pessoa_id,
-            ed_pessoa_vaga_campo_datebox__ed_vaga_campo_datebox__ed_vaga_id=vaga_id,
-        ).delete()
-
-        EdPessoaVagaCampoDateboxUpload.objects.filter(
-            ed_pessoa_vaga_campo_datebox__cm_pessoa_id=pessoa_id,
-            ed_pessoa_vaga_campo_datebox__ed_vaga_campo_datebox__ed_vaga_id=vaga_id,
-        ).delete()
-
-        # -----------------------------
-        # 2. Apaga filhos de Combobox e Checkbox (Uploads)
-        # -----------------------------
-        EdPessoaVagaCampoCheckboxUpload.objects.filter(
-            ed_pessoa_vaga_campo_checkbox__cm_pessoa_id=pessoa_id,
-            ed_pessoa_vaga_campo_checkbox__ed_vaga_campo_checkbox__ed_vaga_id=vaga_id,
-        ).delete()
-
-        EdPessoaVagaCampoComboboxUpload.objects.filter(
-            ed_pessoa_vaga_campo_combobox__cm_pessoa_id=pessoa_id,
-            ed_pessoa_vaga_campo_combobox__ed_vaga_campo_combobox__ed_vaga_id=vaga_id,
-        ).delete()
-
-        # -----------------------------
-        # 3. Apaga os registros principais dos campos
-        # -----------------------------
-        EdPessoaVagaCampoDatebox.objects.filter(
-            cm_pessoa_id=pessoa_id,
-            ed_vaga_campo_datebox__ed_vaga_id=vaga_id,
-        ).delete()
-
-        EdPessoaVagaCampoCheckbox.objects.filter(
-            cm_pessoa_id=pessoa_id,
-            ed_vaga_campo_checkbox__ed_vaga_id=vaga_id,
-        ).delete()
-
-        EdPessoaVagaCampoCombobox.objects.filter(
-            cm_pessoa_id=pessoa_id,
-            ed_vaga_campo_combobox__ed_vaga_id=vaga_id,
-        ).delete()
-
-        # -----------------------------
-        # 4. Apaga a inscrição em si
-        # -----------------------------
-        ed_pessoa_vaga_inscricao.delete()
-
-        # -----------------------------
-        # 5. Apaga arquivos do upload local (se existirem)
-        # -----------------------------
-        pasta_a_apagar = os.path.join(
-            RAIZ_ARQUIVOS_UPLOAD,
-            f"{pessoa_id}_{vaga_id}",
-        )
-        if os.path.exists(pasta_a_apagar):
-            shutil.rmtree(pasta_a_apagar)
+        vaga_id = EdPessoaVagaInscricao.objects.values_list(
+            "ed_vaga_id", flat=True
+        ).get(id=ed_pessoa_vaga_inscricao_id, cm_pessoa_id=pessoa_id)
+
+        with transaction.atomic():
+            # {tipo do campo: [ids das marcacoes do candidato na vaga]}
+            ids_por_tipo = {tipo: [] for tipo in MODELOS_POR_TIPO_CAMPO}
+            consultas = [
+                modelo_campo.objects.filter(
+                    cm_pessoa_id=pessoa_id,
+                    **{f"ed_vaga_campo_{tipo}__ed_vaga_id": vaga_id},
+                )
+                .annotate(tipo=Value(tipo, output_field=CharField()))
+                .values_list("tipo", "id")
+                for tipo, (modelo_campo, _, _) in MODELOS_POR_TIPO_CAMPO.items()
+            ]
+            for tipo, id in consultas[0].union(*consultas[1:], all=True):
+                ids_por_tipo[tipo].append(id)
+
+            if ids_por_tipo["datebox"]:
+                EdPessoaVagaCampoDateboxPeriodo.objects.filter(
+                    ed_pessoa_vaga_campo_datebox_id__in=ids_por_tipo["datebox"]
+                ).delete()
+            for tipo, ids in ids_por_tipo.items():
+                if not ids:
+                    continue
+                modelo_campo, modelo_upload, fk_upload = MODELOS_POR_TIPO_CAMPO[tipo]
+                modelo_upload.objects.filter(**{f"{fk_upload}_id__in": ids}).delete()
+                modelo_campo.objects.filter(id__in=ids).delete()
+
+            cancelar_tarefas(pessoa_id, vaga_id)
+            EdPessoaVagaPontuacao.objects.filter(
+                cm_pessoa_id=pessoa_id, ed_vaga_id=vaga_id
+            ).delete()
+            EdPessoaVagaInscricao.objects.filter(
+                id=ed_pessoa_vaga_inscricao_id
+            ).delete()
+
+            transaction.on_commit(lambda: mover_para_lixeira(f"{pessoa_id}_{vaga_id}"))
 
     except EdPessoaVagaInscricao.DoesNotExist:
         pass
@@ -175,18 +165,234 @@ def get_ed_pessoa_vaga_campos(request):
     }
 
 
-def verificar_assinatura_pdf(caminho):
+def salvar_ed_pessoa_vaga_campos(
+    request,
+    esquema,
+    ids_checkbox_vaga,
+    ids_combobox_vaga,
+    periodos_por_datebox,
+    pontuacao,
+):
+    """
+    Grava a selecao de campos do candidato na vaga: compara, em memoria, com o
+    que ja' esta' no banco e aplica a diferenca com bulk_create e delete em
+    lote, em uma transacao. O numero de consultas nao depende do numero de
+    campos da vaga
+    Campos desmarcados perdem os uploads; os arquivos ficam para a reconciliacao
+    A pontuacao do candidato na vaga e' gravada na mesma transacao
+    """
+    candidato = request.candidato
+
+    with transaction.atomic():
+        # Serializa os salvamentos do mesmo candidato, para nao duplicar marcacoes
+        list(
+            CmPessoa.objects.select_for_update()
+            .filter(id=candidato.id)
+            .values_list("id", flat=True)
+        )
+
+        ed_pessoa_vaga_campos = get_ed_pessoa_vaga_campos(request)
+        # {id do campo da vaga: id da marcacao do candidato}
+        checkboxes_marcados = dict(
+            ed_pessoa_vaga_campos["checkboxes"].values_list(
+                "ed_vaga_campo_checkbox_id", "id"
+            )
+        )
+        comboboxes_marcados = dict(
+            ed_pessoa_vaga_campos["comboboxes"].values_list(
+                "ed_vaga_campo_combobox_id", "id"
+            )
+        )
+        dateboxes_marcados = dict(
+            ed_pessoa_vaga_campos["dateboxes"].values_list(
+                "ed_vaga_campo_datebox_id", "id"
+            )
+        )
+
+        # Pode haver campos marcados anteriormente, entao apaga o que o usuario quer desmarcar
+        checkboxes_nao_marcados_agora = [
+            checkboxes_marcados.pop(id)
+            for id in checkboxes_marcados.keys() - ids_checkbox_vaga
+        ]
+        if checkboxes_nao_marcados_agora:
+            EdPessoaVagaCampoCheckboxUpload.objects.filter(
+                ed_pessoa_vaga_campo_checkbox_id__in=checkboxes_nao_marcados_agora
+            ).delete()
+            EdPessoaVagaCampoCheckbox.objects.filter(
+                id__in=checkboxes_nao_marcados_agora
+            ).delete()
+
+        comboboxes_nao_marcados_agora = [
+            comboboxes_marcados.pop(id)
+            for id in comboboxes_marcados.keys() - ids_combobox_vaga
+        ]
+        if comboboxes_nao_marcados_agora:
+            EdPessoaVagaCampoComboboxUpload.objects.filter(
+                ed_pessoa_vaga_campo_combobox_id__in=comboboxes_nao_marcados_agora
+            ).delete()
+            EdPessoaVagaCampoCombobox.objects.filter(
+                id__in=comboboxes_nao_marcados_agora
+            ).delete()
+
+        dateboxes_nao_marcados_agora = [
+            dateboxes_marcados.pop(id)
+            for id in dateboxes_marcados.keys() - periodos_por_datebox.keys()
+        ]
+        if dateboxes_nao_marcados_agora:
+            EdPessoaVagaCampoDateboxUpload.objects.filter(
+                ed_pessoa_vaga_campo_datebox_id__in=dateboxes_nao_marcados_agora
+            ).delete()
+            EdPessoaVagaCampoDateboxPeriodo.objects.filter(
+                ed_pessoa_vaga_campo_datebox_id__in=dateboxes_nao_marcados_agora
+            ).delete()
+            EdPessoaVagaCampoDatebox.objects.filter(
+                id__in=dateboxes_nao_marcados_agora
+            ).delete()
+
+        # Periodos ja' gravados dos dateboxes que continuam marcados, para so'
+        # apagar e criar o que mudou (a pessoa entra com A ate' B e depois
+        # edita para A ate' C)
+        periodos_existentes = list(
+            EdPessoaVagaCampoDateboxPeriodo.objects.filter(
+                ed_pessoa_vaga_campo_datebox_id__in=dateboxes_marcados.values()
+            ).values_list("id", "ed_pessoa_vaga_campo_datebox_id", "inicio", "fim")
+        )
+
+        EdPessoaVagaCampoCheckbox.objects.bulk_create(
+            [
+                EdPessoaVagaCampoCheckbox(
+                    cm_pessoa=candidato, ed_vaga_campo_checkbox_id=id
+                )
+                for id in ids_checkbox_vaga - checkboxes_marcados.keys()
+            ]
+        )
+        EdPessoaVagaCampoCombobox.objects.bulk_create(
+            [
+                EdPessoaVagaCampoCombobox(
+                    cm_pessoa=candidato, ed_vaga_campo_combobox_id=id
+                )
+                for id in ids_combobox_vaga - comboboxes_marcados.keys()
+            ]
+        )
+        dateboxes_novos = EdPessoaVagaCampoDatebox.objects.bulk_create(
+            [
+                EdPessoaVagaCampoDatebox(
+                    cm_pessoa=candidato, ed_vaga_campo_datebox_id=id
+                )
+                for id in periodos_por_datebox.keys() - dateboxes_marcados.keys()
+            ]
+        )
+        dateboxes_marcados.update(
+            {
+                datebox.ed_vaga_campo_datebox_id: datebox.id
+                for datebox in dateboxes_novos
+            }
+        )
+
+        periodos_recebidos = {
+            (dateboxes_marcados[id], inicio, fim)
+            for id, periodos in periodos_por_datebox.items()
+            for inicio, fim in periodos
+        }
+        periodos_a_apagar = [
+            id
+            for id, datebox, inicio, fim in periodos_existentes
+            if (datebox, inicio, fim) not in periodos_recebidos
+        ]
+        if periodos_a_apagar:
+            EdPessoaVagaCampoDateboxPeriodo.objects.filter(
+                id__in=periodos_a_apagar
+            ).delete()
+        EdPessoaVagaCampoDateboxPeriodo.objects.bulk_create(
+            [
+                EdPessoaVagaCampoDateboxPeriodo(
+                    ed_pessoa_vaga_campo_datebox_id=datebox, inicio=inicio, fim=fim
+                )
+                for datebox, inicio, fim in periodos_recebidos
+                - {periodo[1:] for periodo in periodos_existentes}
+            ]
+        )
+
+        atualizar_pontuacao(
+            candidato,
+            request.vaga,
+            esquema,
+            ids_checkbox_vaga,
+            ids_combobox_vaga,
+            periodos_por_datebox.keys(),
+            pontuacao,
+        )
+
+
+def get_arquivos_faltantes(request):
     """
-    Verifica se um PDF possui pelo menos uma assinatura digital válida
-    Retorna True se encontrar pelo menos uma assinatura, False caso contrário
+    Campos marcados pelo candidato sem arquivo enviado e dateboxes sem periodo,
+    no formato <tipo>_<id do campo da vaga>, com uma unica consulta (union dos
+    tres tipos, com Exists para o arquivo e para o periodo)
     """
-    with open(caminho, "rb") as f:
-        reader = PdfReader(f)
-        if reader.get_fields():
-            for field_name, field in reader.get_fields().items():
-                if field.get("/FT") == "/Sig":
-                    return True
-        return False
+    ed_pessoa_vaga_campos = get_ed_pessoa_vaga_campos(request)
+    colunas = ("tipo", "campo", "tem_arquivo", "tem_periodo")
+
+    checkboxes = (
+        ed_pessoa_vaga_campos["checkboxes"]
+        .annotate(
+            tipo=Value("checkbox", output_field=CharField()),
+            campo=F("ed_vaga_campo_checkbox_id"),
+            tem_arquivo=Exists(
+                EdPessoaVagaCampoCheckboxUpload.objects.filter(
+                    ed_pessoa_vaga_campo_checkbox=OuterRef("pk")
+                )
+            ),
+            tem_periodo=Value(True, output_field=BooleanField()),
+        )
+        .values_list(*colunas)
+    )
+    comboboxes = (
+        ed_pessoa_vaga_campos["comboboxes"]
+        .annotate(
+            tipo=Value("combobox", output_field=CharField()),
+            campo=F("ed_vaga_campo_combobox_id"),
+            tem_arquivo=Exists(
+                EdPessoaVagaCampoComboboxUpload.objects.filter(
+                    ed_pessoa_vaga_campo_combobox=OuterRef("pk")
+                )
+            ),
+            tem_periodo=Value(True, output_field=BooleanField()),
+        )
+        .values_list(*colunas)
+    )
+    # Garante, por segurança, que tem pelo menos um período preenchido
+    dateboxes = (
+        ed_pessoa_vaga_campos["dateboxes"]
+        .annotate(
+            tipo=Value("datebox", output_field=CharField()),
+            campo=F("ed_vaga_campo_datebox_id"),
+            tem_arquivo=Exists(
+                EdPessoaVagaCampoDateboxUpload.objects.filter(
+                    ed_pessoa_vaga_campo_datebox=OuterRef("pk")
+                )
+            ),
+            tem_periodo=Exists(
+                EdPessoaVagaCampoDateboxPeriodo.objects.filter(
+                    ed_pessoa_vaga_campo_datebox=OuterRef("pk"),
+                    inicio__isnull=False,
+                    fim__isnull=False,
+                )
+            ),
+        )
+        .values_list(*colunas)
+    )
+
+    ordem_tipos = {"checkbox": 0, "combobox": 1, "datebox": 2}
+    campos = sorted(
+        checkboxes.union(comboboxes, dateboxes, all=True),
+        key=lambda campo: (ordem_tipos[campo[0]], campo[1]),
+    )
+    return [
+        f"{tipo}_{campo}"
+        for tipo, campo, tem_arquivo, tem_periodo in campos
+        if not (tem_arquivo and tem_periodo)
+    ]
 
 
 @extend_schema(**DOCS_EDITAIS_FASE_INSCRICAO_VIEW)
@@ -258,26 +464,8 @@ class VagasEditalFaseInscricaoView(GenericAPIView):
 
 
 @extend_schema(**DOCS_VALIDAR_CPF_VIEW)
-class ValidarCPFView(APIView):
-    def initial(self, request, *args, **kwargs):
-        super().initial(request, *args, **kwargs)
-
-        if "vaga_selecionada" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAID_NA_SESSAO})
-        if "vaga_selecionada_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAIDHASH_NA_SESSAO})
-        if request.session["vaga_selecionada_hash"] != gerar_hash(
-            request.session["vaga_selecionada"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        try:
-            vaga = EdVaga.objects.get(id=request.session["vaga_selecionada"])
-        except EdVaga.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_VAGA})
-        if vaga.ed_edital.data_fim_inscricao < timezone.now():
-            raise ValidationError({"detail": ERRO_INSCRICOES_ENCERRADAS})
-
-        request.vaga = vaga
+class ValidarCPFView(ContextoInscricaoMixin, APIView):
+    itens_sessao = ("vaga_selecionada",)
 
     def post(self, request):
         serializer = CPFSerializer(data=request.data)
@@ -301,27 +489,8 @@ class ValidarCPFView(APIView):
 
 
 @extend_schema(**DOCS_CRIAR_PESSOA_VIEW)
-class CriarPessoaView(APIView):
-    def initial(self, request, *args, **kwargs):
-        super().initial(request, *args, **kwargs)
-
-        if "vaga_selecionada" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAID_NA_SESSAO})
-        if "vaga_selecionada_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAIDHASH_NA_SESSAO})
-        if request.session["vaga_selecionada_hash"] != gerar_hash(
-            request.session["vaga_selecionada"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-
-        try:
-            vaga = EdVaga.objects.get(id=request.session["vaga_selecionada"])
-        except EdVaga.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_VAGA})
-        if vaga.ed_edital.data_fim_inscricao < timezone.now():
-            raise ValidationError({"detail": ERRO_INSCRICOES_ENCERRADAS})
-
-        request.vaga = vaga
+class CriarPessoaView(ContextoInscricaoMixin, APIView):
+    itens_sessao = ("vaga_selecionada",)
 
     def post(self, request):
         serializer = CmPessoaPostSerializer(data=request.data)
@@ -348,42 +517,9 @@ class CriarPessoaView(APIView):
 
 
 @extend_schema(**DOCS_ENVIAR_CODIGO_EMAIL_VIEW)
-class EnviarCodigoEmailView(GenericAPIView):
+class EnviarCodigoEmailView(ContextoInscricaoMixin, GenericAPIView):
     serializer_class = GetPessoaEmailSerializer
-
-    def initial(self, request, *args, **kwargs):
-        super().initial(request, *args, **kwargs)
-
-        if "vaga_selecionada" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAID_NA_SESSAO})
-        if "vaga_selecionada_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAIDHASH_NA_SESSAO})
-        if "candidato" not in request.session:
-            raise ValidationError({"detail": ERRO_CANDIDATO_NA_SESSAO})
-        if "candidato_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_CANDIDATOHASH_NA_SESSAO})
-        if request.session["vaga_selecionada_hash"] != gerar_hash(
-            request.session["vaga_selecionada"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        if request.session["candidato_hash"] != gerar_hash(
-            request.session["candidato"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-
-        try:
-            vaga = EdVaga.objects.get(id=request.session["vaga_selecionada"])
-        except EdVaga.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_VAGA})
-        try:
-            candidato = CmPessoa.objects.get(id=request.session["candidato"])
-        except CmPessoa.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_CANDIDATO})
-        if vaga.ed_edital.data_fim_inscricao < timezone.now():
-            raise ValidationError({"detail": ERRO_INSCRICOES_ENCERRADAS})
-
-        request.vaga = vaga
-        request.candidato = candidato
+    itens_sessao = ("vaga_selecionada", "candidato")
 
     def get(self, request):
         return Response(
@@ -413,52 +549,29 @@ class EnviarCodigoEmailView(GenericAPIView):
             f"{EMAIL_ASSINATURA}"
         )
 
-        send_mail(
+        # O envio fica com o comando enviar_emails; pedir de novo dentro do
+        # mesmo bloco gera o mesmo codigo, entao nao enfileira outra mensagem
+        # Depois dos 10 minutos que VerificarCodigoView aceita, o codigo nao
+        # serve mais: a mensagem falha em vez de ser enviada; passa na frente
+        # das fichas enfileiradas em massa
+        enfileirar_email(
+            request.candidato.email,
             assunto,
             mensagem,
-            EMAIL_HOST_USER,
-            [request.candidato.email],
-            fail_silently=False,
+            chave=(
+                f"codigo_inscricao:{request.candidato.id}:"
+                f"{request.vaga.id}:{bloco_timestamp}"
+            ),
+            expira_em=agora + timezone.timedelta(minutes=10),
+            prioridade=PRIORIDADE_URGENTE,
         )
 
         return Response({"detail": OK_CODIGO_EMAIL_ENVIADO}, status=status.HTTP_200_OK)
 
 
 @extend_schema(**DOCS_VERIFICAR_CODIGO_VIEW)
-class VerificarCodigoView(APIView):
-    def initial(self, request, *args, **kwargs):
-        super().initial(request, *args, **kwargs)
-
-        if "vaga_selecionada" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAID_NA_SESSAO})
-        if "vaga_selecionada_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAIDHASH_NA_SESSAO})
-        if "candidato" not in request.session:
-            raise ValidationError({"detail": ERRO_CANDIDATO_NA_SESSAO})
-        if "candidato_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_CANDIDATOHASH_NA_SESSAO})
-        if request.session["vaga_selecionada_hash"] != gerar_hash(
-            request.session["vaga_selecionada"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        if request.session["candidato_hash"] != gerar_hash(
-            request.session["candidato"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-
-        try:
-            vaga = EdVaga.objects.get(id=request.session["vaga_selecionada"])
-        except EdVaga.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_VAGA})
-        try:
-            candidato = CmPessoa.objects.get(id=request.session["candidato"])
-        except CmPessoa.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_CANDIDATO})
-        if vaga.ed_edital.data_fim_inscricao < timezone.now():
-            raise ValidationError({"detail": ERRO_INSCRICOES_ENCERRADAS})
-
-        request.vaga = vaga
-        request.candidato = candidato
+class VerificarCodigoView(ContextoInscricaoMixin, APIView):
+    itens_sessao = ("vaga_selecionada", "candidato")
 
     def post(self, request):
         serializer = serializers.Serializer(data=request.data)
@@ -509,49 +622,7 @@ class VerificarCodigoView(APIView):
 
 
 @extend_schema(**DOCS_ASSOCIAR_PESSOA_VAGA_COTA_VIEW)
-class AssociarPessoaVagaCotaView(APIView):
-    def initial(self, request, *args, **kwargs):
-        super().initial(request, *args, **kwargs)
-
-        if "vaga_selecionada" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAID_NA_SESSAO})
-        if "vaga_selecionada_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAIDHASH_NA_SESSAO})
-        if "candidato" not in request.session:
-            raise ValidationError({"detail": ERRO_CANDIDATO_NA_SESSAO})
-        if "candidato_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_CANDIDATOHASH_NA_SESSAO})
-        if "codigo_candidato" not in request.session:
-            raise ValidationError({"detail": ERRO_CODIGOCANDIDATO_NA_SESSAO})
-        if "codigo_candidato_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_CODIGOCANDIDATOHASH_NA_SESSAO})
-        if request.session["vaga_selecionada_hash"] != gerar_hash(
-            request.session["vaga_selecionada"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        if request.session["candidato_hash"] != gerar_hash(
-            request.session["candidato"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        if request.session["codigo_candidato_hash"] != gerar_hash(
-            request.session["codigo_candidato"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-
-        try:
-            vaga = EdVaga.objects.get(id=request.session["vaga_selecionada"])
-        except EdVaga.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_VAGA})
-        try:
-            candidato = CmPessoa.objects.get(id=request.session["candidato"])
-        except CmPessoa.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_CANDIDATO})
-        if vaga.ed_edital.data_fim_inscricao < timezone.now():
-            raise ValidationError({"detail": ERRO_INSCRICOES_ENCERRADAS})
-
-        request.vaga = vaga
-        request.candidato = candidato
-
+class AssociarPessoaVagaCotaView(ContextoInscricaoMixin, APIView):
     def get(self, request, *args, **kwargs):
         try:
             cotas_disponiveis = [
@@ -646,49 +717,7 @@ class AssociarPessoaVagaCotaView(APIView):
 
 
 @extend_schema(**DOCS_LISTAR_PESSOA_FORMACAO_VIEW)
-class ListarPessoaFormacaoView(APIView):
-    def initial(self, request, *args, **kwargs):
-        super().initial(request, *args, **kwargs)
-
-        if "vaga_selecionada" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAID_NA_SESSAO})
-        if "vaga_selecionada_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAIDHASH_NA_SESSAO})
-        if "candidato" not in request.session:
-            raise ValidationError({"detail": ERRO_CANDIDATO_NA_SESSAO})
-        if "candidato_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_CANDIDATOHASH_NA_SESSAO})
-        if "codigo_candidato" not in request.session:
-            raise ValidationError({"detail": ERRO_CODIGOCANDIDATO_NA_SESSAO})
-        if "codigo_candidato_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_CODIGOCANDIDATOHASH_NA_SESSAO})
-
-        if request.session["vaga_selecionada_hash"] != gerar_hash(
-            request.session["vaga_selecionada"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        if request.session["candidato_hash"] != gerar_hash(
-            request.session["candidato"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        if request.session["codigo_candidato_hash"] != gerar_hash(
-            request.session["codigo_candidato"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-
-        try:
-            vaga = EdVaga.objects.get(id=request.session["vaga_selecionada"])
-        except EdVaga.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_VAGA})
-        try:
-            candidato = CmPessoa.objects.get(id=request.session["candidato"])
-        except CmPessoa.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_CANDIDATO})
-        if vaga.ed_edital.data_fim_inscricao < timezone.now():
-            raise ValidationError({"detail": ERRO_INSCRICOES_ENCERRADAS})
-
-        request.candidato = candidato
-
+class ListarPessoaFormacaoView(ContextoInscricaoMixin, APIView):
     def get(self, request):
         pessoa_formacoes_serializer = GetPessoaFormacaoSerializer(
             EdPessoaFormacao.objects.filter(cm_pessoa=request.candidato), many=True
@@ -758,50 +787,7 @@ class ListarFormacaoView(APIView):
 
 
 @extend_schema(**DOCS_ALERTA_INSCRICAO_VIEW)
-class AlertaInscricaoView(APIView):
-    def initial(self, request, *args, **kwargs):
-        super().initial(request, *args, **kwargs)
-
-        if "vaga_selecionada" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAID_NA_SESSAO})
-        if "vaga_selecionada_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAIDHASH_NA_SESSAO})
-        if "candidato" not in request.session:
-            raise ValidationError({"detail": ERRO_CANDIDATO_NA_SESSAO})
-        if "candidato_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_CANDIDATOHASH_NA_SESSAO})
-        if "codigo_candidato" not in request.session:
-            raise ValidationError({"detail": ERRO_CODIGOCANDIDATO_NA_SESSAO})
-        if "codigo_candidato_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_CODIGOCANDIDATOHASH_NA_SESSAO})
-
-        if request.session["vaga_selecionada_hash"] != gerar_hash(
-            request.session["vaga_selecionada"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        if request.session["candidato_hash"] != gerar_hash(
-            request.session["candidato"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        if request.session["codigo_candidato_hash"] != gerar_hash(
-            request.session["codigo_candidato"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-
-        try:
-            vaga = EdVaga.objects.get(id=request.session["vaga_selecionada"])
-        except EdVaga.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_VAGA})
-        try:
-            candidato = CmPessoa.objects.get(id=request.session["candidato"])
-        except CmPessoa.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_CANDIDATO})
-        if vaga.ed_edital.data_fim_inscricao < timezone.now():
-            raise ValidationError({"detail": ERRO_INSCRICOES_ENCERRADAS})
-
-        request.vaga = vaga
-        request.candidato = candidato
-
+class AlertaInscricaoView(ContextoInscricaoMixin, APIView):
     # Primeiro testa a vaga, se der, ja responde e sai, depois nas outras vagas do mesmo edital
     def get(self, request):
         if EdPessoaVagaInscricao.objects.filter(
@@ -839,82 +825,10 @@ class AlertaInscricaoView(APIView):
 
 
 @extend_schema(**DOCS_VAGA_CAMPOS_VIEW)
-class VagaCamposView(APIView):
-    def initial(self, request, *args, **kwargs):
-        super().initial(request, *args, **kwargs)
-
-        if "vaga_selecionada" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAID_NA_SESSAO})
-        if "vaga_selecionada_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAIDHASH_NA_SESSAO})
-        if "candidato" not in request.session:
-            raise ValidationError({"detail": ERRO_CANDIDATO_NA_SESSAO})
-        if "candidato_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_CANDIDATOHASH_NA_SESSAO})
-        if "codigo_candidato" not in request.session:
-            raise ValidationError({"detail": ERRO_CODIGOCANDIDATO_NA_SESSAO})
-        if "codigo_candidato_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_CODIGOCANDIDATOHASH_NA_SESSAO})
-
-        if request.session["vaga_selecionada_hash"] != gerar_hash(
-            request.session["vaga_selecionada"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        if request.session["candidato_hash"] != gerar_hash(
-            request.session["candidato"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        if request.session["codigo_candidato_hash"] != gerar_hash(
-            request.session["codigo_candidato"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-
-        try:
-            vaga = EdVaga.objects.get(id=request.session["vaga_selecionada"])
-        except EdVaga.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_VAGA})
-        try:
-            candidato = CmPessoa.objects.get(id=request.session["candidato"])
-        except CmPessoa.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_CANDIDATO})
-        if vaga.ed_edital.data_fim_inscricao < timezone.now():
-            raise ValidationError({"detail": ERRO_INSCRICOES_ENCERRADAS})
-
-        request.vaga = vaga
-        request.candidato = candidato
-
+class VagaCamposView(ContextoInscricaoMixin, APIView):
     def get(self, request):
-        checkboxes_da_vaga = EdVagaCampoCheckbox.objects.filter(ed_vaga=request.vaga)
-        comboboxes_da_vaga = EdVagaCampoCombobox.objects.filter(
-            ed_vaga=request.vaga
-        ).order_by("ed_campo_id", "ordem")
-        dateboxes_da_vaga = EdVagaCampoDatebox.objects.filter(ed_vaga=request.vaga)
-
-        response_data = {}
-
-        if checkboxes_da_vaga.exists():
-            checkboxes_serializer = CheckboxSerializer(checkboxes_da_vaga, many=True)
-            response_data["checkboxes"] = checkboxes_serializer.data
-
-        # Agrupar os comboboxes pela descricao do campo
-        if comboboxes_da_vaga.exists():
-            comboboxes_da_vaga_separados = {}
-            for item in comboboxes_da_vaga:
-                descricao = item.ed_campo.descricao
-                detalhes = {
-                    "id": item.id,
-                    "descricao": item.descricao,
-                    "pontuacao": item.pontuacao,
-                    "obrigatorio": item.obrigatorio,
-                }
-                if descricao not in comboboxes_da_vaga_separados:
-                    comboboxes_da_vaga_separados[descricao] = []
-                comboboxes_da_vaga_separados[descricao].append(detalhes)
-            response_data["comboboxes"] = comboboxes_da_vaga_separados
-
-        if dateboxes_da_vaga.exists():
-            dateboxes_serializer = DateboxSerializer(dateboxes_da_vaga, many=True)
-            response_data["dateboxes"] = dateboxes_serializer.data
+        # Montado uma vez por vaga, ate' a proxima alteracao no admin
+        response_data = get_esquema_vaga(request.vaga.id).campos_da_vaga
 
         if response_data:
             return Response(response_data, status=status.HTTP_200_OK)
@@ -925,50 +839,7 @@ class VagaCamposView(APIView):
 
 
 @extend_schema(**DOCS_PESSOA_VAGA_CAMPO_VIEW)
-class PessoaVagaCampoView(APIView):
-    def initial(self, request, *args, **kwargs):
-        super().initial(request, *args, **kwargs)
-
-        if "vaga_selecionada" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAID_NA_SESSAO})
-        if "vaga_selecionada_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAIDHASH_NA_SESSAO})
-        if "candidato" not in request.session:
-            raise ValidationError({"detail": ERRO_CANDIDATO_NA_SESSAO})
-        if "candidato_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_CANDIDATOHASH_NA_SESSAO})
-        if "codigo_candidato" not in request.session:
-            raise ValidationError({"detail": ERRO_CODIGOCANDIDATO_NA_SESSAO})
-        if "codigo_candidato_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_CODIGOCANDIDATOHASH_NA_SESSAO})
-
-        if request.session["vaga_selecionada_hash"] != gerar_hash(
-            request.session["vaga_selecionada"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        if request.session["candidato_hash"] != gerar_hash(
-            request.session["candidato"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        if request.session["codigo_candidato_hash"] != gerar_hash(
-            request.session["codigo_candidato"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-
-        try:
-            vaga = EdVaga.objects.get(id=request.session["vaga_selecionada"])
-        except EdVaga.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_VAGA})
-        try:
-            candidato = CmPessoa.objects.get(id=request.session["candidato"])
-        except CmPessoa.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_CANDIDATO})
-        if vaga.ed_edital.data_fim_inscricao < timezone.now():
-            raise ValidationError({"detail": ERRO_INSCRICOES_ENCERRADAS})
-
-        request.vaga = vaga
-        request.candidato = candidato
-
+class PessoaVagaCampoView(ContextoInscricaoMixin, APIView):
     def get(self, request):
         ed_pessoa_vaga_campos = get_ed_pessoa_vaga_campos(request)
 
@@ -987,75 +858,49 @@ class PessoaVagaCampoView(APIView):
         return Response(response_data, status=status.HTTP_200_OK)
 
     def post(self, request):
-        ed_pessoa_vaga_campos = get_ed_pessoa_vaga_campos(request)
-
-        checkboxes_da_vaga = EdVagaCampoCheckbox.objects.filter(ed_vaga=request.vaga)
-        comboboxes_da_vaga = EdVagaCampoCombobox.objects.filter(
-            ed_vaga=request.vaga
-        ).order_by("ed_campo_id", "ordem")
-        dateboxes_da_vaga = EdVagaCampoDatebox.objects.filter(ed_vaga=request.vaga)
+        # Campos da vaga (do cache): validam o POST e dao a pontuacao
+        esquema = get_esquema_vaga(request.vaga.id)
 
         pontuacao_candidato = 0
 
         ## Processa checkboxes
-        array_temporario_id_checkbox_vaga = [
+        try:
             # Filtra o POST, so pega o checkbox associado, medida de seguranca
-            int(item)
-            for item in request.data.get("checkbox_da_vaga", [])
-            if int(item) in checkboxes_da_vaga.values_list("id", flat=True)
-        ]
+            ids_checkbox_vaga = {
+                int(item) for item in request.data.get("checkbox_da_vaga", [])
+            } & esquema.checkboxes.keys()
+        except (TypeError, ValueError) as e:
+            return Response(
+                {"detail": f"{ERRO_INSERCAO_ED_PESSOA_VAGA_CAMPO_CHECKBOX}: {e}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         # Adiciona os campos obrigatorios e que nao vem no POST
-        for checkbox_obrigatorio_vaga in checkboxes_da_vaga.filter(
-            obrigatorio=True
-        ).values_list("id", flat=True):
-            if checkbox_obrigatorio_vaga not in array_temporario_id_checkbox_vaga:
-                array_temporario_id_checkbox_vaga.append(checkbox_obrigatorio_vaga)
-
-        for id_checkbox_vaga in array_temporario_id_checkbox_vaga:
-            try:
-                EdPessoaVagaCampoCheckbox.objects.get_or_create(
-                    cm_pessoa=request.candidato,
-                    ed_vaga_campo_checkbox_id=id_checkbox_vaga,
-                )
-                pontuacao = EdVagaCampoCheckbox.objects.get(
-                    id=id_checkbox_vaga
-                ).pontuacao
-                if pontuacao:
-                    pontuacao_candidato += pontuacao
-            except Exception as e:
-                return Response(
-                    {"detail": f"{ERRO_INSERCAO_ED_PESSOA_VAGA_CAMPO_CHECKBOX}: {e}"},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+        ids_checkbox_vaga |= esquema.checkboxes_obrigatorios()
+        pontuacao_candidato += esquema.pontuacao_checkboxes(ids_checkbox_vaga)
 
         ## Comboboxes, para facilitar a logica de processamento, sao sempre obrigatorios
         ## O filtro segue abaixo...
-        array_temporario_id_combobox_vaga = [
-            int(combobox_id)
-            for combobox_id in request.data.get("combobox_da_vaga", [])
-            if int(combobox_id) in comboboxes_da_vaga.values_list("id", flat=True)
-        ]
+        try:
+            ids_combobox_vaga = {
+                int(combobox_id)
+                for combobox_id in request.data.get("combobox_da_vaga", [])
+            } & esquema.comboboxes.keys()
+        except (TypeError, ValueError) as e:
+            return Response(
+                {"detail": f"{ERRO_INSERCAO_ED_PESSOA_VAGA_CAMPO_COMBOBOX}: {e}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         # ... como e' obrigatorio, adiciona o que o candidato marcou, salvo se 0/NULL
         # Esse tipo de campo geralmente e' pontuacao por numero de certificados
         # O zero e' placeholder no frontend
-        for id_combobox_vaga in array_temporario_id_combobox_vaga:
-            try:
-                combobox = EdVagaCampoCombobox.objects.get(id=id_combobox_vaga)
-                pontuacao = combobox.pontuacao
-
-                if pontuacao and pontuacao > 0:
-                    EdPessoaVagaCampoCombobox.objects.get_or_create(
-                        cm_pessoa=request.candidato, ed_vaga_campo_combobox=combobox
-                    )
-                    pontuacao_candidato += pontuacao
-
-            except Exception as e:
-                return Response(
-                    {"detail": f"{ERRO_INSERCAO_ED_PESSOA_VAGA_CAMPO_COMBOBOX}: {e}"},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+        ids_combobox_vaga = {
+            id
+            for id in ids_combobox_vaga
+            if (esquema.comboboxes[id]["pontuacao"] or 0) > 0
+        }
+        pontuacao_candidato += esquema.pontuacao_comboboxes(ids_combobox_vaga)
 
         ## Dateboxes
         # Captura o JSON enviado e garante que seja um dicionário
@@ -1067,61 +912,29 @@ class PessoaVagaCampoView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Proteção extra: filtrar apenas os IDs válidos do banco
-        dateboxes_validos = set(dateboxes_da_vaga.values_list("id", flat=True))
-        dateboxes_da_vaga_dict = {
-            int(datebox_id): periodos
-            for datebox_id, periodos in dateboxes_da_vaga_dict.items()
-            if int(datebox_id) in dateboxes_validos
-        }
-
-        # Garante que os obrigatórios estejam presentes
-        for datebox_obrigatorio_vaga in dateboxes_da_vaga.filter(
-            obrigatorio=True
-        ).values_list("id", flat=True):
-            if datebox_obrigatorio_vaga not in dateboxes_da_vaga_dict:
-                # Se o candidato não enviou este datebox obrigatório,
-                # adiciona um período vazio para que o campo ainda passe
-                # pelo fluxo normal de validação (e gere erro se faltando).
-                dateboxes_da_vaga_dict[datebox_obrigatorio_vaga] = [{}]
-
-        # Processamento dos dateboxes
-        for id_datebox_data, periodos in dateboxes_da_vaga_dict.items():
-            if not isinstance(periodos, list):
-                periodos = [periodos]
-
-            try:
-                datebox_obj = EdVagaCampoDatebox.objects.get(id=id_datebox_data)
-
-                ed_pessoa_vaga_campo_datebox_obj, _ = (
-                    EdPessoaVagaCampoDatebox.objects.get_or_create(
-                        cm_pessoa=request.candidato,
-                        ed_vaga_campo_datebox_id=id_datebox_data,
-                    )
-                )
-
-                # 1. Obtém todos os períodos relacionados ao campo, para
-                # não ter que apagar em caso das datas não terem mudado
-
-                # Qual o problema? A pessoa entra com a data A até B, e depois edita
-                # de A até C, então preciso saber o que mudou para apagar o antigo
-
-                # Poderia apagar tudo antes e salvar de novo, mas não é elegante
-                periodos_existentes = list(
-                    EdPessoaVagaCampoDateboxPeriodo.objects.filter(
-                        ed_pessoa_vaga_campo_datebox=ed_pessoa_vaga_campo_datebox_obj
-                    )
-                )
-
-                # 2. Converte para set de tuplas (inicio, fim)
-                periodos_existentes_set = {
-                    (p.inicio, p.fim) for p in periodos_existentes
-                }
+        # {id do datebox da vaga: [(inicio, fim), ...]}
+        periodos_por_datebox = {}
+        try:
+            # Proteção extra: filtrar apenas os IDs válidos do banco
+            dateboxes_da_vaga_dict = {
+                int(datebox_id): periodos
+                for datebox_id, periodos in dateboxes_da_vaga_dict.items()
+                if int(datebox_id) in esquema.dateboxes
+            }
+
+            # Garante que os obrigatórios estejam presentes
+            for id_datebox in esquema.dateboxes_obrigatorios():
+                if id_datebox not in dateboxes_da_vaga_dict:
+                    # Se o candidato não enviou este datebox obrigatório,
+                    # adiciona um período vazio para que o campo ainda passe
+                    # pelo fluxo normal de validação (e gere erro se faltando).
+                    dateboxes_da_vaga_dict[id_datebox] = [{}]
+
+            for id_datebox, periodos in dateboxes_da_vaga_dict.items():
+                if not isinstance(periodos, list):
+                    periodos = [periodos]
 
-                # 3. Prepara os novos períodos a partir do POST
-                periodos_recebidos_set = set()
                 periodos_recebidos_info = []
-
                 for periodo in periodos:
                     date_inicio = (
                         datetime.strptime(periodo.get("inicio"), "%Y-%m-%d").date()
@@ -1147,156 +960,48 @@ class PessoaVagaCampoView(APIView):
                             ERRO_INSCRICAO_DATA_FORMACAO_FIM_MAIOR_OU_IGUAL_DATA_FORMACAO_INICIO
                         )
 
-                    periodos_recebidos_set.add((date_inicio, date_fim))
                     periodos_recebidos_info.append((date_inicio, date_fim))
 
-                # 4. Apaga os que não foram enviados
-                for p in periodos_existentes:
-                    if (p.inicio, p.fim) not in periodos_recebidos_set:
-                        p.delete()
-
-                # 5. Cria os novos
-                for inicio, fim in periodos_recebidos_info:
-                    if (inicio, fim) not in periodos_existentes_set:
-                        EdPessoaVagaCampoDateboxPeriodo.objects.create(
-                            ed_pessoa_vaga_campo_datebox=ed_pessoa_vaga_campo_datebox_obj,
-                            inicio=inicio,
-                            fim=fim,
-                        )
-
-                # 6. Pontuação acumulada
-                pontuacao_total_por_datebox = sum(
-                    int(
-                        (fim - inicio).days / datebox_obj.multiplicador_fracao_pontuacao
-                    )
-                    * datebox_obj.fracao_pontuacao
-                    for inicio, fim in periodos_recebidos_info
-                )
+                periodos_por_datebox[id_datebox] = periodos_recebidos_info
 
-                pontuacao_candidato += min(
-                    pontuacao_total_por_datebox, datebox_obj.pontuacao_maxima
+                # Pontuação acumulada
+                pontuacao_candidato += esquema.pontuacao_datebox(
+                    id_datebox, periodos_recebidos_info
                 )
 
-            except Exception as e:
-                return Response(
-                    {"detail": f"{ERRO_INSERCAO_ED_PESSOA_VAGA_CAMPO_DATEBOX}: {e}"},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-
-        # Pode haver campos marcados anteriormente, entao apaga o que o usuario quer desmarcar
-        lista_de_checkboxes_marcados_pela_pessoa = list(
-            ed_pessoa_vaga_campos["checkboxes"].values_list(
-                "ed_vaga_campo_checkbox_id", flat=True
+        except Exception as e:
+            return Response(
+                {"detail": f"{ERRO_INSERCAO_ED_PESSOA_VAGA_CAMPO_DATEBOX}: {e}"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-        )
-        checkboxes_nao_marcados_agora = list(
-            set(lista_de_checkboxes_marcados_pela_pessoa)
-            - set(array_temporario_id_checkbox_vaga)
-        )
-        EdPessoaVagaCampoCheckboxUpload.objects.filter(
-            ed_pessoa_vaga_campo_checkbox__cm_pessoa=request.candidato,
-            ed_pessoa_vaga_campo_checkbox__ed_vaga_campo_checkbox_id__in=checkboxes_nao_marcados_agora,
-        ).delete()
-        EdPessoaVagaCampoCheckbox.objects.filter(
-            cm_pessoa=request.candidato,
-            ed_vaga_campo_checkbox_id__in=checkboxes_nao_marcados_agora,
-        ).delete()
-
-        lista_de_comboboxes_marcados_pela_pessoa = list(
-            ed_pessoa_vaga_campos["comboboxes"].values_list(
-                "ed_vaga_campo_combobox_id", flat=True
+
+        # So' grava depois de validar tudo: ou salva a selecao inteira, ou nada
+        try:
+            salvar_ed_pessoa_vaga_campos(
+                request,
+                esquema,
+                ids_checkbox_vaga,
+                ids_combobox_vaga,
+                periodos_por_datebox,
+                pontuacao_candidato,
             )
-        )
-        comboboxes_nao_marcados_agora = list(
-            set(lista_de_comboboxes_marcados_pela_pessoa)
-            - set(array_temporario_id_combobox_vaga)
-        )
-        EdPessoaVagaCampoComboboxUpload.objects.filter(
-            ed_pessoa_vaga_campo_combobox__cm_pessoa=request.candidato,
-            ed_pessoa_vaga_campo_combobox__ed_vaga_campo_combobox_id__in=comboboxes_nao_marcados_agora,
-        ).delete()
-        EdPessoaVagaCampoCombobox.objects.filter(
-            cm_pessoa=request.candidato,
-            ed_vaga_campo_combobox_id__in=comboboxes_nao_marcados_agora,
-        ).delete()
-
-        lista_de_dateboxes_marcados_pela_pessoa = list(
-            ed_pessoa_vaga_campos["dateboxes"].values_list(
-                "ed_vaga_campo_datebox_id", flat=True
+        except Exception as e:
+            return Response(
+                {"detail": f"{ERRO_INSERCAO_ED_PESSOA_VAGA_CAMPOS}: {e}"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-        )
-        array_temporario_id_datebox_vaga = list(
-            map(int, request.data.get("datebox_da_vaga", {}).keys())
-        )
-        dateboxes_nao_marcados_agora = list(
-            set(lista_de_dateboxes_marcados_pela_pessoa)
-            - set(array_temporario_id_datebox_vaga)
-        )
-        EdPessoaVagaCampoDateboxUpload.objects.filter(
-            ed_pessoa_vaga_campo_datebox__cm_pessoa=request.candidato,
-            ed_pessoa_vaga_campo_datebox__ed_vaga_campo_datebox_id__in=dateboxes_nao_marcados_agora,
-        ).delete()
-        EdPessoaVagaCampoDateboxPeriodo.objects.filter(
-            ed_pessoa_vaga_campo_datebox__cm_pessoa=request.candidato,
-            ed_pessoa_vaga_campo_datebox__ed_vaga_campo_datebox_id__in=dateboxes_nao_marcados_agora,
-        ).delete()
-        EdPessoaVagaCampoDatebox.objects.filter(
-            cm_pessoa=request.candidato,
-            ed_vaga_campo_datebox_id__in=dateboxes_nao_marcados_agora,
-        ).delete()
 
         request.session["pontuacao"] = pontuacao_candidato
         request.session["pontuacao_hash"] = gerar_hash(pontuacao_candidato)
 
         return Response(
-            {"detail": OK_ED_PESSOA_VAGA_CAMPOS}, status=status.HTTP_201_CREATED
+            {"detail": OK_ED_PESSOA_VAGA_CAMPOS, "pontuacao": pontuacao_candidato},
+            status=status.HTTP_201_CREATED,
         )
 
 
 @extend_schema(**DOCS_BAIXAR_ARQUIVO_INSCRICAO_VIEW)
-class BaixarArquivoInscricaoView(APIView):
-    def initial(self, request, *args, **kwargs):
-        super().initial(request, *args, **kwargs)
-        if "vaga_selecionada" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAID_NA_SESSAO})
-        if "vaga_selecionada_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAIDHASH_NA_SESSAO})
-        if "candidato" not in request.session:
-            raise ValidationError({"detail": ERRO_CANDIDATO_NA_SESSAO})
-        if "candidato_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_CANDIDATOHASH_NA_SESSAO})
-        if "codigo_candidato" not in request.session:
-            raise ValidationError({"detail": ERRO_CODIGOCANDIDATO_NA_SESSAO})
-        if "codigo_candidato_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_CODIGOCANDIDATOHASH_NA_SESSAO})
-
-        if request.session["vaga_selecionada_hash"] != gerar_hash(
-            request.session["vaga_selecionada"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        if request.session["candidato_hash"] != gerar_hash(
-            request.session["candidato"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        if request.session["codigo_candidato_hash"] != gerar_hash(
-            request.session["codigo_candidato"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-
-        try:
-            vaga = EdVaga.objects.get(id=request.session["vaga_selecionada"])
-        except EdVaga.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_VAGA})
-        try:
-            candidato = CmPessoa.objects.get(id=request.session["candidato"])
-        except CmPessoa.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_CANDIDATO})
-        if vaga.ed_edital.data_fim_inscricao < timezone.now():
-            raise ValidationError({"detail": ERRO_INSCRICOES_ENCERRADAS})
-
-        request.vaga = vaga
-        request.candidato = candidato
-
+class BaixarArquivoInscricaoView(ContextoInscricaoMixin, APIView):
     def get(self, request):
         caminho_relativo = request.GET.get("caminho")
 
@@ -1358,59 +1063,9 @@ class BaixarArquivoInscricaoView(APIView):
 
 
 @extend_schema(**DOCS_ANEXAR_ARQUIVOS_VIEW)
-class AnexarArquivosView(APIView):
+class AnexarArquivosView(ContextoInscricaoMixin, APIView):
     parser_classes = (MultiPartParser, FormParser)
-
-    def initial(self, request, *args, **kwargs):
-        super().initial(request, *args, **kwargs)
-
-        if "vaga_selecionada" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAID_NA_SESSAO})
-        if "vaga_selecionada_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAIDHASH_NA_SESSAO})
-        if "candidato" not in request.session:
-            raise ValidationError({"detail": ERRO_CANDIDATO_NA_SESSAO})
-        if "candidato_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_CANDIDATOHASH_NA_SESSAO})
-        if "codigo_candidato" not in request.session:
-            raise ValidationError({"detail": ERRO_CODIGOCANDIDATO_NA_SESSAO})
-        if "codigo_candidato_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_CODIGOCANDIDATOHASH_NA_SESSAO})
-        if "pontuacao" not in request.session:
-            raise ValidationError({"detail": ERRO_PONTUACAO_NA_SESSAO})
-        if "pontuacao_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_PONTUACAOHASH_NA_SESSAO})
-
-        if request.session["vaga_selecionada_hash"] != gerar_hash(
-            request.session["vaga_selecionada"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        if request.session["candidato_hash"] != gerar_hash(
-            request.session["candidato"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        if request.session["pontuacao_hash"] != gerar_hash(
-            request.session["pontuacao"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        if request.session["codigo_candidato_hash"] != gerar_hash(
-            request.session["codigo_candidato"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-
-        try:
-            vaga = EdVaga.objects.get(id=request.session["vaga_selecionada"])
-        except EdVaga.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_VAGA})
-        try:
-            candidato = CmPessoa.objects.get(id=request.session["candidato"])
-        except CmPessoa.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_CANDIDATO})
-        if vaga.ed_edital.data_fim_inscricao < timezone.now():
-            raise ValidationError({"detail": ERRO_INSCRICOES_ENCERRADAS})
-
-        request.vaga = vaga
-        request.candidato = candidato
+    itens_sessao = ("vaga_selecionada", "candidato", "codigo_candidato", "pontuacao")
 
     # Associa os campos marcados com o arquivo que o candidato subiu,
     # se houver, considerando que a inscricao pode ser editada
@@ -1511,6 +1166,14 @@ class AnexarArquivosView(APIView):
     # Se foi deixado de marcar um campo, o arquivo correspondente deve ser
     # apagado, porque a marcacao do campo ja foi embora em PessoaVagaCampoView.post
     def post(self, request):
+        # Fila de processamento saturada: o front end tenta de novo depois
+        if fila_cheia():
+            return Response(
+                {"detail": ERRO_FILA_ARQUIVOS_CHEIA},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(UPLOAD_FILA_RETRY_AFTER)},
+            )
+
         # Campos selecionados pelo candidato
         ed_pessoa_vaga_campos = get_ed_pessoa_vaga_campos(request)
         campos_selecionados_ids = {"checkbox": [], "combobox": [], "datebox": []}
@@ -1528,6 +1191,7 @@ class AnexarArquivosView(APIView):
             campos_selecionados_ids["datebox"].append(datebox.ed_vaga_campo_datebox.id)
 
         # Atualizar ou criar arquivos para campos reenviados
+        arquivos_recebidos = []
         for campo_tipo_arquivo, arquivo in request.FILES.items():
             try:
                 campo_tipo, campo_id_str = campo_tipo_arquivo.split("_")
@@ -1571,107 +1235,78 @@ class AnexarArquivosView(APIView):
                             os.path.splitext(arquivo.name)[1].lower(),
                         ),
                     )
-                    caminho = os.path.join(RAIZ_ARQUIVOS_UPLOAD, caminho_relativo)
 
-                    # Salvar ou atualizar o arquivo correspondente ao campo
-                    if campo_tipo == "checkbox":
-                        EdPessoaVagaCampoCheckboxUpload.objects.update_or_create(
-                            ed_pessoa_vaga_campo_checkbox=ed_campo,
-                            defaults={
-                                "caminho_arquivo": caminho_relativo,
-                                "validado": False,
-                            },
+                    extensao = os.path.splitext(arquivo.name)[1].lower()
+                    extensoes_permitidas = [".pdf", ".jpg", ".jpeg", ".png"]
+
+                    if extensao not in extensoes_permitidas:
+                        return Response(
+                            {"detail": ERRO_ARQUIVO_INVALIDO_TIPO_INVALIDO},
+                            status=status.HTTP_400_BAD_REQUEST,
                         )
+
+                    requer_assinatura = False
+                    if campo_tipo == "checkbox":
+                        requer_assinatura = ed_campo.ed_vaga_campo_checkbox.assinado
                     elif campo_tipo == "combobox":
-                        EdPessoaVagaCampoComboboxUpload.objects.update_or_create(
-                            ed_pessoa_vaga_campo_combobox=ed_campo,
-                            defaults={
-                                "caminho_arquivo": caminho_relativo,
-                                "validado": False,
-                            },
-                        )
+                        requer_assinatura = ed_campo.ed_vaga_campo_combobox.assinado
                     elif campo_tipo == "datebox":
-                        EdPessoaVagaCampoDateboxUpload.objects.update_or_create(
-                            ed_pessoa_vaga_campo_datebox=ed_campo,
-                            defaults={
-                                "caminho_arquivo": caminho_relativo,
-                                "validado": False,
-                            },
+                        requer_assinatura = ed_campo.ed_vaga_campo_datebox.assinado
+                    if requer_assinatura and extensao != ".pdf":
+                        return Response(
+                            {"detail": ERRO_VALIDACAO_ASSINATURA_DIGITAL_PDF},
+                            status=status.HTTP_400_BAD_REQUEST,
                         )
 
+                    # O arquivo fica oculto na pasta do candidato ate' ser
+                    # processado pelo comando processar_arquivos_inscricao,
+                    # que grava o upload na base
+                    caminho_temporario_relativo = os.path.join(
+                        os.path.dirname(caminho_relativo),
+                        f".{uuid.uuid4().hex}{extensao}",
+                    )
+                    caminho_temporario = os.path.join(
+                        RAIZ_ARQUIVOS_UPLOAD, caminho_temporario_relativo
+                    )
+
                     # 🟢 Criar diretório antes de salvar
                     try:
-                        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+                        os.makedirs(os.path.dirname(caminho_temporario), exist_ok=True)
                     except Exception as e:
                         return Response(
                             {"detail": f"{ERRO_CRIACAO_PASTA_UPLOAD}: {str(e)}"},
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
                         )
-                    # 🔵 Primeiro, salva o arquivo fisicamente
+                    # 🔵 Salva o arquivo fisicamente, conferindo tipo e tamanho
                     try:
-                        with open(caminho, "wb+") as destino:
-                            for parte in arquivo.chunks():
-                                destino.write(parte)
+                        sha256 = gravar_arquivo_enviado(
+                            arquivo, extensao, caminho_temporario
+                        )
+                    except ValueError as e:
+                        return Response(
+                            {"detail": str(e)},
+                            status=status.HTTP_400_BAD_REQUEST,
+                        )
                     except Exception as e:
                         return Response(
                             {"detail": f"{ERRO_ARQUIVO_INVALIDO}: {str(e)}"},
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
                         )
-                    # 🔴 Agora processamos o arquivo salvo
-                    extensao = os.path.splitext(arquivo.name)[1].lower()
-                    extensoes_permitidas = [".pdf", ".jpg", ".jpeg", ".png"]
-
-                    if extensao not in extensoes_permitidas:
-                        return Response(
-                            {"detail": ERRO_ARQUIVO_INVALIDO_TIPO_INVALIDO},
-                            status=status.HTTP_400_BAD_REQUEST,
-                        )
-
-                    requer_assinatura = False
-                    if campo_tipo == "checkbox":
-                        requer_assinatura = ed_campo.ed_vaga_campo_checkbox.assinado
-                    elif campo_tipo == "combobox":
-                        requer_assinatura = ed_campo.ed_vaga_campo_combobox.assinado
-                    elif campo_tipo == "datebox":
-                        requer_assinatura = ed_campo.ed_vaga_campo_datebox.assinado
-                    if extensao in [".pdf"]:
-                        if requer_assinatura:
-                            if not verificar_assinatura_pdf(caminho):
-                                if os.path.exists(caminho):
-                                    os.remove(caminho)
-                                return Response(
-                                    {"detail": ERRO_VERIFICACAO_ASSINATURA_DIGITAL},
-                                    status=status.HTTP_400_BAD_REQUEST,
-                                )
-                        else:
-                            try:
-                                comprimir_pdf(caminho, caminho)
-                            except ValueError as e:
-                                return Response(
-                                    {"detail": str(e)},
-                                    status=status.HTTP_400_BAD_REQUEST,
-                                )
-                    elif extensao in [".jpg", ".jpeg", ".png"]:
-                        if requer_assinatura:
-                            return Response(
-                                {"detail": ERRO_VALIDACAO_ASSINATURA_DIGITAL_PDF},
-                                status=status.HTTP_400_BAD_REQUEST,
-                            )
-                        try:
-                            with open(caminho, "rb") as f:
-                                tipo_imagem = imghdr.what(f)
-                            if tipo_imagem in ["jpeg", "png"]:
-                                redimensionar_imagem(caminho, caminho)
-                            else:
-                                return Response(
-                                    {"detail": ERRO_ARQUIVO_INVALIDO},
-                                    status=status.HTTP_400_BAD_REQUEST,
-                                )
-                        except Exception as e:
-                            return Response(
-                                {"detail": f"{ERRO_ARQUIVO_INVALIDO}: {str(e)}"},
-                                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            )
+                    # 🔴 E deixa o processamento para a fila
+                    tarefa = enfileirar_arquivo(
+                        request.candidato,
+                        request.vaga,
+                        campo_tipo,
+                        campo_id,
+                        ed_campo.id,
+                        caminho_temporario_relativo,
+                        caminho_relativo,
+                        requer_assinatura,
+                        sha256,
+                    )
+                    arquivos_recebidos.append(
+                        {"campo": campo_tipo_arquivo, "situacao": tarefa.situacao}
+                    )
             except (IndexError, ValueError, EdCampo.DoesNotExist) as e:
                 return Response(
                     {"detail": f"{ERRO_ARQUIVO_INVALIDO}: {str(e)}"},
@@ -1683,144 +1318,39 @@ class AnexarArquivosView(APIView):
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 )
 
-        ## Segunda parte: excluir arquivos orfaos
-        # Obter todos os arquivos atualmente relacionados no banco de dados apos a atualizacao
-        arquivos_atuais = {
-            "checkbox": list(
-                EdPessoaVagaCampoCheckboxUpload.objects.filter(
-                    ed_pessoa_vaga_campo_checkbox__cm_pessoa=request.candidato,
-                    ed_pessoa_vaga_campo_checkbox__ed_vaga_campo_checkbox__ed_vaga=request.vaga,
-                ).values_list("caminho_arquivo", flat=True)
-            ),
-            "combobox": list(
-                EdPessoaVagaCampoComboboxUpload.objects.filter(
-                    ed_pessoa_vaga_campo_combobox__cm_pessoa=request.candidato,
-                    ed_pessoa_vaga_campo_combobox__ed_vaga_campo_combobox__ed_vaga=request.vaga,
-                ).values_list("caminho_arquivo", flat=True)
-            ),
-            "datebox": list(
-                EdPessoaVagaCampoDateboxUpload.objects.filter(
-                    ed_pessoa_vaga_campo_datebox__cm_pessoa=request.candidato,
-                    ed_pessoa_vaga_campo_datebox__ed_vaga_campo_datebox__ed_vaga=request.vaga,
-                ).values_list("caminho_arquivo", flat=True)
-            ),
-        }
-
-        # Listar todos os arquivos no diretorio de uploads do candidato
-        diretorio_candidato = os.path.join(
-            RAIZ_ARQUIVOS_UPLOAD, f"{request.candidato.id}_{request.vaga.id}"
+        return Response(
+            {
+                "detail": OK_ED_PESSOA_VAGA_CAMPO_UPLOAD_RECEBIDO,
+                "arquivos": arquivos_recebidos,
+            },
+            status=status.HTTP_201_CREATED,
         )
-        arquivos_no_disco = []
-        if os.path.exists(diretorio_candidato):
-            arquivos_no_disco = [
-                os.path.join(diretorio_candidato, f)
-                for f in os.listdir(diretorio_candidato)
-            ]
 
-        # Comparar os arquivos no disco com os arquivos no banco de dados e remover os órfãos
-        arquivos_atuais_no_disco = [
-            os.path.join(RAIZ_ARQUIVOS_UPLOAD, arquivo)
-            for tipo in arquivos_atuais.values()
-            for arquivo in tipo
-        ]
 
-        for arquivo_orfao in set(arquivos_no_disco) - set(arquivos_atuais_no_disco):
-            os.remove(arquivo_orfao)
+@extend_schema(**DOCS_SITUACAO_ARQUIVOS_VIEW)
+class SituacaoArquivosView(ContextoInscricaoMixin, APIView):
+    # Mesma sessao exigida para anexar os arquivos
+    itens_sessao = ("vaga_selecionada", "candidato", "codigo_candidato", "pontuacao")
 
+    def get(self, request):
         return Response(
-            {"detail": OK_ED_PESSOA_VAGA_CAMPO_UPLOAD}, status=status.HTTP_201_CREATED
+            situacao_arquivos(request.candidato, request.vaga),
+            status=status.HTTP_200_OK,
         )
 
 
 @extend_schema(**DOCS_FINALIZAR_INSCRICAO_VIEW)
-class FinalizarInscricaoView(APIView):
+class FinalizarInscricaoView(ContextoInscricaoMixin, APIView):
+    itens_sessao = ("vaga_selecionada", "candidato", "pontuacao")
+
     def initial(self, request, *args, **kwargs):
         super().initial(request, *args, **kwargs)
 
-        if "vaga_selecionada" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAID_NA_SESSAO})
-        if "vaga_selecionada_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAIDHASH_NA_SESSAO})
-        if "candidato" not in request.session:
-            raise ValidationError({"detail": ERRO_CANDIDATO_NA_SESSAO})
-        if "candidato_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_CANDIDATOHASH_NA_SESSAO})
-        if "pontuacao" not in request.session:
-            raise ValidationError({"detail": ERRO_PONTUACAO_NA_SESSAO})
-        if "pontuacao_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_PONTUACAOHASH_NA_SESSAO})
-
-        if request.session["vaga_selecionada_hash"] != gerar_hash(
-            request.session["vaga_selecionada"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        if request.session["candidato_hash"] != gerar_hash(
-            request.session["candidato"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        if request.session["pontuacao_hash"] != gerar_hash(
-            request.session["pontuacao"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-
-        try:
-            vaga = EdVaga.objects.get(id=request.session["vaga_selecionada"])
-        except EdVaga.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_VAGA})
-        try:
-            candidato = CmPessoa.objects.get(id=request.session["candidato"])
-        except CmPessoa.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_CANDIDATO})
-        if vaga.ed_edital.data_fim_inscricao < timezone.now():
-            raise ValidationError({"detail": ERRO_INSCRICOES_ENCERRADAS})
-
-        request.vaga = vaga
-        request.candidato = candidato
-        request.pontuacao = request.session["pontuacao"]
-
-        ed_pessoa_vaga_campos = get_ed_pessoa_vaga_campos(request)
-
-        arquivos_faltantes = []
-
-        for checkbox_id in ed_pessoa_vaga_campos["checkboxes"].values_list(
-            "ed_vaga_campo_checkbox__id", flat=True
-        ):
-            if not EdPessoaVagaCampoCheckboxUpload.objects.filter(
-                ed_pessoa_vaga_campo_checkbox__cm_pessoa=candidato,
-                ed_pessoa_vaga_campo_checkbox__ed_vaga_campo_checkbox__ed_vaga=vaga,
-                ed_pessoa_vaga_campo_checkbox__ed_vaga_campo_checkbox__id=checkbox_id,
-            ).exists():
-                arquivos_faltantes.append(f"checkbox_{checkbox_id}")
-
-        for combobox_id in ed_pessoa_vaga_campos["comboboxes"].values_list(
-            "ed_vaga_campo_combobox__id", flat=True
-        ):
-            if not EdPessoaVagaCampoComboboxUpload.objects.filter(
-                ed_pessoa_vaga_campo_combobox__cm_pessoa=candidato,
-                ed_pessoa_vaga_campo_combobox__ed_vaga_campo_combobox__ed_vaga=vaga,
-                ed_pessoa_vaga_campo_combobox__ed_vaga_campo_combobox__id=combobox_id,
-            ).exists():
-                arquivos_faltantes.append(f"combobox_{combobox_id}")
-
-        for datebox_id in ed_pessoa_vaga_campos["dateboxes"].values_list(
-            "ed_vaga_campo_datebox__id", flat=True
-        ):
-            if not EdPessoaVagaCampoDateboxUpload.objects.filter(
-                ed_pessoa_vaga_campo_datebox__cm_pessoa=candidato,
-                ed_pessoa_vaga_campo_datebox__ed_vaga_campo_datebox__ed_vaga=vaga,
-                ed_pessoa_vaga_campo_datebox__ed_vaga_campo_datebox__id=datebox_id,
-            ).exists():
-                arquivos_faltantes.append(f"datebox_{datebox_id}")
-
-        # Garante, por segurança, que tem pelo menos um período preenchido
-        for datebox in ed_pessoa_vaga_campos["dateboxes"]:
-            if not EdPessoaVagaCampoDateboxPeriodo.objects.filter(
-                ed_pessoa_vaga_campo_datebox=datebox,
-                inicio__isnull=False,
-                fim__isnull=False,
-            ).exists():
-                arquivos_faltantes.append(f"datebox_{datebox.ed_vaga_campo_datebox.id}")
+        # O upload so' e' gravado depois do processamento do arquivo
+        if ha_arquivos_em_processamento(request.candidato, request.vaga):
+            raise ValidationError({"detail": ERRO_ARQUIVOS_EM_PROCESSAMENTO})
 
+        arquivos_faltantes = get_arquivos_faltantes(request)
         if arquivos_faltantes:
             raise ValidationError(
                 {"detail": f"{ERRO_FALTA_ARQUIVO}: {arquivos_faltantes}"}
@@ -1844,7 +1374,17 @@ class FinalizarInscricaoView(APIView):
             del request.session["inscricao_concorrente_hash"]
 
         try:
-            pontuacao = getattr(request, "pontuacao", None)
+            # A gravada com os campos marcados; a da sessao so' para quem
+            # marcou os campos antes de a pontuacao ser gravada
+            pontuacao = (
+                EdPessoaVagaPontuacao.objects.filter(
+                    cm_pessoa=request.candidato, ed_vaga=request.vaga
+                )
+                .values_list("pontuacao", flat=True)
+                .first()
+            )
+            if pontuacao is None:
+                pontuacao = getattr(request, "pontuacao", None)
             if not pontuacao or pontuacao == 0:
                 pontuacao = None
 
@@ -1879,62 +1419,9 @@ class FinalizarInscricaoView(APIView):
 
 
 @extend_schema(**DOCS_GET_INSCRICAO_VIEW)
-class GetInscricaoView(APIView):
-    def initial(self, request, *args, **kwargs):
-        super().initial(request, *args, **kwargs)
-
-        if "vaga_selecionada" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAID_NA_SESSAO})
-        if "vaga_selecionada_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_VAGAIDHASH_NA_SESSAO})
-        if "candidato" not in request.session:
-            raise ValidationError({"detail": ERRO_CANDIDATO_NA_SESSAO})
-        if "candidato_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_CANDIDATOHASH_NA_SESSAO})
-        if "codigo_candidato" not in request.session:
-            raise ValidationError({"detail": ERRO_CODIGOCANDIDATO_NA_SESSAO})
-        if "codigo_candidato_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_CODIGOCANDIDATOHASH_NA_SESSAO})
-        if "inscricao_id" not in request.session:
-            raise ValidationError({"detail": ERRO_INSCRICAO_NA_SESSAO})
-        if "inscricao_id_hash" not in request.session:
-            raise ValidationError({"detail": ERRO_INSCRICAOHASH_NA_SESSAO})
-
-        if request.session["vaga_selecionada_hash"] != gerar_hash(
-            request.session["vaga_selecionada"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        if request.session["candidato_hash"] != gerar_hash(
-            request.session["candidato"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        if request.session["inscricao_id_hash"] != gerar_hash(
-            request.session["inscricao_id"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-        if request.session["codigo_candidato_hash"] != gerar_hash(
-            request.session["codigo_candidato"]
-        ):
-            raise ValidationError({"detail": ERRO_SESSAO_INVALIDA})
-
-        try:
-            vaga = EdVaga.objects.get(id=request.session["vaga_selecionada"])
-        except EdVaga.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_VAGA})
-        try:
-            candidato = CmPessoa.objects.get(id=request.session["candidato"])
-        except CmPessoa.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_CANDIDATO})
-        try:
-            inscricao = EdPessoaVagaInscricao.objects.get(
-                id=request.session["inscricao_id"]
-            )
-        except EdPessoaVagaInscricao.DoesNotExist:
-            raise ValidationError({"detail": ERRO_GET_INSCRICAO})
-
-        request.vaga = vaga
-        request.candidato = candidato
-        request.inscricao = inscricao
+class GetInscricaoView(ContextoInscricaoMixin, APIView):
+    itens_sessao = ("vaga_selecionada", "candidato", "codigo_candidato", "inscricao_id")
+    verificar_prazo_inscricao = False
 
     def get(self, request):
         context = {
@@ -1,6 +1,8 @@
 from rest_framework import permissions
 from rest_framework.exceptions import PermissionDenied
 
+from cead.autenticacao.grupos import esta_em_algum_grupo
+
 from .messages import (
     ERRO_LANCA_FREQUENCIA_NAO_ESTA_NO_GRUPO_EDITORES_DISCIPLINAS,
     ERRO_LANCA_FREQUENCIA_NAO_ESTA_NO_GRUPO_LANCADORES_DE_FREQUENCIA,
@@ -12,9 +14,8 @@ class IsLancadorDeFrequencia(permissions.BasePermission):
     message = ERRO_LANCA_FREQUENCIA_NAO_ESTA_NO_GRUPO_LANCADORES_DE_FREQUENCIA
 
     def has_permission(self, request, view):
-        if (
-            request.user
-            and request.user.groups.filter(name="Lançadores de frequência").exists()
+        if request.user and esta_em_algum_grupo(
+            request.user, ["Lançadores de frequência"]
         ):
             return True
         raise PermissionDenied(detail=self.message)
@@ -26,14 +27,12 @@ class IsVisualizadordeRelatorioFrequencia(permissions.BasePermission):
     )
 
     def has_permission(self, request, view):
-        if (
-            request.user
-            and request.user.groups.filter(
-                name__in=[
-                    "Visualizadores de relatório de Frequência",
-                    "Financeiro - administradores",
-                ]
-            ).exists()
+        if request.user and esta_em_algum_grupo(
+            request.user,
+            [
+                "Visualizadores de relatório de Frequência",
+                "Financeiro - administradores",
+            ],
         ):
             return True
         raise PermissionDenied(detail=self.message)
@@ -43,15 +42,13 @@ class IsEditorDisciplina(permissions.BasePermission):
     message = ERRO_LANCA_FREQUENCIA_NAO_ESTA_NO_GRUPO_EDITORES_DISCIPLINAS
 
     def has_permission(self, request, view):
-        if (
-            request.user
-            and request.user.groups.filter(
-                name__in=[
-                    "Editores de disciplinas",
-                    "Acadêmico - administradores",
-                    "Financeiro - administradores",
-                ]
-            ).exists()
+        if request.user and esta_em_algum_grupo(
+            request.user,
+            [
+                "Editores de disciplinas",
+                "Acadêmico - administradores",
+                "Financeiro - administradores",
+            ],
         ):
             return True
         raise PermissionDenied(detail=self.message)
@@ -0,0 +1,77 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cead.inscricao.utils import (
+    verificar_assinatura_pdf_completa,
+    verificar_assinatura_pdf_rapida,
+)
+
+
+class Command(BaseCommand):
+    help = "Compara, sobre uma pasta de PDFs (assinados ou não), o tempo e o resultado da verificação rápida de assinatura com a verificação completa (PyPDF2)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("pasta", help="Pasta com os PDFs (busca recursiva)")
+        parser.add_argument(
+            "--repeticoes", type=int, default=1, help="Execuções por arquivo"
+        )
+
+    def _medir(self, funcao, caminho, repeticoes):
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            resultado = funcao(caminho)
+        return resultado, (time.perf_counter() - inicio) / repeticoes
+
+    def handle(self, *args, **opts):
+        if not os.path.isdir(opts["pasta"]):
+            raise CommandError(f"Pasta não encontrada: {opts['pasta']}")
+        repeticoes = max(1, opts["repeticoes"])
+
+        arquivos = [
+            os.path.join(pasta, arquivo)
+            for pasta, _, nomes in os.walk(opts["pasta"])
+            for arquivo in nomes
+            if arquivo.lower().endswith(".pdf")
+        ]
+        if not arquivos:
+            raise CommandError("Nenhum PDF na pasta.")
+
+        tempo_rapida = tempo_completa = tempo_combinada = 0
+        inconclusivos = assinados = 0
+        divergentes = []
+        for caminho in arquivos:
+            try:
+                completa, t_completa = self._medir(
+                    verificar_assinatura_pdf_completa, caminho, repeticoes
+                )
+            except Exception as e:
+                self.stderr.write(f"Ignorado (PyPDF2 não abre): {caminho}: {e}")
+                continue
+            rapida, t_rapida = self._medir(
+                verificar_assinatura_pdf_rapida, caminho, repeticoes
+            )
+
+            tempo_rapida += t_rapida
+            tempo_completa += t_completa
+            # O que verificar_assinatura_pdf gasta: rapida + completa se inconclusivo
+            tempo_combinada += t_rapida + (t_completa if rapida is None else 0)
+            assinados += completa
+            if rapida is None:
+                inconclusivos += 1
+            elif rapida != completa:
+                divergentes.append(caminho)
+
+        self.stdout.write(
+            f"PDFs: {len(arquivos)} ({assinados} assinados pela verificação completa)"
+        )
+        self.stdout.write(
+            f"Completa: {tempo_completa:.3f}s | Rápida: {tempo_rapida:.3f}s "
+            f"({inconclusivos} inconclusivo(s)) | "
+            f"Rápida com reserva na completa: {tempo_combinada:.3f}s"
+        )
+        for caminho in divergentes:
+            self.stdout.write(self.style.ERROR(f"Resultado divergente: {caminho}"))
+        if not divergentes:
+            self.stdout.write(self.style.SUCCESS("Sem divergências."))
@@ -0,0 +1,86 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from cead.fila_email import (
+    enviar_emails,
+    recuperar_emails_interrompidos,
+    reservar_emails,
+)
+from cead.settings import (
+    EMAIL_FILA_ENVIOS_POR_MINUTO,
+    EMAIL_FILA_INTERVALO,
+    EMAIL_FILA_LOTE,
+    EMAIL_FILA_TEMPO_MAXIMO,
+)
+
+# Com limite por minuto, segundos maximos de envio de cada lote: a prioridade
+# so' vale na reserva, entao um codigo de verificacao que chega durante um
+# lote de fichas espera no maximo isso
+DURACAO_MAXIMA_LOTE_LIMITADO = 30
+
+
+class Command(BaseCommand):
+    help = "Envia os e-mails da fila de saída, em lotes, reaproveitando a conexão SMTP."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=EMAIL_FILA_LOTE,
+            help="E-mails reservados e enviados por vez",
+        )
+        parser.add_argument(
+            "--por-minuto",
+            type=int,
+            default=EMAIL_FILA_ENVIOS_POR_MINUTO,
+            help="Limite de e-mails enviados por minuto (0: sem limite)",
+        )
+        parser.add_argument(
+            "--uma-vez",
+            action="store_true",
+            help="Esvazia a fila e termina, em vez de ficar aguardando",
+        )
+
+    def handle(self, *args, **opts):
+        lote = max(1, opts["lote"])
+        intervalo = 0
+        if opts["por_minuto"] > 0:
+            intervalo = 60 / opts["por_minuto"]
+            # Com espera entre as mensagens, o lote tem que terminar bem antes
+            # de EMAIL_FILA_TEMPO_MAXIMO, senao outro worker o toma como
+            # interrompido e reenvia, e logo, para as mensagens prioritarias
+            duracao = min(EMAIL_FILA_TEMPO_MAXIMO / 2, DURACAO_MAXIMA_LOTE_LIMITADO)
+            lote = max(1, min(lote, int(duracao / intervalo)))
+        self.stdout.write(f"Enviando e-mails da fila em lotes de {lote}")
+        if intervalo:
+            self.stdout.write(f"Limite de {opts['por_minuto']} e-mail(s) por minuto")
+
+        conexao = get_connection()
+        try:
+            while True:
+                close_old_connections()
+
+                recuperados = recuperar_emails_interrompidos()
+                if recuperados:
+                    self.stdout.write(
+                        f"{recuperados} e-mail(s) interrompido(s) de volta à fila"
+                    )
+
+                emails = reservar_emails(lote)
+                if emails:
+                    enviados = enviar_emails(emails, conexao, intervalo)
+                    self.stdout.write(f"Enviados {enviados} de {len(emails)} e-mail(s)")
+                    continue
+
+                # Fila vazia: nao segura a conexao com o servidor SMTP
+                conexao.close()
+                if opts["uma_vez"]:
+                    break
+                time.sleep(EMAIL_FILA_INTERVALO)
+        finally:
+            conexao.close()
+
+        self.stdout.write(self.style.SUCCESS("Concluído."))
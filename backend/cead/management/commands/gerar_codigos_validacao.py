@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from cead.models import EdPessoaVagaValidacao, EdPessoaVagaValidacaoCodigo
+
+
+class Command(BaseCommand):
+    help = "Grava o código das validações (usado na entrada da ficha) que ainda não o têm; com --todas, regrava todos."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--todas",
+            action="store_true",
+            help="Regrava o código de todas as validações",
+        )
+        parser.add_argument(
+            "--lote", type=int, default=1000, help="Validações gravadas por vez"
+        )
+
+    def handle(self, *args, **opts):
+        validacoes = EdPessoaVagaValidacao.objects.order_by("id")
+        if not opts["todas"]:
+            validacoes = validacoes.filter(codigo_validacao__isnull=True)
+
+        lote = max(1, opts["lote"])
+        gravados = 0
+        ultimo_id = 0
+        while True:
+            pagina = list(validacoes.filter(id__gt=ultimo_id)[:lote])
+            if not pagina:
+                break
+            EdPessoaVagaValidacaoCodigo.gravar(pagina)
+            gravados += len(pagina)
+            ultimo_id = pagina[-1].id
+
+        self.stdout.write(f"Código gravado para {gravados} validação(ões)")
+        self.stdout.write(self.style.SUCCESS("Concluído."))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from cead.editais.resultado import gerar_resultados
+from cead.models import EdVaga
+
+
+class Command(BaseCommand):
+    help = "Regera o resultado das vagas (usado pelos relatórios e pela emissão da ficha), inclusive o congelado após o fim da validação."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--edital", type=int, help="Apenas as vagas deste edital (id)"
+        )
+        parser.add_argument("--vaga", type=int, help="Apenas esta vaga (id)")
+
+    def handle(self, *args, **opts):
+        vagas = EdVaga.objects.all()
+        if opts["edital"]:
+            vagas = vagas.filter(ed_edital_id=opts["edital"])
+        if opts["vaga"]:
+            vagas = vagas.filter(id=opts["vaga"])
+
+        # Uma transacao por vaga, para nao travar todas de uma vez
+        vaga_ids = list(vagas.order_by("id").values_list("id", flat=True))
+        for vaga_id in vaga_ids:
+            gerar_resultados([vaga_id], somente_sem_resultado=False)
+
+        self.stdout.write(f"Resultado regerado para {len(vaga_ids)} vaga(s)")
+        self.stdout.write(self.style.SUCCESS("Concluído."))
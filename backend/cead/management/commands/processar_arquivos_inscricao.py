@@ -0,0 +1,109 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from cead.inscricao.reconciliacao import reconciliar_arquivos
+from cead.inscricao.tarefas import (
+    metricas_fila,
+    processar_tarefa,
+    recuperar_tarefas_interrompidas,
+    reservar_tarefas,
+)
+from cead.settings import (
+    UPLOAD_PROCESSAMENTO_INTERVALO,
+    UPLOAD_PROCESSAMENTO_WORKERS,
+    UPLOAD_RECONCILIACAO_INTERVALO,
+)
+
+
+def _processar(tarefa):
+    # Cada thread usa a propria conexao com o banco
+    try:
+        processar_tarefa(tarefa)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = "Processa (comprime, redimensiona e verifica assinatura) os arquivos enviados na inscrição."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=UPLOAD_PROCESSAMENTO_WORKERS,
+            help="Arquivos processados ao mesmo tempo",
+        )
+        parser.add_argument(
+            "--uma-vez",
+            action="store_true",
+            help="Esvazia a fila e termina, em vez de ficar aguardando",
+        )
+        parser.add_argument(
+            "--metricas",
+            action="store_true",
+            help="Apenas mostra o tamanho da fila e os tempos da última hora",
+        )
+
+    def handle(self, *args, **opts):
+        if opts["metricas"]:
+            metricas = metricas_fila()
+            self.stdout.write(
+                f"Fila -> pendentes: {metricas['pendentes']}, "
+                f"processando: {metricas['processando']}, "
+                f"espera mais antiga: {metricas['espera_mais_antiga']:.0f}s"
+            )
+            self.stdout.write(
+                f"Última hora -> processados: {metricas['processados']}, "
+                f"duração média: {metricas['duracao_media']:.1f}s, "
+                f"duração máxima: {metricas['duracao_maxima']:.1f}s"
+            )
+            return
+
+        workers = max(1, opts["workers"])
+        self.stdout.write(f"Processando arquivos da inscrição com {workers} worker(s)")
+
+        proxima_reconciliacao = time.monotonic()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                close_old_connections()
+
+                recuperadas = recuperar_tarefas_interrompidas()
+                if recuperadas:
+                    self.stdout.write(
+                        f"{recuperadas} tarefa(s) interrompida(s) de volta à fila"
+                    )
+
+                tarefas = reservar_tarefas(workers)
+                if tarefas:
+                    list(executor.map(_processar, tarefas))
+                    self.stdout.write(f"Processados {len(tarefas)} arquivo(s)")
+                    continue
+
+                # Fila vazia: aproveita para apagar arquivos orfaos e conteudos
+                # sem referencia
+                if (
+                    UPLOAD_RECONCILIACAO_INTERVALO
+                    and time.monotonic() >= proxima_reconciliacao
+                ):
+                    arquivos, bytes_arquivos, conteudos, bytes_conteudos = (
+                        reconciliar_arquivos()
+                    )
+                    if arquivos or conteudos:
+                        self.stdout.write(
+                            f"Apagados {arquivos} arquivo(s) órfão(s) "
+                            f"({bytes_arquivos / 1024 / 1024:.1f} MB) e "
+                            f"{conteudos} conteúdo(s) sem referência "
+                            f"({bytes_conteudos / 1024 / 1024:.1f} MB)"
+                        )
+                    proxima_reconciliacao = (
+                        time.monotonic() + UPLOAD_RECONCILIACAO_INTERVALO
+                    )
+
+                if opts["uma_vez"]:
+                    break
+                time.sleep(UPLOAD_PROCESSAMENTO_INTERVALO)
+
+        self.stdout.write(self.style.SUCCESS("Concluído."))
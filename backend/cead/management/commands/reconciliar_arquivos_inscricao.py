@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from cead.inscricao.reconciliacao import reconciliar_arquivos
+
+
+class Command(BaseCommand):
+    help = "Apaga os arquivos das pastas dos candidatos que nenhum upload referencia e os conteúdos que ficaram sem referência."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Apenas contar, não apagar"
+        )
+        parser.add_argument(
+            "--chunk", type=int, default=500, help="Tamanho do lote de arquivos"
+        )
+
+    def _progresso(self, quantidade, bytes_apagados):
+        self.stdout.write(
+            f"... {quantidade} arquivo(s), {bytes_apagados / 1024 / 1024:.1f} MB"
+        )
+
+    def handle(self, *args, **opts):
+        dry = opts["dry_run"]
+        arquivos, bytes_arquivos, conteudos, bytes_conteudos = reconciliar_arquivos(
+            lote=max(1, opts["chunk"]), apagar=not dry, progresso=self._progresso
+        )
+
+        if dry:
+            self.stdout.write(
+                f"Órfãos: {arquivos} arquivo(s) "
+                f"({bytes_arquivos / 1024 / 1024:.1f} MB)"
+            )
+            self.stdout.write("Dry-run: nada foi apagado.")
+            return
+
+        self.stdout.write(
+            f"Apagados {arquivos} arquivo(s) órfão(s) "
+            f"({bytes_arquivos / 1024 / 1024:.1f} MB) e {conteudos} conteúdo(s) "
+            f"sem referência ({bytes_conteudos / 1024 / 1024:.1f} MB)"
+        )
+        self.stdout.write(self.style.SUCCESS("Concluído."))
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:06
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cead", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EdPessoaVagaCampoUploadTarefa",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "tipo_campo",
+                    models.CharField(
+                        choices=[
+                            ("checkbox", "Checkbox"),
+                            ("combobox", "Combobox"),
+                            ("datebox", "Datebox"),
+                        ],
+                        max_length=8,
+                        verbose_name="Tipo do campo",
+                    ),
+                ),
+                ("ed_vaga_campo_id", models.BigIntegerField()),
+                ("ed_pessoa_vaga_campo_id", models.BigIntegerField()),
+                ("caminho_temporario", models.CharField(max_length=511)),
+                ("caminho_arquivo", models.CharField(max_length=511)),
+                ("requer_assinatura", models.BooleanField(default=False)),
+                (
+                    "situacao",
+                    models.CharField(
+                        choices=[
+                            ("pendente", "Pendente"),
+                            ("processando", "Processando"),
+                            ("concluido", "Concluído"),
+                            ("erro", "Erro"),
+                            ("cancelado", "Cancelado"),
+                        ],
+                        default="pendente",
+                        max_length=11,
+                        verbose_name="Situação",
+                    ),
+                ),
+                ("mensagem", models.TextField(blank=True, null=True)),
+                ("tentativas", models.SmallIntegerField(default=0)),
+                (
+                    "criado_em",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Criado em"
+                    ),
+                ),
+                ("iniciado_em", models.DateTimeField(blank=True, null=True)),
+                (
+                    "concluido_em",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Concluído em"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "(Editais) Processamento de arquivo do candidato",
+                "verbose_name_plural": "(Editais) Processamentos de arquivos dos candidatos",
+                "db_table": "ed_pessoa_vaga_campo_upload_tarefa",
+                "managed": False,
+            },
+        ),
+    ]
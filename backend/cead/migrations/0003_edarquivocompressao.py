@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cead", "0002_edpessoavagacampouploadtarefa"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EdArquivoCompressao",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("sha256", models.CharField(max_length=64, unique=True)),
+                ("comprimir", models.BooleanField()),
+                ("motivo", models.CharField(max_length=31)),
+                (
+                    "paginas",
+                    models.IntegerField(blank=True, null=True, verbose_name="Páginas"),
+                ),
+                ("tamanho_original", models.BigIntegerField()),
+                ("tamanho_final", models.BigIntegerField(blank=True, null=True)),
+                ("data", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "(Editais) Compressão de PDF enviado",
+                "verbose_name_plural": "(Editais) Compressões de PDFs enviados",
+                "db_table": "ed_arquivo_compressao",
+                "managed": False,
+            },
+        ),
+    ]
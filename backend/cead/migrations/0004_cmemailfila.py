@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:22
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cead", "0003_edarquivocompressao"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CmEmailFila",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "destinatario",
+                    models.CharField(max_length=255, verbose_name="Destinatário"),
+                ),
+                ("assunto", models.CharField(max_length=255)),
+                ("mensagem", models.TextField()),
+                (
+                    "chave",
+                    models.CharField(
+                        blank=True, max_length=255, null=True, unique=True
+                    ),
+                ),
+                (
+                    "situacao",
+                    models.CharField(
+                        choices=[
+                            ("pendente", "Pendente"),
+                            ("enviando", "Enviando"),
+                            ("enviado", "Enviado"),
+                            ("erro", "Erro"),
+                        ],
+                        default="pendente",
+                        max_length=8,
+                        verbose_name="Situação",
+                    ),
+                ),
+                ("tentativas", models.SmallIntegerField(default=0)),
+                ("erro", models.TextField(blank=True, null=True)),
+                (
+                    "criado_em",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Criado em"
+                    ),
+                ),
+                (
+                    "proxima_tentativa_em",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        verbose_name="Próxima tentativa em",
+                    ),
+                ),
+                ("iniciado_em", models.DateTimeField(blank=True, null=True)),
+                (
+                    "enviado_em",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Enviado em"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "(Comum) E-mail na fila",
+                "verbose_name_plural": "(Comum) E-mails na fila",
+                "db_table": "cm_email_fila",
+                "managed": False,
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:24
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cead", "0004_cmemailfila"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EdPessoaVagaPontuacao",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "pontuacao",
+                    models.FloatField(blank=True, null=True, verbose_name="Pontuação"),
+                ),
+                (
+                    "pontuacao_total",
+                    models.FloatField(
+                        default=0, verbose_name="Pontuação para a validação"
+                    ),
+                ),
+                (
+                    "atualizado_em",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Atualizado em"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "(Editais) Pessoa - pontuação na vaga",
+                "verbose_name_plural": "(Editais) Pessoas - pontuações nas vagas",
+                "db_table": "ed_pessoa_vaga_pontuacao",
+                "managed": False,
+            },
+        ),
+    ]
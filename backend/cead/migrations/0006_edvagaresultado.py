@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:37
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cead", "0005_edpessoavagapontuacao"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EdVagaResultado",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "status_validacao",
+                    models.CharField(max_length=30, verbose_name="Status"),
+                ),
+                ("ordem_status", models.SmallIntegerField()),
+                (
+                    "pontuacao_real",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="Pontuação real"
+                    ),
+                ),
+                ("pontuacao_ordenacao", models.FloatField()),
+                ("responsavel", models.TextField(verbose_name="Responsável")),
+                (
+                    "data_validacao",
+                    models.CharField(max_length=16, verbose_name="Data da validação"),
+                ),
+                ("justificativa", models.TextField(blank=True, null=True)),
+                ("cota", models.TextField(blank=True, null=True)),
+                (
+                    "gerado_em",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Gerado em"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "(Editais) Resultado da vaga",
+                "verbose_name_plural": "(Editais) Resultados das vagas",
+                "db_table": "ed_vaga_resultado",
+                "managed": False,
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cead", "0006_edvagaresultado"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EdPessoaVagaValidacaoCodigo",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "codigo",
+                    models.CharField(
+                        max_length=64, unique=True, verbose_name="Código da validação"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "(Editais) Código da validação",
+                "verbose_name_plural": "(Editais) Códigos das validações",
+                "db_table": "ed_pessoa_vaga_validacao_codigo",
+                "managed": False,
+            },
+        ),
+    ]
@@ -359,6 +359,90 @@ class CmPessoaEndereco(models.Model):
         db_table = "cm_pessoa_endereco"
 
 
+# Para CmEmailFila
+SITUACOES_EMAIL = (
+    ("pendente", "Pendente"),
+    ("enviando", "Enviando"),
+    ("enviado", "Enviado"),
+    ("erro", "Erro"),
+)
+
+
+class CmEmailFila(models.Model):
+    # Fila de saida dos e-mails, consumida pelo comando enviar_emails: a view
+    # so' grava a mensagem e responde, o worker envia em lotes pela mesma
+    # conexao SMTP e tenta de novo, com espera crescente, se o servidor falhar
+    # chave evita enfileirar duas vezes a mesma mensagem (o mesmo codigo de
+    # verificacao pedido de novo dentro dos 10 minutos, por exemplo)
+    # expira_em: depois disso a mensagem nao serve mais (o codigo de
+    # verificacao vale 10 minutos) e falha em vez de ser enviada
+    # lote agrupa as mensagens de um envio em massa (as fichas de uma vaga),
+    # para acompanhar o progresso
+    # prioridade: maior sai primeiro; o codigo de verificacao passa na frente
+    # das fichas enfileiradas em massa
+    #
+    # CREATE TABLE sistemascead.cm_email_fila (
+    #     id bigserial PRIMARY KEY,
+    #     destinatario varchar(255) NOT NULL,
+    #     assunto varchar(255) NOT NULL,
+    #     mensagem text NOT NULL,
+    #     chave varchar(255) UNIQUE,
+    #     lote varchar(100),
+    #     prioridade smallint NOT NULL DEFAULT 0,
+    #     situacao varchar(8) NOT NULL DEFAULT 'pendente',
+    #     tentativas smallint NOT NULL DEFAULT 0,
+    #     erro text,
+    #     criado_em timestamp with time zone NOT NULL DEFAULT now(),
+    #     proxima_tentativa_em timestamp with time zone NOT NULL DEFAULT now(),
+    #     iniciado_em timestamp with time zone,
+    #     enviado_em timestamp with time zone,
+    #     expira_em timestamp with time zone
+    # );
+    # CREATE INDEX cm_email_fila_situacao
+    # ON sistemascead.cm_email_fila USING btree (situacao, prioridade DESC, id);
+    # CREATE INDEX cm_email_fila_lote
+    # ON sistemascead.cm_email_fila USING btree (lote, situacao);
+    #
+    # Migracao de uma cm_email_fila criada sem lote, prioridade e expira_em:
+    # ALTER TABLE sistemascead.cm_email_fila
+    #     ADD COLUMN lote varchar(100),
+    #     ADD COLUMN prioridade smallint NOT NULL DEFAULT 0,
+    #     ADD COLUMN expira_em timestamp with time zone;
+    # DROP INDEX sistemascead.cm_email_fila_situacao;
+    # e os dois CREATE INDEX acima
+    id = models.BigAutoField(primary_key=True)
+    destinatario = models.CharField(max_length=255, verbose_name="Destinatário")
+    assunto = models.CharField(max_length=255)
+    mensagem = models.TextField()
+    chave = models.CharField(unique=True, max_length=255, blank=True, null=True)
+    lote = models.CharField(max_length=100, blank=True, null=True)
+    prioridade = models.SmallIntegerField(default=0, verbose_name="Prioridade")
+    situacao = models.CharField(
+        max_length=8,
+        choices=SITUACOES_EMAIL,
+        default="pendente",
+        verbose_name="Situação",
+    )
+    tentativas = models.SmallIntegerField(default=0)
+    erro = models.TextField(blank=True, null=True)
+    criado_em = models.DateTimeField(default=tz.now, verbose_name="Criado em")
+    proxima_tentativa_em = models.DateTimeField(
+        default=tz.now, verbose_name="Próxima tentativa em"
+    )
+    iniciado_em = models.DateTimeField(blank=True, null=True)
+    enviado_em = models.DateTimeField(blank=True, null=True, verbose_name="Enviado em")
+    expira_em = models.DateTimeField(blank=True, null=True, verbose_name="Expira em")
+
+    def __str__(self):
+        return f"{self.destinatario} - {self.assunto}"
+
+    class Meta:
+        verbose_name = "(Comum) E-mail na fila"
+        verbose_name_plural = "(Comum) E-mails na fila"
+        managed = False
+        db_table = "cm_email_fila"
+
+
 class CmFormacao(models.Model):
     id = models.BigAutoField(primary_key=True)
     cm_titulacao = models.ForeignKey(
@@ -578,6 +662,37 @@ class DjangoSession(models.Model):
         db_table = "django_session"
 
 
+class EdArquivoCompressao(models.Model):
+    # Decisao de comprimir_pdf por conteudo (sha256) do PDF enviado na
+    # inscricao: o mesmo documento, enviado de novo, nao e' analisado de novo
+    # e, se o gs nao ajudou da primeira vez, nao passa por ele
+    #
+    # CREATE TABLE sistemascead.ed_arquivo_compressao (
+    #     id bigserial PRIMARY KEY,
+    #     sha256 char(64) NOT NULL UNIQUE,
+    #     comprimir boolean NOT NULL,
+    #     motivo varchar(31) NOT NULL,
+    #     paginas integer,
+    #     tamanho_original bigint NOT NULL,
+    #     tamanho_final bigint,
+    #     data timestamp with time zone NOT NULL DEFAULT now()
+    # );
+    id = models.BigAutoField(primary_key=True)
+    sha256 = models.CharField(unique=True, max_length=64)
+    comprimir = models.BooleanField()
+    motivo = models.CharField(max_length=31)
+    paginas = models.IntegerField(blank=True, null=True, verbose_name="Páginas")
+    tamanho_original = models.BigIntegerField()
+    tamanho_final = models.BigIntegerField(blank=True, null=True)
+    data = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "(Editais) Compressão de PDF enviado"
+        verbose_name_plural = "(Editais) Compressões de PDFs enviados"
+        managed = False
+        db_table = "ed_arquivo_compressao"
+
+
 class EdCampo(models.Model):
     id = models.BigAutoField(primary_key=True)
     descricao = models.TextField(blank=True, null=True)
@@ -891,6 +1006,92 @@ class EdPessoaVagaCampoDateboxPeriodo(models.Model):
         db_table = "ed_pessoa_vaga_campo_datebox_periodo"
 
 
+# Para EdPessoaVagaCampoUploadTarefa
+TIPOS_CAMPO = (
+    ("checkbox", "Checkbox"),
+    ("combobox", "Combobox"),
+    ("datebox", "Datebox"),
+)
+SITUACOES_TAREFA = (
+    ("pendente", "Pendente"),
+    ("processando", "Processando"),
+    ("concluido", "Concluído"),
+    ("erro", "Erro"),
+    ("cancelado", "Cancelado"),
+)
+
+
+class EdPessoaVagaCampoUploadTarefa(models.Model):
+    # Fila do processamento (compressao, redimensionamento e verificacao de
+    # assinatura) dos arquivos enviados na inscricao, consumida pelo comando
+    # processar_arquivos_inscricao, fora dos workers do gunicorn
+    # O arquivo fica em caminho_temporario (arquivo oculto na pasta do candidato)
+    # ate ser processado; so entao vai para caminho_arquivo e o upload e' gravado
+    #
+    # CREATE TABLE sistemascead.ed_pessoa_vaga_campo_upload_tarefa (
+    #     id bigserial PRIMARY KEY,
+    #     cm_pessoa_id bigint NOT NULL REFERENCES sistemascead.cm_pessoa (id),
+    #     ed_vaga_id bigint NOT NULL REFERENCES sistemascead.ed_vaga (id),
+    #     tipo_campo varchar(8) NOT NULL,
+    #     ed_vaga_campo_id bigint NOT NULL,
+    #     ed_pessoa_vaga_campo_id bigint NOT NULL,
+    #     caminho_temporario varchar(511) NOT NULL,
+    #     caminho_arquivo varchar(511) NOT NULL,
+    #     requer_assinatura boolean NOT NULL DEFAULT false,
+    #     sha256 char(64),
+    #     situacao varchar(11) NOT NULL DEFAULT 'pendente',
+    #     mensagem text,
+    #     tentativas smallint NOT NULL DEFAULT 0,
+    #     criado_em timestamp with time zone NOT NULL DEFAULT now(),
+    #     iniciado_em timestamp with time zone,
+    #     concluido_em timestamp with time zone,
+    #     duracao double precision
+    # );
+    # CREATE INDEX ed_pessoa_vaga_campo_upload_tarefa_situacao
+    # ON sistemascead.ed_pessoa_vaga_campo_upload_tarefa USING btree (situacao, id);
+    # CREATE INDEX ed_pessoa_vaga_campo_upload_tarefa_pessoa_vaga
+    # ON sistemascead.ed_pessoa_vaga_campo_upload_tarefa USING btree (cm_pessoa_id, ed_vaga_id);
+    id = models.BigAutoField(primary_key=True)
+    cm_pessoa = models.ForeignKey(CmPessoa, models.DO_NOTHING, verbose_name="Pessoa")
+    ed_vaga = models.ForeignKey("EdVaga", models.DO_NOTHING, verbose_name="Vaga")
+    tipo_campo = models.CharField(
+        max_length=8, choices=TIPOS_CAMPO, verbose_name="Tipo do campo"
+    )
+    # Identificadores de EdVagaCampo<Tipo> e EdPessoaVagaCampo<Tipo>,
+    # dependem de tipo_campo
+    ed_vaga_campo_id = models.BigIntegerField()
+    ed_pessoa_vaga_campo_id = models.BigIntegerField()
+    caminho_temporario = models.CharField(max_length=511)
+    caminho_arquivo = models.CharField(max_length=511)
+    requer_assinatura = models.BooleanField(default=False)
+    # Do arquivo como enviado, calculado enquanto e' gravado
+    sha256 = models.CharField(max_length=64, blank=True, null=True)
+    situacao = models.CharField(
+        max_length=11,
+        choices=SITUACOES_TAREFA,
+        default="pendente",
+        verbose_name="Situação",
+    )
+    mensagem = models.TextField(blank=True, null=True)
+    tentativas = models.SmallIntegerField(default=0)
+    criado_em = models.DateTimeField(default=tz.now, verbose_name="Criado em")
+    iniciado_em = models.DateTimeField(blank=True, null=True)
+    concluido_em = models.DateTimeField(
+        blank=True, null=True, verbose_name="Concluído em"
+    )
+    # Segundos gastos no processamento do arquivo (compressao, etc.)
+    duracao = models.FloatField(blank=True, null=True, verbose_name="Duração (s)")
+
+    def __str__(self):
+        return f"{self.tipo_campo}_{self.ed_vaga_campo_id} ({self.situacao})"
+
+    class Meta:
+        verbose_name = "(Editais) Processamento de arquivo do candidato"
+        verbose_name_plural = "(Editais) Processamentos de arquivos dos candidatos"
+        managed = False
+        db_table = "ed_pessoa_vaga_campo_upload_tarefa"
+
+
 class EdPessoaVagaConfirmacao(models.Model):
     id = models.BigAutoField(primary_key=True)
     cm_pessoa = models.ForeignKey(CmPessoa, models.DO_NOTHING)
@@ -966,6 +1167,43 @@ class EdPessoaVagaJustificativa(models.Model):
         return "-"
 
 
+class EdPessoaVagaPontuacao(models.Model):
+    # Pontuacao do candidato na vaga, mantida a cada alteracao dos campos
+    # marcados (inscricao/pontuacao.py), para o formulario e a validacao lerem
+    # uma linha em vez de agregar as tabelas dos campos
+    # - pontuacao: a calculada no formulario (com os periodos dos dateboxes),
+    #   que vai para a inscricao
+    # - pontuacao_total: a da listagem da validacao (soma dos checkboxes, maior
+    #   combobox e maior pontuacao maxima dos dateboxes marcados)
+    #
+    # CREATE TABLE sistemascead.ed_pessoa_vaga_pontuacao (
+    #     id bigserial PRIMARY KEY,
+    #     cm_pessoa_id bigint NOT NULL REFERENCES sistemascead.cm_pessoa (id),
+    #     ed_vaga_id bigint NOT NULL REFERENCES sistemascead.ed_vaga (id),
+    #     pontuacao double precision,
+    #     pontuacao_total double precision NOT NULL DEFAULT 0,
+    #     atualizado_em timestamp with time zone NOT NULL DEFAULT now(),
+    #     UNIQUE (cm_pessoa_id, ed_vaga_id)
+    # );
+    # CREATE INDEX ed_pessoa_vaga_pontuacao_vaga
+    # ON sistemascead.ed_pessoa_vaga_pontuacao USING btree (ed_vaga_id);
+    id = models.BigAutoField(primary_key=True)
+    cm_pessoa = models.ForeignKey(CmPessoa, models.DO_NOTHING, verbose_name="Pessoa")
+    ed_vaga = models.ForeignKey("EdVaga", models.DO_NOTHING, verbose_name="Vaga")
+    pontuacao = models.FloatField(blank=True, null=True, verbose_name="Pontuação")
+    pontuacao_total = models.FloatField(
+        default=0, verbose_name="Pontuação para a validação"
+    )
+    atualizado_em = models.DateTimeField(default=tz.now, verbose_name="Atualizado em")
+
+    class Meta:
+        verbose_name = "(Editais) Pessoa - pontuação na vaga"
+        verbose_name_plural = "(Editais) Pessoas - pontuações nas vagas"
+        managed = False
+        db_table = "ed_pessoa_vaga_pontuacao"
+        unique_together = (("cm_pessoa", "ed_vaga"),)
+
+
 class EdPessoaVagaValidacao(models.Model):
     id = models.BigAutoField(primary_key=True)
     cm_pessoa = models.ForeignKey(CmPessoa, models.DO_NOTHING, verbose_name="Nome")
@@ -991,15 +1229,36 @@ class EdPessoaVagaValidacao(models.Model):
     def validar_codigo_pelo_cpf(cls, cpf, codigo):
         from cead.messages import ERRO_HASH_INVALIDO
 
-        validacoes = cls.objects.filter(cm_pessoa__cpf=cpf)
-        for validacao in validacoes:
-            if validacao.codigo == codigo:
+        validacoes = cls.objects.filter(cm_pessoa__cpf=cpf).select_related(
+            "cm_pessoa", "ed_vaga__ed_edital"
+        )
+        validacao = validacoes.filter(codigo_validacao__codigo=codigo).first()
+        if validacao is not None:
+            return validacao
+
+        # Validacoes ainda sem o codigo gravado (anteriores a
+        # EdPessoaVagaValidacaoCodigo): calcula, grava e compara
+        sem_codigo = list(validacoes.filter(codigo_validacao__isnull=True))
+        if sem_codigo:
+            EdPessoaVagaValidacaoCodigo.gravar(sem_codigo)
+        for validacao in sem_codigo:
+            if validacao.calcular_codigo() == codigo:
                 return validacao
         raise Exception(ERRO_HASH_INVALIDO)
 
     # A ficha so' podera' ser gerada se na URL tiver este codigo
+    # Lido de EdPessoaVagaValidacaoCodigo quando a consulta o trouxe
+    # (select_related("codigo_validacao")), senao calculado
     @property
     def codigo(self):
+        try:
+            if EdPessoaVagaValidacao.codigo_validacao.is_cached(self):
+                return self.codigo_validacao.codigo
+        except EdPessoaVagaValidacaoCodigo.DoesNotExist:
+            pass
+        return self.calcular_codigo()
+
+    def calcular_codigo(self):
         pontuacao_str = (
             f"{self.pontuacao:.2f}" if self.pontuacao is not None else "0.00"
         )
@@ -1026,6 +1285,52 @@ class EdPessoaVagaValidacao(models.Model):
     codigo_label.short_description = "Código da validação"
 
 
+class EdPessoaVagaValidacaoCodigo(models.Model):
+    # Codigo da validacao (EdPessoaVagaValidacao.calcular_codigo) gravado a
+    # cada gravacao da validacao (signal e validacao em lote), para a entrada
+    # da ficha achar a validacao pelo indice em vez de calcular o hash de
+    # todas as validacoes do CPF
+    #
+    # CREATE TABLE sistemascead.ed_pessoa_vaga_validacao_codigo (
+    #     id bigserial PRIMARY KEY,
+    #     ed_pessoa_vaga_validacao_id bigint NOT NULL UNIQUE
+    #         REFERENCES sistemascead.ed_pessoa_vaga_validacao (id) ON DELETE CASCADE,
+    #     codigo char(64) NOT NULL UNIQUE
+    # );
+    id = models.BigAutoField(primary_key=True)
+    ed_pessoa_vaga_validacao = models.OneToOneField(
+        EdPessoaVagaValidacao,
+        models.DO_NOTHING,
+        related_name="codigo_validacao",
+        verbose_name="Validação",
+    )
+    codigo = models.CharField(
+        unique=True, max_length=64, verbose_name="Código da validação"
+    )
+
+    class Meta:
+        verbose_name = "(Editais) Código da validação"
+        verbose_name_plural = "(Editais) Códigos das validações"
+        managed = False
+        db_table = "ed_pessoa_vaga_validacao_codigo"
+
+    # Um unico INSERT ... ON CONFLICT para todas as validacoes
+    @classmethod
+    def gravar(cls, validacoes):
+        cls.objects.bulk_create(
+            [
+                cls(
+                    ed_pessoa_vaga_validacao=validacao,
+                    codigo=validacao.calcular_codigo(),
+                )
+                for validacao in validacoes
+            ],
+            update_conflicts=True,
+            unique_fields=["ed_pessoa_vaga_validacao"],
+            update_fields=["codigo"],
+        )
+
+
 class EdPessoaVagaValidacaoIndeferimento(models.Model):
     id = models.BigAutoField(primary_key=True)
     ed_pessoa_vaga_validacao = models.ForeignKey(
@@ -1150,6 +1455,66 @@ class EdVagaCota(models.Model):
         db_table = "ed_vaga_cota"
 
 
+class EdVagaResultado(models.Model):
+    # Resultado de cada inscricao da vaga (status, pontuacao real e posicao),
+    # como sai no relatorio, para os relatorios e a emissao da ficha lerem uma
+    # tabela em vez de recalcular a partir de validacoes, justificativas,
+    # cotas e indeferimentos (editais/resultado.py)
+    # As linhas da vaga sao apagadas a cada validacao e regeradas na proxima
+    # leitura; depois de data_fim_validacao ficam congeladas
+    # Nome, CPF, e-mail e pontuacao informada vem da inscricao e da pessoa
+    #
+    # CREATE TABLE sistemascead.ed_vaga_resultado (
+    #     id bigserial PRIMARY KEY,
+    #     ed_vaga_id bigint NOT NULL REFERENCES sistemascead.ed_vaga (id),
+    #     ed_pessoa_vaga_inscricao_id bigint NOT NULL UNIQUE
+    #         REFERENCES sistemascead.ed_pessoa_vaga_inscricao (id) ON DELETE CASCADE,
+    #     ed_pessoa_vaga_validacao_id bigint
+    #         REFERENCES sistemascead.ed_pessoa_vaga_validacao (id) ON DELETE SET NULL,
+    #     status_validacao varchar(30) NOT NULL,
+    #     ordem_status smallint NOT NULL,
+    #     pontuacao_real double precision,
+    #     pontuacao_ordenacao double precision NOT NULL,
+    #     responsavel text NOT NULL,
+    #     data_validacao varchar(16) NOT NULL,
+    #     justificativa text,
+    #     cota text,
+    #     gerado_em timestamp with time zone NOT NULL DEFAULT now()
+    # );
+    # CREATE INDEX ed_vaga_resultado_ordem
+    # ON sistemascead.ed_vaga_resultado USING btree
+    # (ed_vaga_id, ordem_status, pontuacao_ordenacao DESC);
+    id = models.BigAutoField(primary_key=True)
+    ed_vaga = models.ForeignKey(EdVaga, models.DO_NOTHING, verbose_name="Vaga")
+    ed_pessoa_vaga_inscricao = models.OneToOneField(
+        EdPessoaVagaInscricao, models.DO_NOTHING, verbose_name="Inscrição"
+    )
+    ed_pessoa_vaga_validacao = models.ForeignKey(
+        EdPessoaVagaValidacao,
+        models.DO_NOTHING,
+        blank=True,
+        null=True,
+        verbose_name="Validação",
+    )
+    status_validacao = models.CharField(max_length=30, verbose_name="Status")
+    ordem_status = models.SmallIntegerField()
+    pontuacao_real = models.FloatField(
+        blank=True, null=True, verbose_name="Pontuação real"
+    )
+    pontuacao_ordenacao = models.FloatField()
+    responsavel = models.TextField(verbose_name="Responsável")
+    data_validacao = models.CharField(max_length=16, verbose_name="Data da validação")
+    justificativa = models.TextField(blank=True, null=True)
+    cota = models.TextField(blank=True, null=True)
+    gerado_em = models.DateTimeField(default=tz.now, verbose_name="Gerado em")
+
+    class Meta:
+        verbose_name = "(Editais) Resultado da vaga"
+        verbose_name_plural = "(Editais) Resultados das vagas"
+        managed = False
+        db_table = "ed_vaga_resultado"
+
+
 class FiDatafrequencia(models.Model):
     id = models.BigAutoField(primary_key=True)
     data_inicio = models.DateTimeField(blank=True, null=True)
@@ -1,6 +1,8 @@
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import BasePermission
 
+from cead.autenticacao.grupos import esta_em_algum_grupo
+
 from .messages import ERRO_NAO_ESTA_NO_GRUPO_VISUALIZADORES_DE_RELATORIO_MOODLE
 
 
@@ -8,14 +10,12 @@ class IsVisualizadordeRelatorioMoodle(BasePermission):
     message = ERRO_NAO_ESTA_NO_GRUPO_VISUALIZADORES_DE_RELATORIO_MOODLE
 
     def has_permission(self, request, view):
-        if (
-            request.user
-            and request.user.groups.filter(
-                name__in=[
-                    "Visualizadores de relatório Moodle",
-                    "Financeiro - administradores",
-                ]
-            ).exists()
+        if request.user and esta_em_algum_grupo(
+            request.user,
+            [
+                "Visualizadores de relatório Moodle",
+                "Financeiro - administradores",
+            ],
         ):
             return True
         raise PermissionDenied(detail=self.message)
@@ -23,6 +23,8 @@ from .jwt import *
 from .session import *
 from .spectacular import *
 from .ssl import *
+from .upload import *
+from .cache import *
 
 env = environ.Env()
 environ.Env.read_env()
@@ -0,0 +1,36 @@
+# Configuracoes para os testes (python manage.py test --settings=cead.settings_teste):
+# sqlite em memoria no lugar do PostgreSQL e caches locais, sem servicos externos
+import os
+
+os.environ.setdefault("EMAIL_HOST_USER", "teste@example.com")
+os.environ.setdefault("EMAIL_HOST_PASSWORD", "teste")
+
+from .settings import *
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+    }
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "compartilhado": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "compartilhado",
+    },
+}
+
+EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+# Os modelos de cead sao nao gerenciados (as tabelas sao do sistemascead): sem
+# as migracoes do app, o executor cria as tabelas direto dos modelos
+MIGRATION_MODULES = {"cead": None}
+TEST_RUNNER = "cead.executor_testes.ExecutorTestes"
+
+# db_comment so' existe no PostgreSQL
+SILENCED_SYSTEM_CHECKS = ["fields.W163"]
@@ -1,6 +1,8 @@
 from rest_framework import permissions
 from rest_framework.exceptions import PermissionDenied
 
+from cead.autenticacao.grupos import esta_em_algum_grupo
+
 from .messages import ERRO_TRANSMISSAO_NAO_ESTA_NO_GRUPO_REQUISITANTES_DE_TRANSMISSAO
 
 
@@ -8,9 +10,8 @@ class IsRequisitanteTransmissao(permissions.BasePermission):
     message = ERRO_TRANSMISSAO_NAO_ESTA_NO_GRUPO_REQUISITANTES_DE_TRANSMISSAO
 
     def has_permission(self, request, view):
-        if (
-            request.user
-            and request.user.groups.filter(name="Requisitantes de transmissão").exists()
+        if request.user and esta_em_algum_grupo(
+            request.user, ["Requisitantes de transmissão"]
         ):
             return True
         raise PermissionDenied(detail=self.message)
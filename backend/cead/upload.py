@@ -0,0 +1,63 @@
+from cead.env import config
+
+# Tamanho maximo, em bytes, de cada arquivo enviado na inscricao
+UPLOAD_TAMANHO_MAXIMO = config(
+    "UPLOAD_TAMANHO_MAXIMO", cast=int, default=25 * 1024 * 1024
+)
+
+# Processamento dos arquivos da inscricao (comando processar_arquivos_inscricao)
+# Quantidade de arquivos processados ao mesmo tempo por worker
+UPLOAD_PROCESSAMENTO_WORKERS = config(
+    "UPLOAD_PROCESSAMENTO_WORKERS", cast=int, default=2
+)
+# Segundos de espera quando a fila esta' vazia
+UPLOAD_PROCESSAMENTO_INTERVALO = config(
+    "UPLOAD_PROCESSAMENTO_INTERVALO", cast=int, default=2
+)
+UPLOAD_PROCESSAMENTO_MAXIMO_TENTATIVAS = config(
+    "UPLOAD_PROCESSAMENTO_MAXIMO_TENTATIVAS", cast=int, default=3
+)
+# Tarefas em processamento ha mais tempo que isso (segundos) sao consideradas
+# de worker interrompido e voltam para a fila
+UPLOAD_PROCESSAMENTO_TEMPO_MAXIMO = config(
+    "UPLOAD_PROCESSAMENTO_TEMPO_MAXIMO", cast=int, default=600
+)
+
+# Conteudos (inscricao/armazenamento.py) sem referencia sao apagados apos esse tempo (segundos)
+UPLOAD_CONTEUDO_CARENCIA = config("UPLOAD_CONTEUDO_CARENCIA", cast=int, default=3600)
+
+# Reconciliacao (inscricao/reconciliacao.py): arquivos das pastas dos candidatos
+# sem upload no banco sao apagados apos esse tempo (segundos) sem alteracao
+UPLOAD_RECONCILIACAO_CARENCIA = config(
+    "UPLOAD_RECONCILIACAO_CARENCIA", cast=int, default=3600
+)
+# O worker roda a reconciliacao a cada UPLOAD_RECONCILIACAO_INTERVALO segundos,
+# quando a fila esta' vazia; 0 desliga (para rodar pelo cron)
+UPLOAD_RECONCILIACAO_INTERVALO = config(
+    "UPLOAD_RECONCILIACAO_INTERVALO", cast=int, default=3600
+)
+
+# Fila cheia: o envio e' recusado com 503 e Retry-After (segundos)
+UPLOAD_FILA_MAXIMA = config("UPLOAD_FILA_MAXIMA", cast=int, default=200)
+UPLOAD_FILA_RETRY_AFTER = config("UPLOAD_FILA_RETRY_AFTER", cast=int, default=30)
+
+# Ghostscript (comprimir_pdf)
+# Processos gs simultaneos no servidor, somando todos os workers
+GS_MAXIMO_PROCESSOS = config("GS_MAXIMO_PROCESSOS", cast=int, default=2)
+# Segundos de execucao de cada gs; passando disso, o PDF fica sem compressao
+GS_TEMPO_MAXIMO = config("GS_TEMPO_MAXIMO", cast=int, default=120)
+# Memoria virtual maxima de cada gs, em MB
+GS_MEMORIA_MAXIMA = config("GS_MEMORIA_MAXIMA", cast=int, default=1024)
+# Segundos esperando um gs livre antes de devolver o arquivo para a fila
+GS_ESPERA_MAXIMA = config("GS_ESPERA_MAXIMA", cast=int, default=60)
+GS_PASTA_TRAVAS = config("GS_PASTA_TRAVAS", default="/tmp/cead-gs")
+
+# Analise antes da compressao: PDFs com menos bytes por pagina que isso, ou
+# cujas imagens ja' estao em JPEG ate' este DPI, nao passam pelo gs
+PDF_COMPRESSAO_BYTES_POR_PAGINA = config(
+    "PDF_COMPRESSAO_BYTES_POR_PAGINA", cast=int, default=100 * 1024
+)
+PDF_COMPRESSAO_DPI_MAXIMO = config("PDF_COMPRESSAO_DPI_MAXIMO", cast=int, default=150)
+PDF_COMPRESSAO_PAGINAS_ANALISADAS = config(
+    "PDF_COMPRESSAO_PAGINAS_ANALISADAS", cast=int, default=10
+)
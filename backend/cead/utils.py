@@ -1,6 +1,8 @@
 import hashlib
 import regex
 import unicodedata
+from django.db import transaction
+
 from cead import settings
 
 
@@ -8,6 +10,33 @@ def gerar_hash(key):
     return hashlib.sha256(f"{key}{settings.SECRET_KEY}".encode()).hexdigest()
 
 
+# Como transaction.on_commit, mas agenda funcao(*args) uma so' vez por
+# transacao: sinais de varias instancias da mesma vaga (admin com inlines,
+# importacoes) geram um unico recalculo no commit
+def on_commit_unico(funcao, *args):
+    conexao = transaction.get_connection()
+    if not hasattr(conexao, "on_commit_unico_pendentes"):
+        conexao.on_commit_unico_pendentes = {}
+    pendentes = conexao.on_commit_unico_pendentes
+    chave = (funcao, args)
+
+    # O rollback (inclusive de savepoint) descarta o callback sem executa-lo:
+    # so' conta como agendado se ainda estiver na fila da conexao
+    agendado = pendentes.get(chave)
+    if agendado is not None and any(
+        callback is agendado for _, callback, _ in conexao.run_on_commit
+    ):
+        return
+
+    def executar():
+        if pendentes.get(chave) is executar:
+            del pendentes[chave]
+        funcao(*args)
+
+    pendentes[chave] = executar
+    transaction.on_commit(executar)
+
+
 # Faz com que nomes (pessoas, ruas) tenham as letras maiusculas apropriadas
 def maiusculas_nomes(string):
     if not string or string.strip() == "":
@@ -2,6 +2,32 @@
 
 STATIC_DIR="/app/cead/staticfiles"
 
+# Workers que rodam fora do gunicorn:
+# - processar_arquivos_inscricao: sem ele os arquivos enviados nunca sao
+#   gravados e nenhuma inscricao pode ser finalizada
+# - enviar_emails: fila de saida dos e-mails (codigo de verificacao e fichas)
+# Sem argumento, o container sobe o gunicorn com os dois workers em segundo
+# plano, reiniciados se terminarem (INICIAR_WORKERS=0 para nao subir). Com o
+# nome do worker como argumento, roda apenas ele, para um servico separado
+# com a mesma imagem (entrypoint.sh enviar_emails)
+WORKERS="processar_arquivos_inscricao enviar_emails"
+
+iniciar_worker() {
+    while true; do
+        echo "[Entrypoint] Iniciando $1..."
+        python manage.py "$1" >> "/app/logs/$1.log" 2>&1
+        echo "[Entrypoint] $1 terminou. Reiniciando em 5 segundos..."
+        sleep 5
+    done
+}
+
+case "$1" in
+    processar_arquivos_inscricao|enviar_emails)
+        echo "[Entrypoint] Iniciando $1..."
+        exec python manage.py "$@"
+        ;;
+esac
+
 echo "[Entrypoint] Verificando se é necessário rodar collectstatic..."
 
 if [ -z "$(ls -A $STATIC_DIR)" ]; then
@@ -11,6 +37,12 @@ else
     echo "[Entrypoint] staticfiles já contém arquivos. Ignorando collectstatic."
 fi
 
+if [ "${INICIAR_WORKERS:-1}" = "1" ]; then
+    for worker in $WORKERS; do
+        iniciar_worker "$worker" &
+    done
+fi
+
 echo "[Entrypoint] Iniciando Gunicorn..."
 exec gunicorn cead.wsgi:application \
     --bind=0.0.0.0:8000 \
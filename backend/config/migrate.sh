@@ -5,4 +5,5 @@
 cd /app/
 
 # migrate a docker container as needed
-/opt/venv/bin/python manage.py migrate
\ No newline at end of file
+/opt/venv/bin/python manage.py migrate
+/opt/venv/bin/python manage.py createcachetable
\ No newline at end of file